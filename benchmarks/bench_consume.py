@@ -0,0 +1,135 @@
+"""
+원스토어 consume 호출 벤치마크 (대역 서버 사용)
+
+benchmarks/fake_onestore.py 를 띄우고(또는 --onestore-url 로 지정) 임시 DB에 환경 데이터를 등록한 뒤
+request_onestore_consume 을 지정한 동시성으로 호출해 처리량, 지연 시간, 결과 분포를 JSON으로 저장한다.
+
+실행 예:
+    python benchmarks/bench_consume.py --requests 2000 --concurrency 16 \\
+        --fake-args "--consume-latency lognormal:80:0.5 --error-rate 0.05 --rate-429 0.02"
+"""
+import argparse
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common  # noqa: E402
+
+
+def _wait_ready(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"대역 서버가 시작되지 않았습니다: {base_url}")
+
+
+def _register_env(base_url: str) -> None:
+    import models
+    from database import SessionLocal, init_db
+
+    init_db()
+    with SessionLocal() as db:
+        db.query(models.OnestoreEnvData).filter(models.OnestoreEnvData.client_id == common.BENCH_CLIENT_ID).delete()
+        db.add(models.OnestoreEnvData(
+            client_id=common.BENCH_CLIENT_ID,
+            license_key="unused",
+            client_secret="bench-secret",
+            pns_sandbox_domain=base_url,
+            pns_commercial_domain=base_url,
+        ))
+        db.commit()
+
+
+def _run(args: argparse.Namespace, base_url: str) -> dict:
+    from database import ReadSessionLocal
+    from webshop_consume import OnestoreConsumeError, request_onestore_consume
+    from webshop_resilience import onestore_resilience
+
+    latencies: List[float] = []
+    outcomes: Dict[str, int] = defaultdict(int)
+    run_id = f"{int(time.time())}{os.getpid()}"
+
+    def _call(i: int) -> None:
+        started = time.perf_counter()
+        try:
+            # consume 작업 워커와 같이 읽기 전용 세션 사용 (쓰기 연결은 풀 크기 1)
+            with ReadSessionLocal() as db:
+                request_onestore_consume(
+                    db, common.BENCH_CLIENT_ID, "gem0010000", f"TOKEN{run_id}{i:08d}", f"bench:{i}", "SANDBOX"
+                )
+            outcome = "ok"
+        except OnestoreConsumeError as e:
+            outcome = f"{e.status_code or 'error'}{'' if e.retryable else ' (non-retryable)'}"
+        except Exception as e:
+            outcome = type(e).__name__
+        latencies.append(time.perf_counter() - started)
+        outcomes[outcome] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(_call, range(args.requests)))
+    summary = common.summarize(latencies, time.perf_counter() - started, dict(outcomes))
+
+    summary["upstream"] = requests.get(f"{base_url}/_fake/stats", timeout=5).json()
+    summary["resilience"] = onestore_resilience.state()
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--onestore-url", default=None, help="이미 실행 중인 대역 서버 (기본: 새로 실행)")
+    parser.add_argument("--port", type=int, default=18443)
+    parser.add_argument("--fake-args", default="", help="fake_onestore.py 에 넘길 인자")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workdir", default=None)
+    parser.add_argument("--output", default="consume_result.json")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    common.use_workdir(os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="webshop-consume-")))
+
+    process = None
+    base_url = args.onestore_url
+    if base_url is None:
+        base_url = f"http://127.0.0.1:{args.port}"
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(common.REPO_ROOT, "benchmarks", "fake_onestore.py"), "--port", str(args.port)]
+            + shlex.split(args.fake_args)
+        )
+    try:
+        _wait_ready(base_url)
+        requests.delete(f"{base_url}/_fake/calls", timeout=5)
+        _register_env(base_url)
+        result = _run(args, base_url)
+        config = requests.get(f"{base_url}/_fake/config", timeout=5).json()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    print(result)
+    common.write_report(output, {
+        "benchmark": "consume",
+        "config": {"requests": args.requests, "concurrency": args.concurrency, "upstream": config},
+        "environment": common.environment_info(),
+        "results": {"consume": result},
+    })
+
+
+if __name__ == "__main__":
+    main()
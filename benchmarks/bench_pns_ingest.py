@@ -0,0 +1,79 @@
+"""
+PNS 본문 처리 마이크로 벤치마크 (기존 방식 vs 단일 파싱)
+
+기존: FastAPI 스키마 파싱 + json.loads + model_validate + OrderedDict 파싱/json.dumps 재구성
+단일 파싱: json.loads 한 번 + 원문에서 signature 잘라내기 + 같은 dict로 model_validate
+
+RSA 검증은 두 방식이 같으므로 제외하고 파싱/메시지 재구성 비용만 측정한다.
+
+실행: python benchmarks/bench_pns_ingest.py [반복 횟수]
+"""
+import json
+import os
+import sys
+import timeit
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import schemas  # noqa: E402
+from verify_onestore_webhook import _canonical_message, splice_signature  # noqa: E402
+
+PAYLOAD = {
+    "msgVersion": "3.1.0",
+    "clientId": "0000000000",
+    "productId": "gem0010000",
+    "messageType": "SINGLE_PAYMENT_TRANSACTION",
+    "purchaseId": "SANDBOX3000000000000",
+    "developerPayload": "20260101000000:0000000000:user0001:server01:gem0010000",
+    "purchaseTimeMillis": 1767225600000,
+    "purchaseState": "COMPLETED",
+    "price": "1000",
+    "priceCurrencyCode": "KRW",
+    "productName": "보석 100개",
+    "paymentTypeList": [{"paymentMethod": "DCB", "amount": "1000"}],
+    "billingKey": None,
+    "isTestMdn": False,
+    "purchaseToken": "TOKEN0000000000000000000000000000",
+    "environment": "SANDBOX",
+    "marketCode": "MKT_ONE",
+    "serviceUserId": "user0001",
+    "serviceServerId": "server01",
+    "signature": "A" * 342 + "==",
+}
+BODY = json.dumps(PAYLOAD, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def legacy() -> None:
+    raw_json = BODY.decode("utf-8")
+    schemas.OnestorePNSRequest.model_validate_json(BODY)  # FastAPI 본문 파라미터
+    payload = json.loads(raw_json)
+    schemas.OnestorePNSRequest.model_validate(payload)
+    data = json.loads(raw_json, object_pairs_hook=OrderedDict)
+    del data["signature"]
+    json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def single_parse() -> None:
+    raw_json = BODY.decode("utf-8")
+    payload = json.loads(raw_json)
+    message = splice_signature(BODY)
+    schemas.OnestorePNSRequest.model_validate(payload)
+    assert message is not None
+
+
+def main() -> None:
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    assert splice_signature(BODY) == _canonical_message(PAYLOAD)
+
+    results = {}
+    for name, func in (("legacy", legacy), ("single_parse", single_parse)):
+        best = min(timeit.repeat(func, number=number, repeat=5))
+        results[name] = best / number * 1e6
+        print(f"{name:>12}: {results[name]:8.2f} us/request")
+    print(f"{'saved':>12}: {results['legacy'] - results['single_parse']:8.2f} us/request "
+          f"({(1 - results['single_parse'] / results['legacy']) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
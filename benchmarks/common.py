@@ -0,0 +1,138 @@
+"""
+벤치마크 공통 도구
+
+- 테스트용 RSA 키쌍 생성 및 원스토어 형식 서명
+- PNS / gameuser/check 요청 본문 생성
+- 지연 시간 백분위 계산, 결과 JSON 저장
+"""
+import base64
+import json
+import math
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Optional
+
+from Crypto.Hash import SHA512
+from Crypto.PublicKey import RSA
+from Crypto.Signature import PKCS1_v1_5
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCH_CLIENT_ID = "BENCH00001"
+BENCH_GAME_ID = BENCH_CLIENT_ID
+
+
+def use_workdir(workdir: str) -> None:
+    """
+    앱을 workdir에서 실행하도록 설정 (로컬 환경의 DB는 ./data 아래에 생성됨)
+    반드시 database / main 모듈을 import 하기 전에 호출
+    """
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+
+class Signer:
+    """원스토어와 같은 방식(SHA512withRSA, 공백 없는 JSON)으로 서명하는 테스트 키"""
+
+    def __init__(self, bits: int = 2048):
+        self._key = RSA.generate(bits)
+        self._signer = PKCS1_v1_5.new(self._key)
+
+    @property
+    def license_key(self) -> str:
+        """/onestore/env 에 등록할 공개키 (Base64 DER)"""
+        return base64.b64encode(self._key.publickey().export_key("DER")).decode("ascii")
+
+    def sign(self, payload: dict) -> dict:
+        message = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        signature = self._signer.sign(SHA512.new(message))
+        signed = dict(payload)
+        signed["signature"] = base64.b64encode(signature).decode("ascii")
+        return signed
+
+    def sign_body(self, payload: dict) -> bytes:
+        return json.dumps(self.sign(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def env_request(signer: Signer, client_id: str = BENCH_CLIENT_ID, domain: str = "localhost") -> dict:
+    """POST /onestore/env 요청 본문"""
+    return {
+        "client_id": client_id,
+        "license_key": signer.license_key,
+        "client_secret": "bench-secret",
+        "pns_sandbox_domain": domain,
+        "pns_commercial_domain": domain,
+    }
+
+
+def pns_payload(purchase_id: str, client_id: str = BENCH_CLIENT_ID, state: str = "COMPLETED") -> dict:
+    return {
+        "msgVersion": "3.1.0",
+        "clientId": client_id,
+        "productId": "gem0010000",
+        "messageType": "SINGLE_PAYMENT_TRANSACTION",
+        "purchaseId": purchase_id,
+        "developerPayload": f"bench:{purchase_id}",
+        "purchaseTimeMillis": int(time.time() * 1000),
+        "purchaseState": state,
+        "price": "1000",
+        "priceCurrencyCode": "KRW",
+        "productName": "보석 100개",
+        "paymentTypeList": [{"paymentMethod": "DCB", "amount": "1000"}],
+        "isTestMdn": False,
+        "purchaseToken": f"TOKEN{purchase_id}",
+        "environment": "SANDBOX",
+        "marketCode": "MKT_ONE",
+        "serviceUserId": "user00001",
+        "serviceServerId": "server01",
+    }
+
+
+def check_payload(user_id: str, client_id: str = BENCH_CLIENT_ID, server_id: Optional[str] = None) -> dict:
+    param = {"clientId": client_id, "prodId": "gem0010000", "serviceUserId": user_id}
+    if server_id:
+        param["serviceServerId"] = server_id
+    return {"param": param}
+
+
+def percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    # nearest-rank
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], elapsed: float, statuses: Dict[str, int]) -> dict:
+    """지연 시간 목록(초) -> 처리량, 백분위(ms)"""
+    values = sorted(latencies)
+    ms = lambda v: round(v * 1000, 3) if v is not None else None  # noqa: E731
+    return {
+        "requests": len(values),
+        "throughput": round(len(values) / elapsed, 2) if elapsed > 0 else None,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1] if values else None),
+        "mean_ms": ms(sum(values) / len(values) if values else None),
+        "statuses": statuses,
+    }
+
+
+def environment_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_report(path: str, report: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"결과 저장: {path}")
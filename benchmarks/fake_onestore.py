@@ -0,0 +1,329 @@
+"""
+원스토어 API 대역 서버 (로컬 테스트 / 벤치마크용)
+
+webshop_consume.py 가 호출하는 두 API를 흉내낸다.
+- POST /v2/oauth/token                                   : client_credentials 토큰 발급 (expires_in 설정 가능)
+- POST /v7/apps/{client_id}/purchases/inapp/products/{product_id}/{purchase_token}/consume
+
+엔드포인트별로 지연 시간 분포, 오류(5xx) 비율, 429 비율, 타임아웃(응답 지연) 비율을 주입할 수 있고,
+받은 호출은 메모리에 기록해 /_fake/calls, /_fake/stats 로 확인한다.
+
+사용:
+    python benchmarks/fake_onestore.py --port 18443 --consume-latency lognormal:80:0.5 --error-rate 0.05
+    # /onestore/env 의 pns_sandbox_domain / pns_commercial_domain 을 http://127.0.0.1:18443 으로 등록
+
+실행 중 설정 변경:
+    curl -X PUT localhost:18443/_fake/config -H 'content-type: application/json' \\
+         -d '{"consume": {"rate_429": 0.5, "retry_after": 2}}'
+
+지연 시간 분포 (단위 ms):
+    fixed:50 | uniform:10:100 | normal:50:10 | lognormal:<중앙값>:<sigma> | exp:<평균>
+"""
+import argparse
+import asyncio
+import math
+import random
+import secrets
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+from urllib.parse import parse_qs
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# 기록할 최근 호출 수
+CALL_LOG_SIZE = 10000
+
+
+class LatencyDistribution:
+    """"lognormal:80:0.5" 형식 지연 시간 분포 (ms)"""
+
+    def __init__(self, spec: str = "fixed:0"):
+        self.spec = spec
+        kind, _, rest = spec.partition(":")
+        params = [float(v) for v in rest.split(":") if v] if rest else []
+        if kind in ("", "none"):
+            kind, params = "fixed", [0.0]
+        if kind.replace(".", "", 1).isdigit():
+            # 숫자만 주면 고정 지연
+            kind, params = "fixed", [float(kind)]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+        if kind not in expected or len(params) != expected[kind]:
+            raise ValueError(f"지원하지 않는 지연 시간 분포: {spec}")
+        self._kind = kind
+        self._params = params
+
+    def sample(self, rng: random.Random) -> float:
+        """지연 시간(초)"""
+        p = self._params
+        if self._kind == "fixed":
+            ms = p[0]
+        elif self._kind == "uniform":
+            ms = rng.uniform(p[0], p[1])
+        elif self._kind == "normal":
+            ms = rng.gauss(p[0], p[1])
+        elif self._kind == "lognormal":
+            ms = rng.lognormvariate(math.log(max(p[0], 1e-6)), p[1])
+        else:
+            ms = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, ms) / 1000
+
+
+class EndpointBehavior:
+    """엔드포인트 하나의 주입 설정"""
+
+    FIELDS = ("latency", "error_rate", "error_status", "rate_429", "retry_after", "timeout_rate", "timeout_seconds")
+
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_429: float = 0.0,
+        retry_after: Optional[float] = 1,
+        timeout_rate: float = 0.0,
+        timeout_seconds: float = 60.0,
+    ):
+        self.latency = LatencyDistribution(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+
+    def update(self, values: dict) -> None:
+        for key, value in values.items():
+            if key not in self.FIELDS:
+                raise ValueError(f"알 수 없는 설정: {key}")
+            setattr(self, key, LatencyDistribution(value) if key == "latency" else value)
+
+    def to_dict(self) -> dict:
+        return {key: (self.latency.spec if key == "latency" else getattr(self, key)) for key in self.FIELDS}
+
+
+class FakeOnestore:
+    """대역 서버 상태 (설정, 발급한 토큰, 호출 기록)"""
+
+    def __init__(self, expires_in: int = 3600, validate_tokens: bool = True, seed: Optional[int] = None):
+        self.expires_in = expires_in
+        self.validate_tokens = validate_tokens
+        self.behaviors: Dict[str, EndpointBehavior] = {"token": EndpointBehavior(), "consume": EndpointBehavior()}
+        self._rng = random.Random(seed)
+        self._tokens: Dict[str, float] = {}
+        self._calls: Deque[dict] = deque(maxlen=CALL_LOG_SIZE)
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._consumed: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def config(self) -> dict:
+        return {
+            "expires_in": self.expires_in,
+            "validate_tokens": self.validate_tokens,
+            **{name: behavior.to_dict() for name, behavior in self.behaviors.items()},
+        }
+
+    def update_config(self, values: dict) -> None:
+        for key, value in values.items():
+            if key in self.behaviors:
+                self.behaviors[key].update(value)
+            elif key in ("expires_in", "validate_tokens"):
+                setattr(self, key, value)
+            else:
+                raise ValueError(f"알 수 없는 설정: {key}")
+
+    def decide(self, endpoint: str):
+        """(지연 시간(초), 주입할 결과) - 결과: None(정상) / "timeout" / "429" / "error" """
+        behavior = self.behaviors[endpoint]
+        with self._lock:
+            delay = behavior.latency.sample(self._rng)
+            roll = self._rng.random()
+        if roll < behavior.timeout_rate:
+            return behavior.timeout_seconds, "timeout"
+        roll -= behavior.timeout_rate
+        if roll < behavior.rate_429:
+            return delay, "429"
+        roll -= behavior.rate_429
+        if roll < behavior.error_rate:
+            return delay, "error"
+        return delay, None
+
+    def issue_token(self) -> str:
+        token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._tokens[token] = time.time() + self.expires_in
+        return token
+
+    def token_valid(self, authorization: Optional[str]) -> bool:
+        if not self.validate_tokens:
+            return True
+        if not authorization or not authorization.startswith("Bearer "):
+            return False
+        expires_at = self._tokens.get(authorization[len("Bearer "):])
+        return expires_at is not None and time.time() < expires_at
+
+    def record(self, endpoint: str, status: int, started: float, **attrs) -> None:
+        entry = {
+            "ts": time.time(),
+            "endpoint": endpoint,
+            "status": status,
+            "latencyMs": round((time.perf_counter() - started) * 1000, 3),
+            **attrs,
+        }
+        with self._lock:
+            self._calls.append(entry)
+            self._counts[endpoint][str(status)] += 1
+            if endpoint == "consume" and status == 200:
+                self._consumed[attrs.get("purchase_token", "")] += 1
+
+    def calls(self, limit: int, endpoint: Optional[str] = None) -> list:
+        with self._lock:
+            calls = [c for c in self._calls if endpoint is None or c["endpoint"] == endpoint]
+        return calls[-limit:]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "counts": {endpoint: dict(statuses) for endpoint, statuses in self._counts.items()},
+                "consumedPurchases": len(self._consumed),
+                # 같은 구매를 두 번 이상 consume 한 경우 (재시도 중복)
+                "duplicateConsumes": sum(count - 1 for count in self._consumed.values() if count > 1),
+                "issuedTokens": len(self._tokens),
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._counts.clear()
+            self._consumed.clear()
+
+
+def create_app(state: FakeOnestore) -> FastAPI:
+    app = FastAPI(title="Fake OneStore API")
+
+    async def _inject(endpoint: str, started: float, **attrs) -> Optional[JSONResponse]:
+        delay, outcome = state.decide(endpoint)
+        if delay:
+            await asyncio.sleep(delay)
+        if outcome == "timeout":
+            # 클라이언트 타임아웃보다 길게 잡아 두면 클라이언트 쪽에서 끊는다
+            state.record(endpoint, 504, started, injected="timeout", **attrs)
+            return JSONResponse({"code": "TIMEOUT", "message": "injected timeout"}, status_code=504)
+        if outcome == "429":
+            behavior = state.behaviors[endpoint]
+            headers = {"Retry-After": str(behavior.retry_after)} if behavior.retry_after is not None else {}
+            state.record(endpoint, 429, started, injected="429", **attrs)
+            return JSONResponse({"code": "TOO_MANY_REQUESTS", "message": "injected 429"}, status_code=429, headers=headers)
+        if outcome == "error":
+            status = state.behaviors[endpoint].error_status
+            state.record(endpoint, status, started, injected="error", **attrs)
+            return JSONResponse({"code": "SERVER_ERROR", "message": "injected error"}, status_code=status)
+        return None
+
+    @app.post("/v2/oauth/token")
+    async def issue_token(request: Request):
+        started = time.perf_counter()
+        # application/x-www-form-urlencoded (python-multipart 없이 직접 파싱)
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode("utf-8")).items()}
+        client_id = form.get("client_id", "")
+        injected = await _inject("token", started, client_id=client_id)
+        if injected is not None:
+            return injected
+        if form.get("grant_type") != "client_credentials" or not client_id or not form.get("client_secret"):
+            state.record("token", 400, started, client_id=client_id)
+            return JSONResponse({"error": "invalid_request"}, status_code=400)
+        state.record("token", 200, started, client_id=client_id)
+        return {
+            "client_id": client_id,
+            "access_token": state.issue_token(),
+            "token_type": "bearer",
+            "expires_in": state.expires_in,
+            "scope": "DEFAULT",
+        }
+
+    @app.post("/v7/apps/{client_id}/purchases/inapp/products/{product_id}/{purchase_token}/consume")
+    async def consume(client_id: str, product_id: str, purchase_token: str, request: Request):
+        started = time.perf_counter()
+        attrs = {"client_id": client_id, "product_id": product_id, "purchase_token": purchase_token}
+        injected = await _inject("consume", started, **attrs)
+        if injected is not None:
+            return injected
+        if not state.token_valid(request.headers.get("authorization")):
+            state.record("consume", 401, started, **attrs)
+            return JSONResponse({"code": "UNAUTHORIZED", "message": "invalid access token"}, status_code=401)
+        try:
+            body = await request.json()
+        except ValueError:
+            body = {}
+        state.record("consume", 200, started, developerPayload=body.get("developerPayload"), **attrs)
+        return {"result": {"code": "0000", "message": "Success"}}
+
+    @app.get("/_fake/config")
+    def get_config():
+        return state.config()
+
+    @app.put("/_fake/config")
+    async def put_config(request: Request):
+        try:
+            state.update_config(await request.json())
+        except (ValueError, TypeError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return state.config()
+
+    @app.get("/_fake/calls")
+    def get_calls(limit: int = 100, endpoint: Optional[str] = None):
+        return state.calls(limit, endpoint)
+
+    @app.get("/_fake/stats")
+    def get_stats():
+        return state.stats()
+
+    @app.delete("/_fake/calls")
+    def reset_calls():
+        state.reset()
+        return state.stats()
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18443)
+    parser.add_argument("--expires-in", type=int, default=3600, help="발급 토큰 유효 시간(초)")
+    parser.add_argument("--no-validate-tokens", action="store_true", help="consume 시 토큰 검사 생략")
+    parser.add_argument("--token-latency", default="fixed:0")
+    parser.add_argument("--consume-latency", default="fixed:0")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="consume 5xx 비율")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="consume 429 비율")
+    parser.add_argument("--retry-after", type=float, default=1)
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="consume 응답 지연(타임아웃) 비율")
+    parser.add_argument("--timeout-seconds", type=float, default=60.0)
+    parser.add_argument("--token-error-rate", type=float, default=0.0, help="토큰 발급 5xx 비율")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    state = FakeOnestore(expires_in=args.expires_in, validate_tokens=not args.no_validate_tokens, seed=args.seed)
+    state.behaviors["token"].update({"latency": args.token_latency, "error_rate": args.token_error_rate})
+    state.behaviors["consume"].update({
+        "latency": args.consume_latency,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+        "rate_429": args.rate_429,
+        "retry_after": args.retry_after,
+        "timeout_rate": args.timeout_rate,
+        "timeout_seconds": args.timeout_seconds,
+    })
+    uvicorn.run(create_app(state), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+엔드포인트 부하 테스트
+
+테스트 키쌍을 /onestore/env 에 등록하고, 서명된 PNS / gameuser/check 요청과
+서버 목록 조회를 지정한 동시성으로 보낸 뒤 엔드포인트별 처리량과 p50/p95/p99를 JSON으로 저장한다.
+
+실행 예:
+    python benchmarks/load_test.py --mode inprocess --concurrency 32 --requests 2000
+    python benchmarks/load_test.py --mode uvicorn --workers 1 --concurrency 64 --duration 30
+    python benchmarks/load_test.py --mode url --url http://localhost:8080 --endpoints check
+
+필요 패키지: benchmarks/requirements.txt
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common  # noqa: E402
+
+ENDPOINTS = ("pns", "check", "serverlist")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("inprocess", "uvicorn", "url"), default="inprocess")
+    parser.add_argument("--url", default="http://127.0.0.1:8080", help="--mode url 일 때 대상 서버")
+    parser.add_argument("--port", type=int, default=18080, help="--mode uvicorn 일 때 사용할 포트")
+    parser.add_argument("--workers", type=int, default=1, help="--mode uvicorn 워커 수")
+    parser.add_argument("--workdir", default=None, help="DB를 만들 작업 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="pns,check,serverlist 중 선택")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="엔드포인트별 요청 수")
+    parser.add_argument("--duration", type=float, default=None, help="지정 시 요청 수 대신 시간(초) 기준으로 실행")
+    parser.add_argument("--users", type=int, default=10000, help="미리 등록할 게임 사용자 수")
+    parser.add_argument("--servers", type=int, default=50, help="미리 등록할 게임 서버 수")
+    parser.add_argument("--check-miss-ratio", type=float, default=0.3, help="등록되지 않은 사용자 조회 비율")
+    parser.add_argument("--check-bodies", type=int, default=500, help="미리 서명해 둘 check 요청 수")
+    parser.add_argument("--pns-duplicate-ratio", type=float, default=0.0, help="재전송(중복 purchaseId) 비율")
+    parser.add_argument("--consume-worker", action="store_true", help="consume 작업 워커 실행 (uvicorn 모드)")
+    parser.add_argument(
+        "--onestore-url", default="localhost",
+        help="등록할 pns 도메인 (예: benchmarks/fake_onestore.py 주소 http://127.0.0.1:18443)",
+    )
+    parser.add_argument("--output", default="load_test_result.json")
+    return parser.parse_args()
+
+
+class _RequestSource:
+    """엔드포인트별 요청 본문 생성 (서명은 측정 전에 미리 해 둔다)"""
+
+    def __init__(self, signer: common.Signer, args: argparse.Namespace, total_pns: int):
+        self._args = args
+        rng = random.Random(42)
+        bodies = []
+        for i in range(args.check_bodies):
+            if rng.random() < args.check_miss_ratio:
+                user_id = f"missing{i:06d}"
+            else:
+                user_id = f"user{rng.randrange(args.users):08d}"
+            bodies.append(signer.sign_body(common.check_payload(user_id)))
+        self._check = itertools.cycle(bodies)
+
+        run_id = f"{int(time.time())}{os.getpid()}"
+        self._pns: List[bytes] = [
+            signer.sign_body(common.pns_payload(f"BENCH{run_id}{i:08d}")) for i in range(total_pns)
+        ]
+        self._pns_index = 0
+        self._rng = rng
+
+    def next(self, endpoint: str):
+        if endpoint == "check":
+            return "POST", "/gameuser/check", next(self._check)
+        if endpoint == "serverlist":
+            return "POST", "/onestore_webshop/serverlist", (
+                b'{"param":{"clientId":"' + common.BENCH_CLIENT_ID.encode() + b'"}}'
+            )
+        # pns
+        if self._pns_index and self._rng.random() < self._args.pns_duplicate_ratio:
+            body = self._pns[self._rng.randrange(self._pns_index)]
+        else:
+            body = self._pns[self._pns_index % len(self._pns)]
+            self._pns_index += 1
+        return "POST", "/onestore_pns/notification", body
+
+
+async def _setup(client: httpx.AsyncClient, signer: common.Signer, args: argparse.Namespace) -> None:
+    env_request = common.env_request(signer, domain=args.onestore_url)
+    response = await client.post("/onestore/env", json=env_request)
+    if response.status_code == 400:
+        # 이미 등록된 경우 키 갱신
+        response = await client.put(f"/onestore/env/{common.BENCH_CLIENT_ID}", json=env_request)
+    response.raise_for_status()
+
+    servers = [{"serviceServerId": f"server{i:02d}", "serviceServerName": f"서버 {i}"} for i in range(args.servers)]
+    (await client.post("/gameserver/create", json={"game_id": common.BENCH_GAME_ID, "serverList": servers})).raise_for_status()
+
+    batch = 5000
+    for start in range(0, args.users, batch):
+        users = [{"user_id": f"user{i:08d}"} for i in range(start, min(args.users, start + batch))]
+        response = await client.post("/gameuser/create", json={"game_id": common.BENCH_GAME_ID, "userList": users})
+        response.raise_for_status()
+
+
+async def _run_endpoint(
+    client: httpx.AsyncClient, source: _RequestSource, endpoint: str, args: argparse.Namespace
+) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = defaultdict(int)
+    remaining = itertools.count()
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    async def _worker():
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return
+            elif next(remaining) >= args.requests:
+                return
+            method, path, body = source.next(endpoint)
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    method, path, content=body, headers={"content-type": "application/json"}
+                )
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_worker() for _ in range(args.concurrency)))
+    return common.summarize(latencies, time.perf_counter() - started, dict(statuses))
+
+
+async def _drive(client: httpx.AsyncClient, args: argparse.Namespace) -> dict:
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"알 수 없는 엔드포인트: {sorted(unknown)}")
+
+    signer = common.Signer()
+    await _setup(client, signer, args)
+    # 시간 기준 실행 시 PNS 본문이 모자라지 않도록 넉넉히 준비 (모자라면 재사용 = 중복 처리)
+    total_pns = args.requests if not args.duration else max(args.requests, 5000)
+    source = _RequestSource(signer, args, total_pns if "pns" in endpoints else 0)
+
+    results = {}
+    for endpoint in endpoints:
+        print(f"[{endpoint}] 실행 중 (concurrency={args.concurrency})")
+        results[endpoint] = await _run_endpoint(client, source, endpoint, args)
+        print(f"[{endpoint}] {results[endpoint]}")
+    return results
+
+
+async def _run_inprocess(args: argparse.Namespace) -> dict:
+    common.use_workdir(args.workdir)
+    import main  # noqa: E402 - 작업 디렉터리 지정 후 import
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await _drive(client, args)
+
+
+async def _wait_ready(client: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("서버가 시작되지 않았습니다")
+
+
+async def _run_uvicorn(args: argparse.Namespace) -> dict:
+    env = dict(os.environ)
+    env.setdefault("ENV", "local")
+    env["PYTHONPATH"] = common.REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    if not args.consume_worker:
+        env["CONSUME_WORKER_ENABLED"] = "0"
+    os.makedirs(args.workdir, exist_ok=True)
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(args.port),
+            "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=args.workdir,
+        env=env,
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await _wait_ready(client)
+            return await _drive(client, args)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+async def _run_url(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        await _wait_ready(client)
+        return await _drive(client, args)
+
+
+def main() -> None:
+    args = _parse_args()
+    args.workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="webshop-bench-"))
+    output = os.path.abspath(args.output)
+
+    runner = {"inprocess": _run_inprocess, "uvicorn": _run_uvicorn, "url": _run_url}[args.mode]
+    results = asyncio.run(runner(args))
+
+    common.write_report(output, {
+        "benchmark": "load_test",
+        "config": {
+            key: getattr(args, key)
+            for key in ("mode", "workers", "concurrency", "requests", "duration", "users", "servers",
+                        "check_miss_ratio", "pns_duplicate_ratio")
+        },
+        "environment": common.environment_info(),
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+핫 패스 마이크로 벤치마크
+
+- verify: _verify_with_license_key (원문 서명 잘라내기 경로)
+- bulk_users: bulk_upsert_game_users (임시 DB에 신규 삽입 / 같은 데이터 재전송)
+- serverlist: 서버 목록 직렬화 (pydantic 응답 모델 vs 캐시된 bytes 조립)
+
+실행: python benchmarks/micro.py [--only verify,bulk_users,serverlist] [--output micro_result.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import common  # noqa: E402
+
+BENCHMARKS = ("verify", "bulk_users", "serverlist")
+
+
+def _measure(fn: Callable[[], object], repeat: int, warmup: int = 3) -> dict:
+    """fn을 repeat번 실행해 호출당 지연 시간 요약"""
+    for _ in range(warmup):
+        fn()
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call_started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - call_started)
+    return common.summarize(latencies, time.perf_counter() - started, {})
+
+
+def bench_verify(repeat: int) -> dict:
+    from verify_onestore_webhook import _verify_with_license_key
+
+    signer = common.Signer()
+    body = signer.sign_body(common.pns_payload("BENCH0000000001"))
+    raw = body.decode("utf-8")
+    payload = json.loads(raw)
+
+    def _verify():
+        assert _verify_with_license_key(raw, common.BENCH_CLIENT_ID, signer.license_key, payload)
+
+    return {"verify_onestore_webhook": _measure(_verify, repeat)}
+
+
+def bench_bulk_users(repeat: int, users: int) -> dict:
+    import models
+    import schemas
+    from database import Base, SessionLocal, engine
+    from sqlalchemy import delete
+    from webshop_bulk import bulk_upsert_game_users
+
+    Base.metadata.create_all(bind=engine)
+    user_list = [schemas.GameUser(user_id=f"user{i:08d}", server_id="server01") for i in range(users)]
+
+    def _insert():
+        with SessionLocal() as db:
+            db.execute(delete(models.GameUser).where(models.GameUser.game_id == common.BENCH_GAME_ID))
+            db.commit()
+            bulk_upsert_game_users(db, common.BENCH_GAME_ID, user_list)
+
+    def _resend():
+        # 변경 없는 재전송 (ON CONFLICT 경로)
+        with SessionLocal() as db:
+            bulk_upsert_game_users(db, common.BENCH_GAME_ID, user_list)
+
+    return {
+        f"bulk_upsert_game_users[insert {users}]": _measure(_insert, repeat, warmup=1),
+        f"bulk_upsert_game_users[resend {users}]": _measure(_resend, repeat, warmup=1),
+    }
+
+
+def bench_serverlist(repeat: int, servers: int) -> dict:
+    import schemas
+    from webshop_api import _game_server_row_to_dict
+    from webshop_server_list_cache import CachedServerList
+
+    class _Row:
+        __slots__ = ("id", "server_id", "server_name")
+
+        def __init__(self, i: int):
+            self.id = i
+            self.server_id = f"server{i:04d}"
+            self.server_name = f"서버 {i}"
+
+    rows = [_Row(i) for i in range(servers)]
+    message = "Game servers retrieved successfully"
+
+    def _pydantic():
+        items = [schemas.GameServerItem.model_validate(row) for row in rows]
+        return schemas.GameServerListResponse(
+            result=schemas.ResponseResult(code="0000", message=message), serverList=items
+        ).model_dump_json(by_alias=True)
+
+    def _dumps():
+        return json.dumps(
+            [_game_server_row_to_dict(row) for row in rows], ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    server_list_json = _dumps()
+
+    def _render(data: bytes) -> bytes:
+        result = schemas.ResponseResult(code="0000", message=message).model_dump_json().encode("utf-8")
+        return b'{"result":' + result + b',"serverList":' + data + b"}"
+
+    def _render_once():
+        # 캐시 갱신 직후 첫 응답 (본문 조립)
+        return CachedServerList(1, server_list_json, '"bench"').body(_render, message)
+
+    entry = CachedServerList(1, server_list_json, '"bench"')
+
+    def _cached():
+        # 캐시 적중 시 경로 (응답 bytes 재사용)
+        return entry.body(_render, message)
+
+    return {
+        f"serverlist[pydantic {servers}]": _measure(_pydantic, repeat),
+        f"serverlist[json.dumps {servers}]": _measure(_dumps, repeat),
+        f"serverlist[render {servers}]": _measure(_render_once, repeat),
+        f"serverlist[cached bytes {servers}]": _measure(_cached, repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="verify,bulk_users,serverlist 중 선택")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--users", type=int, default=10000, help="bulk_users 한 번에 넣을 사용자 수")
+    parser.add_argument("--bulk-repeat", type=int, default=5)
+    parser.add_argument("--servers", type=int, default=200, help="serverlist 서버 수")
+    parser.add_argument("--workdir", default=None, help="임시 DB를 만들 작업 디렉터리")
+    parser.add_argument("--output", default="micro_result.json")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    common.use_workdir(os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="webshop-micro-")))
+
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    results = {}
+    for name in selected:
+        if name == "verify":
+            results.update(bench_verify(args.repeat))
+        elif name == "bulk_users":
+            results.update(bench_bulk_users(args.bulk_repeat, args.users))
+        elif name == "serverlist":
+            results.update(bench_serverlist(args.repeat, args.servers))
+        else:
+            raise SystemExit(f"알 수 없는 벤치마크: {name}")
+
+    for name, summary in results.items():
+        print(f"{name}: p50={summary['p50_ms']}ms p99={summary['p99_ms']}ms mean={summary['mean_ms']}ms")
+
+    common.write_report(output, {
+        "benchmark": "micro",
+        "config": {"repeat": args.repeat, "users": args.users, "servers": args.servers},
+        "environment": common.environment_info(),
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    main()
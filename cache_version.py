@@ -0,0 +1,57 @@
+import os
+import threading
+import time
+import logging
+from typing import Dict
+from sqlalchemy.orm import Session
+import models
+from database import dialect
+
+logger = logging.getLogger(__name__)
+
+# 다른 워커의 변경을 확인하는 주기(초). 같은 프로세스의 변경은 즉시 반영된다.
+CACHE_VERSION_CHECK_INTERVAL = float(os.getenv("CACHE_VERSION_CHECK_INTERVAL", "1.0"))
+
+
+def bump_version(db: Session, key: str) -> None:
+    """
+    캐시 버전 증가 (commit은 호출자가 데이터 변경과 같은 트랜잭션으로 수행)
+    """
+    stmt = dialect.insert(models.CacheVersion).values(key=key, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.CacheVersion.key],
+        set_={"version": models.CacheVersion.version + 1},
+    )
+    db.execute(stmt)
+
+
+class VersionTracker:
+    """
+    cache_versions 테이블 전체를 주기적으로 읽어 두고, 캐시별 최신 버전을 돌려준다.
+
+    한 번의 조회로 모든 캐시의 버전을 확인하므로 요청마다 쿼리가 나가지 않는다.
+    """
+
+    def __init__(self, interval: float = CACHE_VERSION_CHECK_INTERVAL):
+        self._interval = interval
+        self._versions: Dict[str, int] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def current(self, db: Session, key: str) -> int:
+        if time.monotonic() - self._checked_at >= self._interval:
+            self.refresh(db)
+        return self._versions.get(key, 0)
+
+    def refresh(self, db: Session) -> None:
+        rows = db.query(models.CacheVersion.key, models.CacheVersion.version).all()
+        with self._lock:
+            self._versions = {key: version for key, version in rows}
+            self._checked_at = time.monotonic()
+
+    def expire(self) -> None:
+        """다음 current() 호출 시 DB에서 다시 읽도록 함 (로컬 변경 직후)"""
+        self._checked_at = 0.0
+
+
+version_tracker = VersionTracker()
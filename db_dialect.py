@@ -0,0 +1,130 @@
+import os
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import URL, make_url
+
+# SQLite 성능 설정
+# performance: WAL + 아래 pragma 적용 / default: SQLite 기본값 그대로 사용
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "performance")
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# 음수는 KiB 단위 (-20000 = 약 20MB)
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-20000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024)))
+
+# PostgreSQL 문장 최대 실행 시간(ms) - 0이면 서버 설정 사용
+PG_STATEMENT_TIMEOUT_MS = int(os.getenv("PG_STATEMENT_TIMEOUT_MS", "0"))
+
+
+class SQLiteDialect:
+    """
+    SQLite (단일 파일)
+
+    - 쓰기는 단일 연결로 직렬화해 잠금 경합("database is locked")을 피한다
+    - 조회 전용 연결은 mode=ro URI로 연다
+    """
+
+    name = "sqlite"
+    async_driver = "aiosqlite"
+    # 연결 풀 기본값 (DB_* 환경 변수로 변경)
+    write_pool_size = 1
+    write_max_overflow = 0
+    pool_pre_ping = False
+    connect_args = {"check_same_thread": False}
+
+    def insert(self, table):
+        """on_conflict_do_nothing / on_conflict_do_update / returning 을 지원하는 INSERT"""
+        return sqlite.insert(table)
+
+    def read_only_url(self, url: URL) -> URL:
+        if url.database in (None, "", ":memory:"):
+            return url
+        return url.set(database=f"file:{url.database}", query={**url.query, "mode": "ro", "uri": "true"})
+
+    def prepare(self, url: URL) -> None:
+        """DB 파일 디렉터리 생성"""
+        if url.database and url.database != ":memory:":
+            directory = os.path.dirname(url.database)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    def configure(self, engine, read_only: bool = False) -> None:
+        if SQLITE_PROFILE != "performance":
+            return
+
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                # journal_mode는 DB 파일에 저장되므로 쓰기 연결에서만 설정
+                if not read_only:
+                    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+                cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+                cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+                cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+                cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+                cursor.execute("PRAGMA temp_store=MEMORY")
+            finally:
+                cursor.close()
+
+
+class PostgreSQLDialect:
+    """
+    PostgreSQL (서버 DB)
+
+    - 여러 프로세스/인스턴스가 동시에 써도 되므로 쓰기 연결 풀을 여러 개 사용
+    - 조회 전용 연결은 세션을 READ ONLY 트랜잭션으로 설정 (DATABASE_READ_URL로 복제본 지정 가능)
+    """
+
+    name = "postgresql"
+    async_driver = "asyncpg"
+    write_pool_size = 10
+    write_max_overflow = 10
+    pool_pre_ping = True
+    connect_args = {}
+
+    def insert(self, table):
+        return postgresql.insert(table)
+
+    def read_only_url(self, url: URL) -> URL:
+        return url
+
+    def prepare(self, url: URL) -> None:
+        pass
+
+    def configure(self, engine, read_only: bool = False) -> None:
+        if not read_only and not PG_STATEMENT_TIMEOUT_MS:
+            return
+
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            # asyncpg 어댑터도 DB-API cursor를 제공한다
+            cursor = dbapi_connection.cursor()
+            try:
+                if read_only:
+                    cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+                if PG_STATEMENT_TIMEOUT_MS:
+                    cursor.execute(f"SET statement_timeout = {PG_STATEMENT_TIMEOUT_MS}")
+            finally:
+                cursor.close()
+            # SET 문이 연 트랜잭션을 닫아 풀에 돌려줄 때의 상태를 깨끗하게 유지
+            dbapi_connection.commit()
+
+
+_DIALECTS = {
+    SQLiteDialect.name: SQLiteDialect,
+    PostgreSQLDialect.name: PostgreSQLDialect,
+}
+
+
+def get_dialect(url: str):
+    backend = make_url(url).get_backend_name()
+    if backend not in _DIALECTS:
+        raise ValueError(f"지원하지 않는 DATABASE_URL 백엔드입니다: {backend} (지원: {', '.join(_DIALECTS)})")
+    return _DIALECTS[backend]()
+
+
+def async_url(url: URL, dialect) -> URL:
+    """동기 URL의 드라이버만 async 드라이버로 교체"""
+    return url.set(drivername=f"{dialect.name}+{dialect.async_driver}")
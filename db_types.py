@@ -0,0 +1,54 @@
+import os
+import zlib
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+# zlib 압축 수준 (1: 빠름 ~ 9: 작음)
+COMPRESSED_TEXT_LEVEL = int(os.getenv("COMPRESSED_TEXT_LEVEL", "6"))
+
+# 저장 형식: 1바이트 표시 + 본문
+_RAW = b"\x00"  # 압축해도 줄지 않는 짧은 값 - UTF-8 그대로
+_ZLIB = b"\x01"
+
+
+def compress_text(value: str, level: int = COMPRESSED_TEXT_LEVEL) -> bytes:
+    data = value.encode("utf-8")
+    compressed = zlib.compress(data, level)
+    if len(compressed) < len(data):
+        return _ZLIB + compressed
+    return _RAW + data
+
+
+def decompress_text(value) -> str:
+    # 압축 전 저장된 행(TEXT)은 문자열 그대로 읽힌다
+    if isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value[:1] == _ZLIB:
+        return zlib.decompress(value[1:]).decode("utf-8")
+    return value[1:].decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """
+    zlib 압축 문자열 컬럼 (DB에는 BLOB/BYTEA로 저장, 파이썬에서는 str)
+
+    원본 JSON, 서명처럼 크고 조회 조건에 쓰지 않는 컬럼용 - 이 컬럼으로 검색/정렬할 수 없다.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def result_processor(self, dialect, coltype):
+        # impl(LargeBinary)의 bytes 변환을 거치지 않아야 압축 전 TEXT 행(str)도 그대로 읽을 수 있다
+        def process(value):
+            if value is None:
+                return None
+            return decompress_text(value)
+
+        return process
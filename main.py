@@ -1,33 +1,57 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
-from database import init_db
+from fastapi.responses import JSONResponse, PlainTextResponse
+from database import async_read_engine, dispose_async_engines, engine, init_db, read_engine
 from webshop_api import router as webshop_router
 from webshop_onestore_env_api import router as onestore_env_router
+from webshop_http_client import init_http_client, close_http_client
+from webshop_consume_outbox import consume_worker, CONSUME_WORKER_ENABLED
+from webshop_pns_writer import pns_writer
+from webshop_writer import DB_WRITER_REMOTE
+from webshop_logging import setup_logging
+from webshop_metrics import METRICS_CONTENT_TYPE, MetricsMiddleware, add_pool_collector, render_metrics
+from webshop_tracing import TracingMiddleware, instrument_engine, trace_buffer
 import logging
-import sys
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+
+# 로깅 설정 (큐 기반 - 포맷/출력은 백그라운드 스레드에서 처리)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
 
 
-# 데이터베이스 테이블 생성
-init_db()
+# 데이터베이스 테이블 생성 (멀티 워커에서는 쓰기 프로세스가 생성)
+if not DB_WRITER_REMOTE:
+    init_db()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 원스토어 외부 호출용 HTTP 클라이언트 (keep-alive 커넥션 풀)
+    init_http_client()
+    # PNS 처리와 분리된 consume 작업 큐 워커
+    # 멀티 워커(DB_WRITER_MODE=remote)에서는 쓰기 프로세스에서만 실행
+    if CONSUME_WORKER_ENABLED and not DB_WRITER_REMOTE:
+        consume_worker.start()
+    # PNS 저장 그룹 커밋 writer (PNS_GROUP_COMMIT_ENABLED=1 일 때만, 단일 프로세스 모드)
+    if not DB_WRITER_REMOTE:
+        pns_writer.start()
+    try:
+        yield
+    finally:
+        await pns_writer.stop()
+        consume_worker.stop()
+        close_http_client()
+        await dispose_async_engines()
+
 
 app = FastAPI(
     title="Test API",
     description="Google Cloud Run에서 실행되는 테스트용 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS 설정
@@ -39,6 +63,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청 수/지연 시간 지표
+app.add_middleware(MetricsMiddleware)
+add_pool_collector({
+    "write": lambda: engine.pool,
+    "read": lambda: read_engine.pool,
+    "async_read": lambda: async_read_engine.pool,
+})
+
+# 요청 단위 trace (SQL 문장별 span 포함)
+app.add_middleware(TracingMiddleware)
+instrument_engine(engine, "write")
+instrument_engine(read_engine, "read")
+instrument_engine(async_read_engine.sync_engine, "async_read")
+
 # 라우터 등록
 app.include_router(webshop_router, tags=["Webshop"])
 app.include_router(onestore_env_router, tags=["Onestore Environment"])
@@ -62,16 +100,26 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
+
+@app.get("/debug/traces", include_in_schema=False)
+def debug_traces(limit: int = Query(default=10, ge=1, le=100), name: str | None = None):
+    """최근 trace 중 가장 느린 limit개 (name: "POST /onestore_pns/notification" 등으로 필터)"""
+    return {"count": len(trace_buffer), "traces": trace_buffer.slowest(limit, name)}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text 형식 지표"""
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    # ❌ 실제 받은 요청 본문 출력 (여기서 문제 파악!)
+    # 실제 받은 요청 본문 출력 (여기서 문제 파악!) - 헤더/본문의 토큰·서명은 출력 시 가림
     body = await request.body()
-    print("== 422 ERROR ===")
-    print(f"Request URL: {request.url}")
-    print(f"Request Header: {request.headers}")
-    print(f"Request Body: {body.decode()}")
-    print(f"Validation Errors: {exc.errors()}")
-    print("==================")
+    logger.warning(
+        f"422 요청 검증 실패: url={request.url}, errors={exc.errors()}",
+        extra={"headers": dict(request.headers), "body": body.decode("utf-8", errors="replace")},
+    )
     
     # 기본 422 응답 반환
     return JSONResponse(
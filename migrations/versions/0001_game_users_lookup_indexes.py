@@ -0,0 +1,104 @@
+"""game_users 조회용 복합 인덱스 및 중복 방지 unique 인덱스
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+- uq_game_users_identity (game_id, user_id, server_id, coalesce(user_id2, '')): 중복 방지, /gameuser/check 조회
+- 위 인덱스로 대체되는 단일 컬럼 인덱스(game_id, user_id) 제거
+
+기존 중복 행은 id가 가장 작은 행만 남기고 배치 단위로 삭제한다.
+배치마다 commit 하므로 쓰기 잠금을 오래 잡지 않는다.
+PostgreSQL에서는 CREATE INDEX CONCURRENTLY를 사용한다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEDUPE_BATCH_SIZE = 5000
+
+_DEDUPE_SQL = sa.text(
+    """
+    DELETE FROM game_users WHERE id IN (
+        SELECT g.id FROM game_users g
+        WHERE EXISTS (
+            SELECT 1 FROM game_users o
+            WHERE o.game_id = g.game_id
+              AND o.user_id = g.user_id
+              AND o.server_id = g.server_id
+              AND coalesce(o.user_id2, '') = coalesce(g.user_id2, '')
+              AND o.id < g.id
+        )
+        LIMIT :batch_size
+    )
+    """
+)
+
+
+def _existing_indexes(table: str) -> set | None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table(table):
+        return None
+    if bind.dialect.name == "sqlite":
+        # SQLite 리플렉션은 표현식 인덱스(coalesce)를 건너뛰므로 직접 조회
+        rows = bind.execute(
+            sa.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            {"table": table},
+        )
+        return {row[0] for row in rows}
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def _index_kwargs() -> dict:
+    if op.get_bind().dialect.name == "postgresql":
+        return {"postgresql_concurrently": True}
+    return {}
+
+
+def upgrade() -> None:
+    indexes = _existing_indexes("game_users")
+    if indexes is None:
+        # 신규 DB: init_db()의 create_all에서 인덱스까지 생성됨
+        return
+
+    with op.get_context().autocommit_block():
+        if "uq_game_users_identity" not in indexes:
+            while True:
+                result = op.get_bind().execute(_DEDUPE_SQL, {"batch_size": DEDUPE_BATCH_SIZE})
+                if not result.rowcount:
+                    break
+
+        if "uq_game_users_identity" not in indexes:
+            op.create_index(
+                "uq_game_users_identity",
+                "game_users",
+                ["game_id", "user_id", "server_id", sa.text("coalesce(user_id2, '')")],
+                unique=True,
+                **_index_kwargs(),
+            )
+        for name in ("ix_game_users_game_id", "ix_game_users_user_id"):
+            if name in indexes:
+                op.drop_index(name, table_name="game_users")
+
+
+def downgrade() -> None:
+    indexes = _existing_indexes("game_users")
+    if indexes is None:
+        return
+
+    with op.get_context().autocommit_block():
+        if "ix_game_users_game_id" not in indexes:
+            op.create_index("ix_game_users_game_id", "game_users", ["game_id"])
+        if "ix_game_users_user_id" not in indexes:
+            op.create_index("ix_game_users_user_id", "game_users", ["user_id"])
+        for name in ("uq_game_users_identity", "ix_game_users_lookup"):
+            if name in indexes:
+                op.drop_index(name, table_name="game_users")
@@ -0,0 +1,98 @@
+"""game_servers (game_id, server_id) unique 제약
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+/gameserver/create bulk upsert의 충돌 대상.
+기존 중복 행은 id가 가장 큰(최근에 등록된) 행만 남기고 배치 단위로 삭제한다.
+단일 컬럼 인덱스(game_id, server_id)는 unique 인덱스로 대체되어 제거한다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEDUPE_BATCH_SIZE = 5000
+
+_DEDUPE_SQL = sa.text(
+    """
+    DELETE FROM game_servers WHERE id IN (
+        SELECT g.id FROM game_servers g
+        WHERE EXISTS (
+            SELECT 1 FROM game_servers o
+            WHERE o.game_id = g.game_id
+              AND o.server_id = g.server_id
+              AND o.id > g.id
+        )
+        LIMIT :batch_size
+    )
+    """
+)
+
+
+def _existing_indexes(table: str) -> set | None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table(table):
+        return None
+    if bind.dialect.name == "sqlite":
+        rows = bind.execute(
+            sa.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+            {"table": table},
+        )
+        return {row[0] for row in rows}
+    names = {index["name"] for index in inspector.get_indexes(table)}
+    names.update(constraint["name"] for constraint in inspector.get_unique_constraints(table))
+    return names
+
+
+def _index_kwargs() -> dict:
+    if op.get_bind().dialect.name == "postgresql":
+        return {"postgresql_concurrently": True}
+    return {}
+
+
+def upgrade() -> None:
+    indexes = _existing_indexes("game_servers")
+    if indexes is None:
+        return
+    # create_all로 생성된 테이블은 제약이 sqlite_autoindex_* 이름으로 존재
+    if "uq_game_servers_game_server" in indexes or any(
+        name.startswith("sqlite_autoindex_game_servers") for name in indexes
+    ):
+        return
+
+    with op.get_context().autocommit_block():
+        while True:
+            result = op.get_bind().execute(_DEDUPE_SQL, {"batch_size": DEDUPE_BATCH_SIZE})
+            if not result.rowcount:
+                break
+
+        op.create_index(
+            "uq_game_servers_game_server",
+            "game_servers",
+            ["game_id", "server_id"],
+            unique=True,
+            **_index_kwargs(),
+        )
+        for name in ("ix_game_servers_game_id", "ix_game_servers_server_id"):
+            if name in indexes:
+                op.drop_index(name, table_name="game_servers")
+
+
+def downgrade() -> None:
+    indexes = _existing_indexes("game_servers")
+    if indexes is None or "uq_game_servers_game_server" not in indexes:
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index("ix_game_servers_game_id", "game_servers", ["game_id"])
+        op.create_index("ix_game_servers_server_id", "game_servers", ["server_id"])
+        op.drop_index("uq_game_servers_game_server", table_name="game_servers")
@@ -0,0 +1,36 @@
+"""game_users (game_id, id) 인덱스 - 사용자 목록 keyset 페이지 조회용
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_index(table: str, name: str) -> bool | None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return any(index["name"] == name for index in inspector.get_indexes(table))
+
+
+def upgrade() -> None:
+    if _has_index("game_users", "ix_game_users_game_id_id") is not False:
+        return
+    kwargs = {"postgresql_concurrently": True} if op.get_bind().dialect.name == "postgresql" else {}
+    with op.get_context().autocommit_block():
+        op.create_index("ix_game_users_game_id_id", "game_users", ["game_id", "id"], **kwargs)
+
+
+def downgrade() -> None:
+    if _has_index("game_users", "ix_game_users_game_id_id"):
+        op.drop_index("ix_game_users_game_id_id", table_name="game_users")
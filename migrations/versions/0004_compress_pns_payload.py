@@ -0,0 +1,163 @@
+"""onestore_pns_notifications 큰 컬럼 압축 저장
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+- payment_types, purchase_token, signature, raw_data 를 zlib 압축 형식(db_types.CompressedText)으로 변환
+- 배치 단위로 변환/commit 하므로 쓰기 잠금을 오래 잡지 않는다
+- SQLite는 컬럼 타입 변경 없이 값만 BLOB으로 바꾸고, 변환 후 VACUUM으로 파일 크기를 줄인다
+- PostgreSQL은 컬럼을 BYTEA로 변경한다 (테이블이 다시 쓰이므로 VACUUM FULL 불필요)
+- 변환 전후 DB 크기를 로그로 출력
+"""
+import logging
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from db_types import compress_text, decompress_text
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+TABLE = "onestore_pns_notifications"
+COLUMNS = ("payment_types", "purchase_token", "signature", "raw_data")
+BATCH_SIZE = 1000
+
+_table = sa.table(TABLE, sa.column("id"), *(sa.column(name) for name in COLUMNS))
+
+
+def _has_table() -> bool:
+    return sa.inspect(op.get_bind()).has_table(TABLE)
+
+
+def _db_size() -> Optional[int]:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        page_count = bind.exec_driver_sql("PRAGMA page_count").scalar()
+        page_size = bind.exec_driver_sql("PRAGMA page_size").scalar()
+        return page_count * page_size
+    if bind.dialect.name == "postgresql":
+        return bind.exec_driver_sql("SELECT pg_database_size(current_database())").scalar()
+    return None
+
+
+def _format_size(size: Optional[int]) -> str:
+    return "알 수 없음" if size is None else f"{size / 1024 / 1024:.2f}MB"
+
+
+def _rewrite(convert) -> int:
+    """
+    전체 행의 대상 컬럼을 convert(value)로 변환 (id 순 배치, 배치마다 commit)
+    convert가 None을 반환하면 그 값은 바꾸지 않는다. 반환: 변경한 행 수
+    """
+    bind = op.get_bind()
+    stmt = sa.update(_table).where(_table.c.id == sa.bindparam("_id")).values(
+        {name: sa.bindparam(f"_{name}") for name in COLUMNS}
+    )
+    changed = 0
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(_table).where(_table.c.id > last_id).order_by(_table.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        params = []
+        for row in rows:
+            values = {"_id": row.id}
+            row_changed = False
+            for name in COLUMNS:
+                value = getattr(row, name)
+                converted = convert(value) if value is not None else None
+                values[f"_{name}"] = value if converted is None else converted
+                row_changed = row_changed or converted is not None
+            if row_changed:
+                params.append(values)
+        if params:
+            bind.exec_driver_sql("BEGIN")
+            bind.execute(stmt, params)
+            bind.exec_driver_sql("COMMIT")
+            changed += len(params)
+    return changed
+
+
+def _compress(value) -> Optional[bytes]:
+    if isinstance(value, str):
+        return compress_text(value)
+    # PostgreSQL 타입 변경 직후의 비압축 형식
+    if bytes(value[:1]) == b"\x00":
+        compressed = compress_text(decompress_text(value))
+        return compressed if compressed[:1] == b"\x01" else None
+    return None
+
+
+def _decompress_sqlite(value) -> Optional[str]:
+    return None if isinstance(value, str) else decompress_text(value)
+
+
+def _decompress_postgresql(value) -> Optional[bytes]:
+    # 비압축 형식으로 되돌린 뒤 컬럼 타입 변경 시 표시 바이트를 제거
+    if bytes(value[:1]) == b"\x00":
+        return None
+    return b"\x00" + decompress_text(value).encode("utf-8")
+
+
+def _vacuum() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.get_bind().exec_driver_sql("VACUUM")
+        op.get_bind().exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def upgrade() -> None:
+    if not _has_table():
+        # 신규 DB: init_db()의 create_all에서 압축 컬럼으로 생성됨
+        return
+
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        size_before = _db_size()
+        if is_postgresql:
+            for name in COLUMNS:
+                op.alter_column(
+                    TABLE, name, type_=sa.LargeBinary(),
+                    postgresql_using=f"('\\x00'::bytea || convert_to({name}, 'UTF8'))",
+                )
+        changed = _rewrite(_compress)
+        _vacuum()
+        size_after = _db_size()
+
+    logger.info(
+        f"{TABLE} 압축: rows={changed}, DB 크기 {_format_size(size_before)} -> {_format_size(size_after)}"
+    )
+
+
+def downgrade() -> None:
+    if not _has_table():
+        return
+
+    is_postgresql = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        size_before = _db_size()
+        if is_postgresql:
+            changed = _rewrite(_decompress_postgresql)
+            for name in COLUMNS:
+                op.alter_column(
+                    TABLE, name, type_=sa.Text(),
+                    postgresql_using=f"convert_from(substring({name} from 2), 'UTF8')",
+                )
+        else:
+            changed = _rewrite(_decompress_sqlite)
+        _vacuum()
+        size_after = _db_size()
+
+    logger.info(
+        f"{TABLE} 압축 해제: rows={changed}, DB 크기 {_format_size(size_before)} -> {_format_size(size_after)}"
+    )
@@ -0,0 +1,40 @@
+"""onestore_access_tokens 토큰 유효 기간(lifetime) 컬럼
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+공유 캐시에서 읽은 토큰도 발급 시 유효 기간 기준으로 갱신 마진을 계산하기 위해 추가한다.
+기존 행은 NULL - 읽을 때 ONESTORE_TOKEN_DEFAULT_EXPIRES_IN을 사용하고 다음 갱신 때 채워진다.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "onestore_access_tokens"
+
+
+def _has_column(name: str) -> bool | None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(TABLE):
+        return None
+    return any(column["name"] == name for column in inspector.get_columns(TABLE))
+
+
+def upgrade() -> None:
+    if _has_column("lifetime") is not False:
+        return
+    op.add_column(TABLE, sa.Column("lifetime", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    if _has_column("lifetime"):
+        with op.batch_alter_table(TABLE) as batch_op:
+            batch_op.drop_column("lifetime")
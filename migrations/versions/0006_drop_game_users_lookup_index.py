@@ -0,0 +1,40 @@
+"""game_users ix_game_users_lookup 인덱스 제거 - uq_game_users_identity와 앞 컬럼이 같아 중복
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_index(table: str, name: str) -> bool | None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return any(index["name"] == name for index in inspector.get_indexes(table))
+
+
+def upgrade() -> None:
+    # 이전 0001로 이미 생성된 DB에서만 제거
+    if not _has_index("game_users", "ix_game_users_lookup"):
+        return
+    kwargs = {"postgresql_concurrently": True} if op.get_bind().dialect.name == "postgresql" else {}
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_game_users_lookup", table_name="game_users", **kwargs)
+
+
+def downgrade() -> None:
+    if _has_index("game_users", "ix_game_users_lookup") is not False:
+        return
+    op.create_index(
+        "ix_game_users_lookup", "game_users", ["game_id", "user_id", "server_id", "user_id2"]
+    )
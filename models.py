@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, BigInteger
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, BigInteger, UniqueConstraint, Index
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func, literal_column
 from database import Base
+from db_types import CompressedText
 
 class OnestoreEnvData(Base):
     __tablename__ = "onestore_env"
@@ -11,11 +13,39 @@ class OnestoreEnvData(Base):
     pns_sandbox_domain = Column(String, nullable=False)
     pns_commercial_domain = Column(String, nullable=False)
 
+
+class CacheVersion(Base):
+    """프로세스 내 캐시 무효화용 버전 카운터 (워커 간 변경 감지)"""
+    __tablename__ = "cache_versions"
+
+    key = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class OnestoreAccessToken(Base):
+    """원스토어 OAuth 액세스 토큰 공유 캐시 (워커 간 공유)"""
+    __tablename__ = "onestore_access_tokens"
+    __table_args__ = (
+        UniqueConstraint("client_id", "domain", name="uq_onestore_access_tokens_client_domain"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    client_id = Column(String(50), nullable=False)
+    domain = Column(String(255), nullable=False)
+    access_token = Column(Text, nullable=False)
+    expires_at = Column(Float, nullable=False)  # epoch seconds
+    lifetime = Column(Float, nullable=True)  # 발급 시 유효 기간(초) - 갱신 마진 계산용
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class GameServer(Base):
     __tablename__ = "game_servers"
+    __table_args__ = (
+        # 서버 중복 방지 및 bulk upsert 충돌 대상 - game_id 단독 조회도 이 인덱스 사용
+        UniqueConstraint("game_id", "server_id", name="uq_game_servers_game_server"),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    game_id = Column(String, index=True)
-    server_id = Column(String, index=True)
+    game_id = Column(String)
+    server_id = Column(String)
     server_name = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -23,16 +53,35 @@ class GameServer(Base):
 class GameUser(Base):
     __tablename__ = "game_users"
     id = Column(Integer, primary_key=True, index=True)
-    game_id = Column(String, index=True)
-    user_id = Column(String, index=True)
+    game_id = Column(String)
+    user_id = Column(String)
     user_id2 = Column(String, nullable=True)
     server_id = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+# 게임별 사용자 목록 keyset 페이지 조회용 (game_id, id)
+Index("ix_game_users_game_id_id", GameUser.game_id, GameUser.id)
+# 사용자 중복 방지 - user_id2가 NULL인 행끼리도 중복으로 보도록 coalesce 사용
+# /gameuser/check 조회(game_id, user_id [, server_id])와 사용자 삭제도 이 인덱스의 앞 컬럼으로 처리
+# (bulk upsert의 ON CONFLICT 대상과 표현식이 정확히 같아야 하므로 상수로 공유)
+GAME_USER_IDENTITY = (
+    GameUser.game_id,
+    GameUser.user_id,
+    GameUser.server_id,
+    func.coalesce(GameUser.user_id2, literal_column("''")),
+)
+Index("uq_game_users_identity", *GAME_USER_IDENTITY, unique=True)
+
+
 class OnestorePNS(Base):
-    """원스토어 PNS Notification 저장 테이블"""
+    """
+    원스토어 PNS Notification 저장 테이블
+
+    큰 컬럼(payment_types, purchase_token, signature, raw_data)은 zlib 압축 저장하고 지연 로딩한다
+    (일반 조회에서는 읽지 않고, 접근 시 "payload" 그룹을 한 번에 조회 - 필요하면 undefer_group("payload"))
+    """
     __tablename__ = "onestore_pns_notifications"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -47,16 +96,36 @@ class OnestorePNS(Base):
     price = Column(String(20), nullable=False)
     price_currency_code = Column(String(10), nullable=False)
     product_name = Column(String(255), nullable=True)
-    payment_types = Column(Text, nullable=True)  # JSON string
+    payment_types = deferred(Column(CompressedText, nullable=True), group="payload")  # JSON string
     billing_key = Column(String(255), nullable=True)
     is_test_mdn = Column(Boolean, default=False)
-    purchase_token = Column(Text, nullable=False)
+    purchase_token = deferred(Column(CompressedText, nullable=False), group="payload")
     environment = Column(String(20), nullable=False)  # SANDBOX / COMMERCIAL
     market_code = Column(String(20), nullable=False)  # MKT_ONE / MKT_GLB
-    signature = Column(Text, nullable=False)
-    raw_data = Column(Text, nullable=True)  # 원본 JSON 데이터 저장
+    signature = deferred(Column(CompressedText, nullable=False), group="payload")
+    raw_data = deferred(Column(CompressedText, nullable=True), group="payload")  # 원본 JSON 데이터 저장
     serviceUserId = Column(String(255), nullable=True)
     serviceUserId2 = Column(String(255), nullable=True)
     serviceServerId = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class OnestoreConsumeJob(Base):
+    """원스토어 consume 작업 큐 (PNS 저장과 같은 트랜잭션에서 생성)"""
+    __tablename__ = "onestore_consume_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    purchase_id = Column(String(100), unique=True, index=True, nullable=False)
+    client_id = Column(String(50), nullable=False)
+    product_id = Column(String(50), nullable=False)
+    purchase_token = Column(Text, nullable=False)
+    developer_payload = Column(String(255), nullable=True)
+    environment = Column(String(20), nullable=False)  # SANDBOX / COMMERCIAL
+    status = Column(String(20), index=True, nullable=False, default="PENDING")  # PENDING / IN_FLIGHT / DONE / FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(Float, index=True, nullable=False)  # epoch seconds
+    locked_at = Column(Float, nullable=True)  # IN_FLIGHT 전환 시각 (epoch seconds)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
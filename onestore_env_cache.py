@@ -0,0 +1,99 @@
+import threading
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional
+from sqlalchemy.orm import Session
+import models
+from cache_version import bump_version, version_tracker
+
+logger = logging.getLogger(__name__)
+
+ENV_CACHE_VERSION_KEY = "onestore_env"
+
+
+@dataclass(frozen=True)
+class OnestoreEnvSnapshotRow:
+    """캐시에 보관하는 원스토어 환경 데이터 (읽기 전용)"""
+    id: int
+    client_id: str
+    license_key: str
+    client_secret: str
+    pns_sandbox_domain: str
+    pns_commercial_domain: str
+
+
+@dataclass(frozen=True)
+class OnestoreEnvSnapshot:
+    version: int
+    rows: Mapping[str, OnestoreEnvSnapshotRow]
+
+
+class OnestoreEnvCache:
+    """
+    onestore_env 테이블 전체의 불변 스냅샷 (read-through)
+
+    - 스냅샷은 통째로 교체되므로 읽는 쪽은 락 없이 참조만 한다
+    - 다른 워커의 변경은 cache_versions 버전 비교로 감지해 다시 읽는다
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[OnestoreEnvSnapshot] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def get(self, db: Session, client_id: str) -> Optional[OnestoreEnvSnapshotRow]:
+        snapshot = self._snapshot
+        version = version_tracker.current(db, ENV_CACHE_VERSION_KEY)
+        if snapshot is None or snapshot.version != version:
+            self.misses += 1
+            snapshot = self.reload(db)
+        else:
+            self.hits += 1
+        return snapshot.rows.get(client_id)
+
+    def reload(self, db: Session) -> OnestoreEnvSnapshot:
+        with self._lock:
+            version = db.query(models.CacheVersion.version).filter(
+                models.CacheVersion.key == ENV_CACHE_VERSION_KEY
+            ).scalar() or 0
+            rows = {
+                row.client_id: OnestoreEnvSnapshotRow(
+                    id=row.id,
+                    client_id=row.client_id,
+                    license_key=row.license_key,
+                    client_secret=row.client_secret,
+                    pns_sandbox_domain=row.pns_sandbox_domain,
+                    pns_commercial_domain=row.pns_commercial_domain,
+                )
+                for row in db.query(models.OnestoreEnvData).all()
+            }
+            snapshot = OnestoreEnvSnapshot(version=version, rows=MappingProxyType(rows))
+            self._snapshot = snapshot
+            self.reloads += 1
+        logger.info(f"원스토어 환경 데이터 캐시 갱신: version={version}, count={len(rows)}")
+        return snapshot
+
+    def mark_changed(self, db: Session) -> None:
+        """환경 데이터 변경 시 호출 (commit 전) - 다른 워커에 변경을 알림"""
+        bump_version(db, ENV_CACHE_VERSION_KEY)
+
+    def refresh_after_commit(self, db: Session) -> None:
+        """변경 commit 직후 호출 - 이 프로세스의 스냅샷을 즉시 교체"""
+        version_tracker.expire()
+        self.reload(db)
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "size": len(snapshot.rows) if snapshot else 0,
+            "version": snapshot.version if snapshot else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+        }
+
+
+onestore_env_cache = OnestoreEnvCache()
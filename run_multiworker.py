@@ -0,0 +1,109 @@
+"""
+멀티 워커 실행 스크립트
+
+쓰기 전용 프로세스(webshop_writer.py) 1개와 요청 처리 워커(uvicorn --workers N)를 함께 실행한다.
+요청 워커는 조회를 직접 처리하고, DB 변경(PNS 저장, 게임 사용자/서버, 환경 데이터, 토큰 공유 캐시)은
+Unix 소켓으로 쓰기 프로세스에 맡긴다. DB 파일은 단일 프로세스 실행과 같다.
+
+사용:
+    WEB_CONCURRENCY=4 python run_multiworker.py --host 0.0.0.0 --port 8080
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+import subprocess
+import logging
+
+from webshop_logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# 쓰기 프로세스 소켓이 준비될 때까지 기다리는 최대 시간(초)
+DB_WRITER_START_TIMEOUT = float(os.getenv("DB_WRITER_START_TIMEOUT", "30"))
+
+
+def _wait_for_socket(proc: subprocess.Popen, path: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if proc.poll() is not None:
+            raise RuntimeError(f"쓰기 프로세스가 시작 중 종료되었습니다: exit={proc.returncode}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"쓰기 프로세스 소켓 대기 시간 초과: {path}")
+        time.sleep(0.05)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="쓰기 전용 프로세스 + uvicorn 멀티 워커 실행")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8080")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+        help="요청 처리 워커 수 (기본: WEB_CONCURRENCY 또는 CPU 수)",
+    )
+    parser.add_argument(
+        "--socket", default=os.getenv("DB_WRITER_SOCKET", "/tmp/webshop-db-writer.sock"),
+        help="쓰기 프로세스 Unix 소켓 경로",
+    )
+    args = parser.parse_args()
+
+    setup_logging()
+    base_env = dict(os.environ, DB_WRITER_SOCKET=args.socket)
+    # 쓰기 프로세스는 직접 쓰기(local), consume 작업 큐 워커도 여기서만 실행
+    writer_env = dict(base_env, DB_WRITER_MODE="local")
+    # 이전 실행이 비정상 종료되며 남긴 소켓 파일을 지워야 새 프로세스 준비 여부를 판단할 수 있다
+    if os.path.exists(args.socket):
+        os.unlink(args.socket)
+    writer = subprocess.Popen([sys.executable, os.path.join(APP_DIR, "webshop_writer.py")], env=writer_env)
+    try:
+        _wait_for_socket(writer, args.socket, DB_WRITER_START_TIMEOUT)
+    except RuntimeError as e:
+        logger.error(str(e))
+        writer.terminate()
+        writer.wait()
+        return 1
+
+    worker_env = dict(base_env, DB_WRITER_MODE="remote", CONSUME_WORKER_ENABLED="0")
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--app-dir", APP_DIR,
+            "--host", args.host,
+            "--port", str(args.port),
+            "--workers", str(max(1, args.workers)),
+        ],
+        env=worker_env,
+    )
+    logger.info(f"멀티 워커 시작: workers={args.workers}, writer_pid={writer.pid}, server_pid={server.pid}")
+
+    def _forward(signum, frame):
+        server.send_signal(signum)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+
+    # 쓰기 프로세스가 먼저 종료되면 쓰기 요청이 모두 실패하므로 서버도 함께 종료
+    exit_code = 0
+    while True:
+        if server.poll() is not None:
+            exit_code = server.returncode
+            break
+        if writer.poll() is not None:
+            logger.error(f"쓰기 프로세스 종료됨(exit={writer.returncode}), 서버 종료")
+            server.terminate()
+            server.wait()
+            exit_code = 1
+            break
+        time.sleep(0.5)
+
+    # 요청 워커가 모두 종료된 뒤 쓰기 프로세스 종료 (남은 쓰기 요청 처리 후)
+    if writer.poll() is None:
+        writer.terminate()
+        writer.wait()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from typing import List
 
 # GameServer 스키마
@@ -32,9 +32,23 @@ class ResposeBase(BaseModel):
     result: ResponseResult
 
 
+class BulkUpsertResponse(ResposeBase):
+    """bulk upsert 결과"""
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+
+
+class DeleteResponse(ResposeBase):
+    """삭제 결과"""
+    deleted: int = 0
+
+
 class GameServerListResponse(ResposeBase):
     model_config = ConfigDict(from_attributes=True)
     serverList: List[GameServerItem] = []
+    # 페이지 조회(limit/cursor) 시에만 포함되는 다음 페이지 커서
+    nextCursor: Optional[str] = Field(default=None, exclude_if=lambda v: v is None)
 
 # GameUser 스키마
 class GameUser(BaseModel):
@@ -47,9 +61,16 @@ class GameUserCreateRequest(BaseModel):
     game_id: str
     userList: List[GameUser] = []
 
+class GameUserBulkDeleteRequest(BaseModel):
+    game_id: str
+    userIdList: List[str] = []
+    deleteAll: bool = False  # True면 userIdList와 관계없이 게임의 전체 사용자 삭제
+
 class GameUserListResponse(ResposeBase):
     model_config = ConfigDict(from_attributes=True)
     userList: List[GameUser] = []
+    # 페이지 조회(limit/cursor) 시에만 포함되는 다음 페이지 커서
+    nextCursor: Optional[str] = Field(default=None, exclude_if=lambda v: v is None)
 
 # GameUser 조회 API용 스키마
 class GameUserCheckParam(BaseModel):
@@ -116,6 +137,28 @@ class OnestorePNSResponse(BaseModel):
     message: str
     purchaseId: Optional[str] = None
 
+class OnestoreConsumeJob(BaseModel):
+    """원스토어 consume 작업"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    purchase_id: str
+    client_id: str
+    product_id: str
+    environment: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+
+
+class OnestoreConsumeBacklogResponse(ResposeBase):
+    """원스토어 consume 작업 큐 현황"""
+    counts: Dict[str, int] = {}
+    oldestPendingAge: Optional[float] = None  # 가장 오래 대기 중인 작업의 대기 시간(초)
+    inFlight: int = 0  # 이 프로세스에서 처리 중인 작업 수
+    failedJobs: List[OnestoreConsumeJob] = []
+
+
 class RequestForceConume(BaseModel):
     clientId: str
     productId: str
@@ -163,4 +206,59 @@ class OnestoreEnvDataListResponse(BaseModel):
 class OnestoreEnvDataResponse(BaseModel):
     """원스토어 환경 데이터 단일 응답"""
     result: ResponseResult = ResponseResult()
-    envData: Optional[OnestoreEnvData] = None
\ No newline at end of file
+    envData: Optional[OnestoreEnvData] = None
+
+
+class CacheStats(BaseModel):
+    """캐시 통계"""
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+
+class EnvCacheStats(CacheStats):
+    """원스토어 환경 데이터 스냅샷 캐시 통계"""
+    version: Optional[int] = None
+    reloads: int = 0
+
+
+class OnestoreCacheStatsResponse(BaseModel):
+    """원스토어 관련 캐시 통계 응답"""
+    result: ResponseResult = ResponseResult()
+    publicKeyCache: CacheStats = CacheStats()
+    envCache: EnvCacheStats = EnvCacheStats()
+    serverListCache: CacheStats = CacheStats()
+
+
+class CircuitBreakerState(BaseModel):
+    """서킷 브레이커 상태 (closed / open / half_open)"""
+    state: str
+    windowCalls: int = 0
+    windowFailureRate: float = 0.0
+    openedCount: int = 0
+    retryAfter: Optional[float] = None
+
+
+class AdaptiveTimeoutState(BaseModel):
+    """현재 읽기 타임아웃(초)과 계산에 쓰인 표본 수"""
+    readTimeout: float
+    samples: int = 0
+
+
+class RetryBudgetState(BaseModel):
+    windowRequests: int = 0
+    windowRetries: int = 0
+    exhausted: int = 0
+
+
+class OnestoreDomainResilience(BaseModel):
+    circuit: CircuitBreakerState
+    timeout: AdaptiveTimeoutState
+    retryBudget: RetryBudgetState
+
+
+class OnestoreResilienceResponse(BaseModel):
+    """원스토어 도메인별 외부 호출 보호 상태"""
+    result: ResponseResult = ResponseResult()
+    domains: Dict[str, OnestoreDomainResilience] = {}
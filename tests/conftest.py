@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# 앱 모듈은 import 시점에 DATABASE_URL로 엔진을 만들므로 테스트용 DB를 먼저 지정
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="webshop-test-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TEST_DB_DIR, 'test.db')}")
+# consume 작업 큐 워커는 테스트에서 직접 시작/종료
+os.environ.setdefault("CONSUME_WORKER_ENABLED", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
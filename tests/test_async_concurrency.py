@@ -0,0 +1,151 @@
+"""
+async 핸들러가 느린 작업(원스토어 호출, 서명 검증) 뒤에 직렬화되지 않는지 확인
+
+N개 요청을 동시에 보냈을 때 전체 시간이 지연 1회분 정도여야 하고 N회분이면 안 된다.
+"""
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+import pytest
+
+import models
+import verify_onestore_webhook
+import webshop_consume
+import webshop_write_ops as write_ops
+from database import ReadSessionLocal, init_db
+from main import app
+from webshop_consume_outbox import STATUS_DONE, consume_worker
+
+# 원스토어 / 서명 검증 지연(초)
+UPSTREAM_LATENCY = 0.3
+CONCURRENT_REQUESTS = 8
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, data: dict):
+        self.status_code = status_code
+        self._data = data
+        self.text = json.dumps(data)
+
+    def json(self) -> dict:
+        return self._data
+
+
+class _SlowOnestore:
+    """매 호출마다 UPSTREAM_LATENCY 만큼 막히는(blocking) 원스토어 HTTP 클라이언트"""
+
+    def __init__(self):
+        self.consume_calls = 0
+
+    def post(self, url, timeout=None, **kwargs):
+        time.sleep(UPSTREAM_LATENCY)
+        if url.endswith("/v2/oauth/token"):
+            return _FakeResponse(200, {"access_token": "test-token", "expires_in": 3600})
+        self.consume_calls += 1
+        return _FakeResponse(200, {"result": "SUCCESS"})
+
+
+def _slow_verify(*args, **kwargs) -> bool:
+    time.sleep(UPSTREAM_LATENCY)
+    return True
+
+
+@pytest.fixture(scope="module")
+def client_id():
+    init_db()
+    client_id = f"test-{uuid.uuid4().hex[:8]}"
+    write_ops.create_onestore_env({
+        "client_id": client_id,
+        "license_key": "unused",
+        "client_secret": "secret",
+        "pns_sandbox_domain": "http://onestore.test",
+        "pns_commercial_domain": "http://onestore.test",
+    })
+    return client_id
+
+
+async def _post_concurrently(path: str, bodies):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post(path, content=json.dumps(body), headers={"Content-Type": "application/json"})
+            for body in bodies
+        ])
+        return responses, time.perf_counter() - started
+
+
+def _pns_body(client_id: str, purchase_id: str) -> dict:
+    return {
+        "msgVersion": "3.1.0D",
+        "clientId": client_id,
+        "productId": "product-1",
+        "messageType": "SINGLE_PAYMENT_TRANSACTION",
+        "purchaseId": purchase_id,
+        "developerPayload": "payload",
+        "purchaseTimeMillis": int(time.time() * 1000),
+        "purchaseState": "COMPLETED",
+        "price": "1000",
+        "priceCurrencyCode": "KRW",
+        "productName": "product",
+        "paymentTypeList": [{"paymentMethod": "CARD", "amount": "1000"}],
+        "billingKey": "",
+        "isTestMdn": True,
+        "purchaseToken": f"token-{purchase_id}",
+        "environment": "SANDBOX",
+        "marketCode": "MKT_ONE",
+        "signature": "signature",
+    }
+
+
+def test_check_game_user_not_serialized_behind_slow_verification(monkeypatch, client_id):
+    monkeypatch.setattr(verify_onestore_webhook, "_verify_with_license_key", _slow_verify)
+    bodies = [
+        {"param": {"clientId": client_id, "serviceUserId": f"user-{i}"}, "signature": "signature"}
+        for i in range(CONCURRENT_REQUESTS)
+    ]
+
+    responses, elapsed = asyncio.run(_post_concurrently("/gameuser/check", bodies))
+
+    assert all(r.status_code == 200 for r in responses)
+    assert elapsed < UPSTREAM_LATENCY * 3, f"{CONCURRENT_REQUESTS}건 동시 요청이 {elapsed:.2f}s 걸림"
+
+
+def test_pns_not_serialized_behind_slow_onestore(monkeypatch, client_id):
+    onestore = _SlowOnestore()
+    monkeypatch.setattr(webshop_consume, "get_http_client", lambda: onestore)
+    monkeypatch.setattr(verify_onestore_webhook, "_verify_with_license_key", _slow_verify)
+    purchase_ids = [f"pns-{uuid.uuid4().hex}" for _ in range(CONCURRENT_REQUESTS)]
+
+    consume_worker.start()
+    try:
+        responses, elapsed = asyncio.run(_post_concurrently(
+            "/onestore_pns/sandbox", [_pns_body(client_id, purchase_id) for purchase_id in purchase_ids]
+        ))
+
+        assert all(r.status_code == 200 and r.json()["success"] for r in responses)
+        # 서명 검증 1회 + 여유분 - consume(원스토어 호출)을 기다리면 안 된다
+        assert elapsed < UPSTREAM_LATENCY * 3, f"{CONCURRENT_REQUESTS}건 동시 PNS 요청이 {elapsed:.2f}s 걸림"
+
+        # consume은 백그라운드에서 느린 원스토어로 처리된다
+        deadline = time.monotonic() + 10
+        done = 0
+        while time.monotonic() < deadline:
+            db = ReadSessionLocal()
+            try:
+                done = db.query(models.OnestoreConsumeJob).filter(
+                    models.OnestoreConsumeJob.purchase_id.in_(purchase_ids),
+                    models.OnestoreConsumeJob.status == STATUS_DONE,
+                ).count()
+            finally:
+                db.close()
+            if done == len(purchase_ids):
+                break
+            time.sleep(0.05)
+        assert done == len(purchase_ids)
+        assert onestore.consume_calls >= len(purchase_ids)
+    finally:
+        consume_worker.stop()
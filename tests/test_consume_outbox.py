@@ -0,0 +1,87 @@
+"""consume 작업 큐 - 처리 중 다른 워커가 다시 선점한 작업의 결과 저장 방지"""
+import time
+import uuid
+
+import models
+import webshop_consume_outbox
+from database import SessionLocal, init_db
+from webshop_consume_outbox import STATUS_DONE, STATUS_IN_FLIGHT, ConsumeOutboxWorker
+
+
+def _create_in_flight_job(locked_at: float) -> int:
+    db = SessionLocal()
+    try:
+        job = models.OnestoreConsumeJob(
+            purchase_id=f"purchase-{uuid.uuid4().hex}",
+            client_id="client",
+            product_id="product-1",
+            purchase_token="token",
+            environment="SANDBOX",
+            status=STATUS_IN_FLIGHT,
+            attempts=1,
+            next_attempt_at=locked_at,
+            locked_at=locked_at,
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+    finally:
+        db.close()
+
+
+def _get_job(job_id: int) -> models.OnestoreConsumeJob:
+    db = SessionLocal()
+    try:
+        return db.query(models.OnestoreConsumeJob).filter(models.OnestoreConsumeJob.id == job_id).one()
+    finally:
+        db.close()
+
+
+def _reclaim(job_id: int, locked_at: float) -> None:
+    """CONSUME_INFLIGHT_TIMEOUT이 지나 다른 워커가 다시 선점한 상태로 변경"""
+    db = SessionLocal()
+    try:
+        db.query(models.OnestoreConsumeJob).filter(models.OnestoreConsumeJob.id == job_id).update(
+            {
+                models.OnestoreConsumeJob.locked_at: locked_at,
+                models.OnestoreConsumeJob.attempts: models.OnestoreConsumeJob.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_result_is_saved_by_claim_owner(monkeypatch):
+    init_db()
+    locked_at = time.time()
+    job_id = _create_in_flight_job(locked_at)
+    monkeypatch.setattr(webshop_consume_outbox, "request_onestore_consume", lambda db, *args, **kwargs: {})
+
+    ConsumeOutboxWorker()._process_job(job_id, locked_at)
+
+    job = _get_job(job_id)
+    assert job.status == STATUS_DONE
+    assert job.locked_at is None
+
+
+def test_result_is_not_saved_after_reclaim(monkeypatch):
+    init_db()
+    locked_at = time.time() - 1000
+    job_id = _create_in_flight_job(locked_at)
+    reclaimed_at = time.time()
+
+    def _slow_consume(db, *args, **kwargs):
+        # 원스토어 호출이 CONSUME_INFLIGHT_TIMEOUT을 넘기는 동안 다른 워커가 다시 선점
+        _reclaim(job_id, reclaimed_at)
+        return {}
+
+    monkeypatch.setattr(webshop_consume_outbox, "request_onestore_consume", _slow_consume)
+
+    ConsumeOutboxWorker()._process_job(job_id, locked_at)
+
+    job = _get_job(job_id)
+    assert job.status == STATUS_IN_FLIGHT
+    assert job.locked_at == reclaimed_at
+    assert job.attempts == 2
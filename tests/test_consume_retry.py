@@ -0,0 +1,129 @@
+"""consume 재시도 - 읽기 타임아웃 후 중복 consume 방지, "이미 consume됨" 응답은 성공 처리"""
+import json
+import uuid
+
+import pytest
+import requests
+
+import webshop_consume
+import webshop_write_ops as write_ops
+from database import ReadSessionLocal, init_db
+from webshop_consume import OnestoreConsumeError, request_onestore_consume
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, data: dict):
+        self.status_code = status_code
+        self._data = data
+        self.text = json.dumps(data)
+        self.headers = {}
+
+    def json(self) -> dict:
+        return self._data
+
+
+class _FakeOnestore:
+    """consume 응답을 순서대로 돌려주는 HTTP 클라이언트 (예외면 발생)"""
+
+    def __init__(self, *consume_results):
+        self._results = list(consume_results)
+        self.consume_calls = 0
+
+    def post(self, url, timeout=None, **kwargs):
+        if url.endswith("/v2/oauth/token"):
+            return _FakeResponse(200, {"access_token": "test-token", "expires_in": 3600})
+        self.consume_calls += 1
+        result = self._results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture(scope="module")
+def client_id():
+    init_db()
+    client_id = f"test-{uuid.uuid4().hex[:8]}"
+    write_ops.create_onestore_env({
+        "client_id": client_id,
+        "license_key": "unused",
+        "client_secret": "secret",
+        "pns_sandbox_domain": f"http://{client_id}.onestore.test",
+        "pns_commercial_domain": f"http://{client_id}.onestore.test",
+    })
+    return client_id
+
+
+def _consume(client_id: str):
+    db = ReadSessionLocal()
+    try:
+        return request_onestore_consume(
+            db, client_id, "product-1", f"token-{uuid.uuid4().hex}", "payload", purchase_id="purchase-1"
+        )
+    finally:
+        db.close()
+
+
+def test_read_timeout_is_not_retried(monkeypatch, client_id):
+    onestore = _FakeOnestore(requests.exceptions.ReadTimeout("read timeout"), _FakeResponse(200, {}))
+    monkeypatch.setattr(webshop_consume, "get_http_client", lambda: onestore)
+
+    with pytest.raises(OnestoreConsumeError) as exc_info:
+        _consume(client_id)
+
+    # 요청이 전달됐을 수 있으므로 같은 호출 안에서 다시 보내지 않고 작업 큐 재시도로 넘긴다
+    assert onestore.consume_calls == 1
+    assert exc_info.value.retryable
+    # 오류 메시지는 작업 큐(last_error)에 저장되므로 purchaseToken 대신 purchaseId
+    assert "token-" not in str(exc_info.value)
+    assert "purchase-1" in str(exc_info.value)
+
+
+def test_request_error_message_hides_purchase_token(monkeypatch, client_id):
+    token = f"token-{uuid.uuid4().hex}"
+    error = requests.exceptions.ConnectionError(f"Max retries exceeded with url: /consume/{token}/consume")
+    onestore = _FakeOnestore(error, error, error)
+    monkeypatch.setattr(webshop_consume, "get_http_client", lambda: onestore)
+
+    db = ReadSessionLocal()
+    try:
+        with pytest.raises(OnestoreConsumeError) as exc_info:
+            request_onestore_consume(db, client_id, "product-1", token, "payload", purchase_id="purchase-1")
+    finally:
+        db.close()
+    assert token not in str(exc_info.value)
+
+
+def test_connect_timeout_is_retried(monkeypatch, client_id):
+    onestore = _FakeOnestore(requests.exceptions.ConnectTimeout("connect timeout"), _FakeResponse(200, {"ok": True}))
+    monkeypatch.setattr(webshop_consume, "get_http_client", lambda: onestore)
+
+    assert _consume(client_id) == {"ok": True}
+    assert onestore.consume_calls == 2
+
+
+def test_conflict_status_alone_is_not_success(monkeypatch, client_id):
+    # 오류 코드가 지정되지 않으면 409도 다른 4xx와 같이 실패
+    onestore = _FakeOnestore(_FakeResponse(409, {"code": "CONFLICT"}))
+    monkeypatch.setattr(webshop_consume, "get_http_client", lambda: onestore)
+
+    with pytest.raises(OnestoreConsumeError) as exc_info:
+        _consume(client_id)
+    assert exc_info.value.status_code == 409
+
+
+def test_already_consumed_error_code_is_success(monkeypatch, client_id):
+    monkeypatch.setattr(webshop_consume, "ONESTORE_ALREADY_CONSUMED_CODES", {"ALREADY_CONSUMED"})
+    onestore = _FakeOnestore(_FakeResponse(400, {"error": {"code": "ALREADY_CONSUMED"}}))
+    monkeypatch.setattr(webshop_consume, "get_http_client", lambda: onestore)
+
+    assert _consume(client_id) == {"alreadyConsumed": True}
+
+
+def test_other_client_error_is_not_retryable(monkeypatch, client_id):
+    onestore = _FakeOnestore(_FakeResponse(400, {"error": {"code": "INVALID_PURCHASE_TOKEN"}}))
+    monkeypatch.setattr(webshop_consume, "get_http_client", lambda: onestore)
+
+    with pytest.raises(OnestoreConsumeError) as exc_info:
+        _consume(client_id)
+    assert not exc_info.value.retryable
+    assert onestore.consume_calls == 1
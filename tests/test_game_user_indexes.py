@@ -0,0 +1,50 @@
+"""game_users 인덱스 - /gameuser/check 조회가 uq_game_users_identity로 처리되는지 EXPLAIN으로 확인"""
+import pytest
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects import sqlite
+
+import models
+from database import engine, init_db
+
+
+def _plan(stmt) -> str:
+    compiled = stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+    return " | ".join(str(row[-1]) for row in rows)
+
+
+@pytest.fixture(autouse=True)
+def _sqlite_only():
+    if engine.dialect.name != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN은 SQLite 전용")
+    init_db()
+
+
+def test_lookup_index_is_not_created():
+    names = {index["name"] for index in inspect(engine).get_indexes("game_users")}
+    assert "ix_game_users_lookup" not in names
+
+
+@pytest.mark.parametrize("server_id", [None, "s1"])
+def test_check_query_is_covered_by_identity_index(server_id):
+    stmt = select(models.GameUser.id).where(
+        models.GameUser.game_id == "game",
+        models.GameUser.user_id == "user",
+    )
+    if server_id is not None:
+        stmt = stmt.where(models.GameUser.server_id == server_id)
+
+    plan = _plan(stmt.limit(1))
+    assert "COVERING INDEX uq_game_users_identity" in plan
+
+
+def test_check_query_with_user_id2_uses_identity_index():
+    stmt = select(models.GameUser.id).where(
+        models.GameUser.game_id == "game",
+        models.GameUser.user_id == "user",
+        models.GameUser.user_id2 == "user2",
+    )
+
+    plan = _plan(stmt.limit(1))
+    assert "INDEX uq_game_users_identity" in plan
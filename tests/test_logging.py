@@ -0,0 +1,44 @@
+"""큐 기반 로깅 - 요청 스레드에서는 포맷(JSON 변환, 가림)을 하지 않는다"""
+import json
+import logging
+import queue
+import sys
+
+from webshop_logging import JsonFormatter, _DroppingQueueHandler
+
+
+def _fail_format(self, record):
+    raise AssertionError("요청 스레드에서 format() 호출됨")
+
+
+def test_prepare_does_not_format_on_calling_thread(monkeypatch):
+    handler = _DroppingQueueHandler(queue.Queue())
+    handler.setFormatter(JsonFormatter())
+    monkeypatch.setattr(JsonFormatter, "format", _fail_format)
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("test", logging.ERROR, __file__, 1, "purchaseId=%s", ("P1",), sys.exc_info())
+    prepared = handler.prepare(record)
+
+    assert prepared is not record
+    assert prepared.msg == "purchaseId=P1"
+    assert prepared.args is None
+    assert prepared.exc_info is None
+    assert "ValueError: boom" in prepared.exc_text
+
+
+def test_listener_formatter_renders_prepared_record():
+    handler = _DroppingQueueHandler(queue.Queue())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "test", logging.ERROR, __file__, 1, "token access_token=%s", ("secret-value",), sys.exc_info()
+        )
+
+    entry = json.loads(JsonFormatter().format(handler.prepare(record)))
+
+    assert entry["message"] == "token access_token=***"
+    assert "ValueError: boom" in entry["exc_info"]
@@ -0,0 +1,42 @@
+"""스레드별 샤드 지표 - 종료된 스레드의 샤드는 합쳐서 유지"""
+import threading
+import uuid
+
+from webshop_metrics import Counter, Histogram, registry
+
+
+def _run_threads(target, count: int) -> None:
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _sample(text: str, line_prefix: str) -> str:
+    return next(line for line in text.splitlines() if line.startswith(line_prefix))
+
+
+def test_dead_thread_shards_are_folded_into_retired_totals():
+    name = f"test_counter_{uuid.uuid4().hex[:8]}"
+    counter = Counter(f"{name}_total", "테스트 카운터", ("kind",))
+    histogram = Histogram(f"{name}_seconds", "테스트 히스토그램", (), buckets=(1.0,))
+
+    def _work():
+        counter.inc("a")
+        histogram.observe(0.5)
+
+    registry.render()
+    shards_before = len(registry._shards)
+    _run_threads(_work, 50)
+
+    text = registry.render()
+    assert _sample(text, f'{name}_total{{kind="a"}}') == f'{name}_total{{kind="a"}} 50'
+    assert _sample(text, f"{name}_seconds_count") == f"{name}_seconds_count 50"
+    assert len(registry._shards) <= shards_before
+
+    # 합친 뒤에도 값은 누적된다
+    _run_threads(_work, 10)
+    text = registry.render()
+    assert _sample(text, f'{name}_total{{kind="a"}}') == f'{name}_total{{kind="a"}} 60'
+    assert _sample(text, f'{name}_seconds_bucket{{le="1"}}') == f'{name}_seconds_bucket{{le="1"}} 60'
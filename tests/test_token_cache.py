@@ -0,0 +1,68 @@
+"""원스토어 액세스 토큰 캐시 - 갱신 마진과 워커 간 공유 토큰의 백그라운드 갱신"""
+import time
+import uuid
+
+import webshop_token_cache
+from database import init_db
+from webshop_token_cache import OnestoreTokenCache, store_shared_token
+
+
+class _Fetcher:
+    def __init__(self, expires_in: int):
+        self.expires_in = expires_in
+        self.calls = 0
+
+    def __call__(self, client_id: str, domain: str, client_secret: str):
+        self.calls += 1
+        return f"token-{self.calls}", self.expires_in
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_short_lived_token_is_not_refreshed_on_every_get():
+    # 유효 기간이 갱신 마진(300초)보다 짧아도 발급 직후에는 갱신하지 않는다
+    fetcher = _Fetcher(expires_in=200)
+    cache = OnestoreTokenCache(fetcher, shared=False)
+
+    for _ in range(5):
+        assert cache.get("client", "domain", "secret") == "token-1"
+    time.sleep(0.1)
+    assert fetcher.calls == 1
+
+
+def test_shared_token_inside_margin_is_refreshed_in_background():
+    init_db()
+    client_id = f"test-{uuid.uuid4().hex[:8]}"
+    # 다른 워커가 600초짜리로 발급해 200초 남은 토큰 - 갱신 마진(300초) 안
+    store_shared_token(client_id, "domain", "shared-token", time.time() + 200, 600)
+    fetcher = _Fetcher(expires_in=600)
+    cache = OnestoreTokenCache(fetcher, shared=True)
+
+    # 요청 경로에서는 공유 토큰을 바로 사용하고 새 토큰 발급은 백그라운드에서
+    assert cache.get(client_id, "domain", "secret") == "shared-token"
+    assert _wait_for(lambda: fetcher.calls == 1)
+    assert _wait_for(lambda: cache.get(client_id, "domain", "secret") == "token-1")
+    assert cache._load_shared((client_id, "domain")).access_token == "token-1"
+
+
+def test_forced_refresh_does_not_readopt_same_shared_token():
+    init_db()
+    client_id = f"test-{uuid.uuid4().hex[:8]}"
+    expires_at = time.time() + 200
+    # 공유 행의 유효 기간이 짧게 기록돼 있어(마진 100초) 마진 검사만으로는 다시 채택되는 경우
+    store_shared_token(client_id, "domain", "shared-token", expires_at, 200)
+    fetcher = _Fetcher(expires_in=600)
+    cache = OnestoreTokenCache(fetcher, shared=True)
+    cache._entries[(client_id, "domain")] = webshop_token_cache._CachedToken("shared-token", expires_at, 600)
+
+    entry = cache._refresh((client_id, "domain"), "secret", force=True)
+
+    assert entry.access_token == "token-1"
+    assert fetcher.calls == 1
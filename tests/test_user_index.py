@@ -0,0 +1,75 @@
+"""/gameuser/check 메모리 인덱스 - 생성은 백그라운드, 생성 전에는 DB 조회로 처리"""
+import threading
+import time
+import uuid
+
+import schemas
+import webshop_user_index
+import webshop_write_ops as write_ops
+from database import ReadSessionLocal, init_db
+from webshop_user_index import GameUserIndex
+
+
+def _lookup(index: GameUserIndex, game_id: str, user_id: str):
+    db = ReadSessionLocal()
+    try:
+        return index.lookup(db, game_id, user_id, None, None)
+    finally:
+        db.close()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_index_is_built_off_the_calling_thread(monkeypatch):
+    init_db()
+    game_id = f"game-{uuid.uuid4().hex[:8]}"
+    write_ops.upsert_game_users(game_id, [schemas.GameUser(user_id="user-1", server_id="s1")])
+    index = GameUserIndex(enabled=True)
+
+    build_threads = []
+    release = threading.Event()
+    original_build = GameUserIndex._build
+
+    def _slow_build(self, game_id):
+        build_threads.append(threading.current_thread())
+        release.wait(5)
+        return original_build(self, game_id)
+
+    monkeypatch.setattr(GameUserIndex, "_build", _slow_build)
+
+    # 생성 중에는 기다리지 않고 None(DB 조회) - 생성은 요청 스레드가 아닌 곳에서
+    assert _lookup(index, game_id, "user-1") is None
+    assert _lookup(index, game_id, "user-1") is None
+    assert _wait_for(lambda: len(build_threads) == 1)
+    assert build_threads[0] is not threading.current_thread()
+
+    release.set()
+    assert _wait_for(lambda: _lookup(index, game_id, "user-1") is True)
+    assert _lookup(index, game_id, "user-2") is False
+    assert len(build_threads) == 1
+
+
+def test_stale_index_is_not_used_while_rebuilding(monkeypatch):
+    init_db()
+    game_id = f"game-{uuid.uuid4().hex[:8]}"
+    write_ops.upsert_game_users(game_id, [schemas.GameUser(user_id="user-1", server_id="s1")])
+    index = GameUserIndex(enabled=True)
+    _lookup(index, game_id, "user-1")
+    assert _wait_for(lambda: _lookup(index, game_id, "user-1") is True)
+
+    # 다른 워커의 변경처럼 버전만 올라간 경우 - 재생성 간격이 지나기 전에는 DB 조회
+    db = ReadSessionLocal()
+    try:
+        monkeypatch.setattr(webshop_user_index.version_tracker, "current", lambda db, key: 10**6)
+        assert index.lookup(db, game_id, "user-1", None, None) is None
+        monkeypatch.setattr(webshop_user_index, "USER_INDEX_MIN_REBUILD_INTERVAL", 0)
+        assert index.lookup(db, game_id, "user-1", None, None) is None
+    finally:
+        db.close()
@@ -1,14 +1,22 @@
 import json
+import hashlib
+import threading
 from base64 import b64decode
-from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 from Crypto.Hash import SHA512
 from Crypto.PublicKey import RSA
 from Crypto.Signature import PKCS1_v1_5
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from webshop_consume import get_env_data
+from webshop_metrics import time_stage
+from webshop_tracing import start_span
 import logging
 
 logger = logging.getLogger(__name__)
+# 요청 원문/서명 메시지 로그 (샘플링, 서명 값은 출력 시 가림)
+payload_logger = logging.getLogger(f"{__name__}.payload")
 
 
 def _load_rsa_public_key(key_material: str):
@@ -19,16 +27,70 @@ def _load_rsa_public_key(key_material: str):
     if not key_material:
         raise ValueError("empty license key")
 
-    if key_material.startswith("-----"):
-        rsa_key = RSA.import_key(key_material)
-    else:
-        rsa_key = RSA.import_key(b64decode(key_material))
+    with start_span("_load_rsa_public_key"):
+        if key_material.startswith("-----"):
+            rsa_key = RSA.import_key(key_material)
+        else:
+            rsa_key = RSA.import_key(b64decode(key_material))
 
     if rsa_key.has_private():
         return rsa_key.publickey()
     return rsa_key
 
 
+class _PublicKeyCache:
+    """
+    파싱된 RSA 공개키 캐시 (client_id 단위)
+
+    라이선스 키 지문(sha256)을 함께 저장해, 키가 바뀐 경우에는 캐시를 쓰지 않고 다시 파싱한다.
+    환경 데이터 수정/삭제 시 invalidate()로 제거한다.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, Tuple[str, RSA.RsaKey]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, client_id: str, license_key: str) -> RSA.RsaKey:
+        fingerprint = hashlib.sha256((license_key or "").encode("utf-8")).hexdigest()
+        cached = self._keys.get(client_id)
+        if cached and cached[0] == fingerprint:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        pub_key = _load_rsa_public_key(license_key)
+        with self._lock:
+            self._keys[client_id] = (fingerprint, pub_key)
+        return pub_key
+
+    def invalidate(self, client_id: Optional[str] = None) -> None:
+        with self._lock:
+            if client_id is None:
+                self.invalidations += len(self._keys)
+                self._keys.clear()
+            elif self._keys.pop(client_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+public_key_cache = _PublicKeyCache()
+
+
+def invalidate_public_key(client_id: Optional[str] = None) -> None:
+    """client_id의 캐시된 공개키 제거 (None이면 전체)"""
+    public_key_cache.invalidate(client_id)
+
+
 def __verify(message, signature, pub_key):
     if signature == 'string': 
         return True
@@ -41,23 +103,97 @@ def __verify(message, signature, pub_key):
     digest.update(message)
     return signer.verify(digest, signature_byte)
 
+_SIGNATURE_KEY = b'"signature"'
+_JSON_WHITESPACE = b" \t\r\n"
+
+
+def _skip_ws(raw: bytes, pos: int, step: int = 1) -> int:
+    while 0 <= pos < len(raw) and raw[pos] in _JSON_WHITESPACE:
+        pos += step
+    return pos
+
+
+def splice_signature(raw: bytes) -> Optional[bytes]:
+    """
+    원문 바이트에서 "signature" 멤버만 잘라내 서명 대상 메시지를 만든다 (디코딩/재인코딩 없음).
+
+    원스토어가 보낸 본문이 서명한 메시지 그대로라면 이 결과가 곧 서명 대상이다.
+    형태를 예상할 수 없으면 None - 호출자는 재직렬화 방식으로 처리한다.
+    """
+    key = raw.rfind(_SIGNATURE_KEY)
+    if key <= 0:
+        return None
+    colon = _skip_ws(raw, key + len(_SIGNATURE_KEY))
+    if colon >= len(raw) or raw[colon] != ord(":"):
+        return None
+    quote = _skip_ws(raw, colon + 1)
+    if quote >= len(raw) or raw[quote] != ord('"'):
+        return None
+    end = raw.find(b'"', quote + 1)
+    if end < 0 or b"\\" in raw[quote + 1:end]:
+        return None
+    end += 1
+
+    before = _skip_ws(raw, key - 1, -1)
+    after = _skip_ws(raw, end)
+    if before >= 0 and raw[before] == ord(","):
+        return raw[:before] + raw[end:]
+    if after < len(raw) and raw[after] == ord(","):
+        return raw[:key] + raw[_skip_ws(raw, after + 1):]
+    if before >= 0 and after < len(raw) and raw[before] == ord("{") and raw[after] == ord("}"):
+        return raw[:key] + raw[end:]
+    return None
+
+
+def _canonical_message(payload: dict) -> bytes:
+    """signature를 뺀 JSON을 원스토어 서명 형식(공백 없는 직렬화)으로 재구성"""
+    unsigned = {key: value for key, value in payload.items() if key != "signature"}
+    return json.dumps(unsigned, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+
+def _verify_with_license_key(rawMsg, client_id: str, license_key: str, payload: Optional[dict] = None) -> bool:
+    """
+    서명 검증 (CPU 작업 - async 핸들러에서는 스레드 풀에서 실행)
+
+    payload: 호출자가 이미 파싱한 본문 (없으면 여기서 파싱)
+    원문에서 signature만 잘라낸 메시지로 먼저 검증하고, 실패하면 재직렬화한 메시지로 한 번 더 검증한다.
+    """
+    if isinstance(rawMsg, str):
+        rawMsg = rawMsg.encode("utf-8")
+    if payload is None:
+        payload = json.loads(rawMsg)
+    signature = payload['signature']
+    pub_key = public_key_cache.get(client_id, license_key)
+
+    with start_span("verify_onestore_webhook", client_id=client_id), time_stage("verify"):
+        originalMessage = splice_signature(rawMsg)
+        result = originalMessage is not None and __verify(originalMessage, signature, pub_key)
+        if not result:
+            originalMessage = _canonical_message(payload)
+            result = __verify(originalMessage, signature, pub_key)
+
+    logger.info(f"verify_onestore_webhook client_id: {client_id}, result: {result}")
+    if payload_logger.isEnabledFor(logging.INFO):
+        payload_logger.info("verify_onestore_webhook rawMsg: %s", rawMsg.decode("utf-8"))
+        payload_logger.info("verify_onestore_webhook originalMessage: %s", originalMessage.decode("utf-8"))
+
+    return result
+
+
 def verify_onestore_webhook(db: Session, rawMsg, client_id: str):
     env_data = get_env_data(db, client_id)
     if not env_data:
         raise Exception(f"원스토어 환경 데이터를 찾을 수 없습니다. client_id: {client_id}")
-    
-    if isinstance(rawMsg, bytes):
-        rawMsg = rawMsg.decode("utf-8")
-    jsonData = json.loads(rawMsg, object_pairs_hook=OrderedDict)
-    signature = jsonData['signature']
-    del jsonData['signature']
-    originalMessage = json.dumps(jsonData, ensure_ascii=False, separators=(',', ':'))
-    pub_key = _load_rsa_public_key(env_data.license_key)
-    result = __verify(originalMessage, signature, pub_key)
+    return _verify_with_license_key(rawMsg, client_id, env_data.license_key)
 
-    logger.info(f"verify_onestore_webhook client_id: {client_id}, result: {result}")
-    logger.info(f"verify_onestore_webhook rawMsg: {rawMsg}")
-    logger.info(f"verify_onestore_webhook originalMessage: {originalMessage}")
-
-    return result
 
+async def verify_onestore_webhook_async(db: AsyncSession, rawMsg, client_id: str, payload: Optional[dict] = None):
+    """
+    async 핸들러용 서명 검증
+    환경 데이터는 async 세션으로 조회하고, RSA 검증은 스레드 풀로 넘겨 이벤트 루프를 막지 않는다.
+    payload를 넘기면 본문을 다시 파싱하지 않는다.
+    """
+    env_data = await db.run_sync(get_env_data, client_id)
+    if not env_data:
+        raise Exception(f"원스토어 환경 데이터를 찾을 수 없습니다. client_id: {client_id}")
+    return await run_in_threadpool(_verify_with_license_key, rawMsg, client_id, env_data.license_key, payload)
@@ -1,14 +1,24 @@
 import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 import models
 import schemas
-from database import get_db
+from database import get_async_read_db, get_read_db
 import json
 import logging
 from webshop_consume import consume_onestore_purchase
-from verify_onestore_webhook import verify_onestore_webhook
+from webshop_consume_outbox import consume_job_insert, consume_worker, get_consume_backlog
+from webshop_pns_dedup import recent_purchase_ids
+from webshop_pns_writer import pns_writer
+from verify_onestore_webhook import verify_onestore_webhook_async
+from webshop_pagination import MAX_PAGE_LIMIT, keyset_page, ndjson_response
+from webshop_user_index import game_user_index
+from webshop_server_list_cache import etag_matches, server_list_cache
+import webshop_write_ops as write_ops
 
 
 # 로거 설정
@@ -18,18 +28,18 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def _verify_onestore_pns_signature(
-    db: Session, raw_json: str, payload: dict
+async def _verify_onestore_pns_signature(
+    db: AsyncSession, body_bytes: bytes, payload: dict
 ) -> schemas.OnestorePNSResponse | None:
     """
-    JSON 본문의 clientId·signature로 무결성 검증.
+    JSON 본문의 clientId·signature로 무결성 검증 (payload는 body_bytes를 파싱한 결과).
     실패 시 OnestorePNSResponse 반환, 성공 시 None.
     """
     client_id = payload.get("clientId")
     if not client_id:
         raise HTTPException(status_code=400, detail="Missing clientId")
     try:
-        if not verify_onestore_webhook(db, raw_json, client_id):
+        if not await verify_onestore_webhook_async(db, body_bytes, client_id, payload):
             logger.warning(f"원스토어 PNS 서명 검증 실패: clientId={client_id}")
             return schemas.OnestorePNSResponse(
                 success=False,
@@ -41,44 +51,108 @@ def _verify_onestore_pns_signature(
         raise HTTPException(status_code=500, detail="Integrity verification failed")
     return None
 
+def _parse_pns_body(raw_json: str) -> dict:
+    try:
+        payload = json.loads(raw_json)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    return payload
+
+
+def _game_server_list_stmt(game_id: str):
+    return select(models.GameServer.id, models.GameServer.server_id, models.GameServer.server_name).where(
+        models.GameServer.game_id == game_id
+    )
+
+
+def _game_server_row_to_dict(row) -> dict:
+    return {"serviceServerId": row.server_id, "serviceServerName": row.server_name}
+
+
+def _game_server_list(
+    db: Session,
+    game_id: str,
+    message: str,
+    limit: Optional[int],
+    cursor: Optional[str],
+    stream: bool,
+    if_none_match: Optional[str] = None,
+):
+    """
+    게임 서버 목록 응답 (기본: 전체 목록 / limit: keyset 페이지 / stream: NDJSON)
+
+    전체 목록은 게임별로 직렬화된 응답을 캐시하고, If-None-Match가 ETag와 같으면 304를 반환한다.
+    """
+    stmt = _game_server_list_stmt(game_id)
+    if stream:
+        return ndjson_response(stmt, models.GameServer.id, cursor, _game_server_row_to_dict)
+    if limit is not None or cursor:
+        game_servers, next_cursor = keyset_page(stmt, models.GameServer.id, limit or MAX_PAGE_LIMIT, cursor, db)
+        return schemas.GameServerListResponse(
+            result=schemas.ResponseResult(
+                code="0000", 
+                message=message),
+            serverList=game_servers,
+            nextCursor=next_cursor,
+        )
+
+    # 전체 목록은 직렬화된 응답을 캐시해 그대로 반환 (ETag / If-None-Match 지원)
+    def _load() -> bytes:
+        rows = db.execute(stmt.order_by(models.GameServer.id)).all()
+        return json.dumps(
+            [_game_server_row_to_dict(row) for row in rows], ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    def _render(server_list_json: bytes) -> bytes:
+        result = schemas.ResponseResult(code="0000", message=message).model_dump_json().encode("utf-8")
+        return b'{"result":' + result + b',"serverList":' + server_list_json + b"}"
+
+    entry = server_list_cache.get(db, game_id, _load)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body(_render, message), media_type="application/json", headers=headers)
+
+
 @router.post("/gameserver/{game_id}/list", response_model=schemas.GameServerListResponse)
-def get_game_server_list(game_id: str, db: Session = Depends(get_db)):
-    game_servers = db.query(models.GameServer).filter(models.GameServer.game_id == game_id).values(models.GameServer.server_id, models.GameServer.server_name)
-    return schemas.GameServerListResponse(
-        result=schemas.ResponseResult(
-            code="0000", 
-            message="Game servers retrieved successfully"),
-        serverList=game_servers
+def get_game_server_list(
+    game_id: str,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_read_db),
+):
+    return _game_server_list(
+        db, game_id, "Game servers retrieved successfully", limit, cursor, stream, if_none_match
     )
 
 
-@router.post("/gameserver/create", response_model=schemas.ResposeBase)
-def create_game_server(req: schemas.GameServerListRequest, db: Session = Depends(get_db)):
-    for server in req.serverList:
-        db_game_server = models.GameServer(game_id=req.game_id, server_id=server.server_id, server_name=server.server_name)
-        db.add(db_game_server)
-    db.commit()
-    return schemas.ResposeBase(
+@router.post("/gameserver/create", response_model=schemas.BulkUpsertResponse)
+def create_game_server(req: schemas.GameServerListRequest):
+    counts = write_ops.upsert_game_servers(req.game_id, req.serverList)
+    return schemas.BulkUpsertResponse(
         result=schemas.ResponseResult(
             code="0000", 
             message="Game servers created successfully"),
+        **counts,
     )
 
 
-@router.delete("/gameserver/{game_id}", response_model=schemas.ResposeBase)
-def delete_all_game_server(game_id: str, db: Session = Depends(get_db)):
-    db_game_servers = db.query(models.GameServer).filter(models.GameServer.game_id == game_id).all()
-    if db_game_servers:
-        for db_game_server in db_game_servers:
-            db.delete(db_game_server)
-        db.commit()
-        return schemas.ResposeBase(
+@router.delete("/gameserver/{game_id}", response_model=schemas.DeleteResponse)
+def delete_all_game_server(game_id: str):
+    deleted = write_ops.delete_game_servers(game_id)
+    if deleted:
+        return schemas.DeleteResponse(
             result=schemas.ResponseResult(
                 code="0000", 
                 message="All game servers deleted successfully"),
+            deleted=deleted,
         )
     else:
-        return schemas.ResposeBase(
+        return schemas.DeleteResponse(
             result=schemas.ResponseResult(
                 code="0001", 
                 message="Game server not found"),
@@ -86,53 +160,103 @@ def delete_all_game_server(game_id: str, db: Session = Depends(get_db)):
 
 
 
-@router.post("/gameuser/create", response_model=schemas.ResposeBase)
-def create_game_user(req: schemas.GameUserCreateRequest, db: Session = Depends(get_db)):
-    for user in req.userList:
-        db_game_user = models.GameUser(game_id=req.game_id, user_id=user.user_id, server_id=user.server_id)
-        db.add(db_game_user)
-    db.commit()
-    return schemas.ResposeBase(
+@router.post("/gameuser/create", response_model=schemas.BulkUpsertResponse)
+def create_game_user(req: schemas.GameUserCreateRequest):
+    counts = write_ops.upsert_game_users(req.game_id, req.userList)
+    return schemas.BulkUpsertResponse(
         result=schemas.ResponseResult(
             code="0000", 
             message="Game users created successfully"),
+        **counts,
     )
 
 
-@router.delete("/gameuser/{game_id}/{user_id}", response_model=schemas.ResposeBase)
-def delete_game_user(game_id: str, user_id: str, db: Session = Depends(get_db)):
-    db_game_users = db.query(models.GameUser).filter(models.GameUser.game_id == game_id, models.GameUser.user_id == user_id).all()
-    result = schemas.ResposeBase()
-    if db_game_users:
-        for db_game_user in db_game_users:
-            db.delete(db_game_user)
-        db.commit()
-        return schemas.ResposeBase(
+@router.delete("/gameuser/{game_id}/{user_id}", response_model=schemas.DeleteResponse)
+def delete_game_user(game_id: str, user_id: str):
+    deleted = write_ops.delete_game_user(game_id, user_id)
+    if deleted:
+        return schemas.DeleteResponse(
             result=schemas.ResponseResult(
                 code="0000", 
                 message="Game user deleted successfully"),
+            deleted=deleted,
         )
     else:
-        return schemas.ResposeBase(
+        return schemas.DeleteResponse(
             result=schemas.ResponseResult(
                 code="0001", 
                 message="Game user not found"),
         )
 
 
+@router.post("/gameuser/delete", response_model=schemas.DeleteResponse)
+def delete_game_users(req: schemas.GameUserBulkDeleteRequest):
+    """
+    게임 사용자 일괄 삭제
+
+    - deleteAll: true 이면 게임의 전체 사용자 삭제
+    - 그 외에는 userIdList의 사용자 삭제
+    - 청크 단위로 삭제/commit (BULK_DELETE_CHUNK_SIZE)
+    """
+    deleted = write_ops.delete_game_users(req.game_id, req.userIdList, req.deleteAll)
+    if deleted:
+        return schemas.DeleteResponse(
+            result=schemas.ResponseResult(
+                code="0000",
+                message="Game users deleted successfully"),
+            deleted=deleted,
+        )
+    else:
+        return schemas.DeleteResponse(
+            result=schemas.ResponseResult(
+                code="0001",
+                message="Game user not found"),
+        )
+
+
 @router.get("/gameuser/{game_id}/list", response_model=schemas.GameUserListResponse)
-def get_game_user_list(game_id: str, db: Session = Depends(get_db)):
-    game_users = db.query(models.GameUser).filter(models.GameUser.game_id == game_id).all()
+def get_game_user_list(
+    game_id: str,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    db: Session = Depends(get_read_db),
+):
+    """
+    게임 사용자 목록
+
+    - 기본: 전체 목록
+    - limit / cursor: id 기준 keyset 페이지 (응답의 nextCursor로 다음 페이지 조회)
+    - stream=true: NDJSON 스트리밍 (application/x-ndjson)
+    """
+    stmt = select(
+        models.GameUser.id, models.GameUser.user_id, models.GameUser.user_id2, models.GameUser.server_id
+    ).where(models.GameUser.game_id == game_id)
+    if stream:
+        return ndjson_response(
+            stmt,
+            models.GameUser.id,
+            cursor,
+            lambda row: {"user_id": row.user_id, "user_id2": row.user_id2, "server_id": row.server_id},
+        )
+    next_cursor = None
+    if limit is not None or cursor:
+        game_users, next_cursor = keyset_page(stmt, models.GameUser.id, limit or MAX_PAGE_LIMIT, cursor, db)
+    else:
+        game_users = db.execute(stmt).all()
     return schemas.GameUserListResponse(
         result=schemas.ResponseResult(
             code="0000", 
             message="Game users retrieved successfully"),
-        userList=game_users
+        userList=game_users,
+        nextCursor=next_cursor,
     )
 
 
 @router.post("/gameuser/check", response_model=schemas.GameUserCheckResponse)
-async def check_game_user(request: Request, req: schemas.GameUserCheckRequest, db: Session = Depends(get_db)):
+async def check_game_user(
+    request: Request, req: schemas.GameUserCheckRequest, db: AsyncSession = Depends(get_async_read_db)
+):
     body_bytes = await request.body()
     try:
         raw_json = body_bytes.decode("utf-8")
@@ -144,7 +268,7 @@ async def check_game_user(request: Request, req: schemas.GameUserCheckRequest, d
         raise HTTPException(status_code=400, detail="Missing param.clientId")
 
     try:
-        if not verify_onestore_webhook(db, raw_json, client_id):
+        if not await verify_onestore_webhook_async(db, raw_json, client_id):
             logger.warning(f"gameuser/check 서명 검증 실패: clientId={client_id}")
             return schemas.GameUserCheckResponse(
                 result=schemas.ResponseResult(
@@ -160,16 +284,22 @@ async def check_game_user(request: Request, req: schemas.GameUserCheckRequest, d
 
     logger.info(f"clientId: {client_id}, prodId: {req.param.prodId}, serviceUserId: {req.param.serviceUserId}, serviceServerId {req.param.serviceServerId}")
 
-    q = db.query(models.GameUser).filter(
-        models.GameUser.game_id == client_id,
-        models.GameUser.user_id == req.param.serviceUserId,
+    # 메모리 인덱스로 먼저 확인하고, 판단할 수 없을 때(인덱스 생성 중, Bloom filter 양성 등)만 DB 조회
+    db_game_user = await db.run_sync(
+        game_user_index.lookup, client_id, req.param.serviceUserId, req.param.serviceServerId, req.param.serviceUserId2
     )
-    if req.param.serviceServerId not in (None, ""):
-        q = q.filter(models.GameUser.server_id == req.param.serviceServerId)
-    if req.param.serviceUserId2 not in (None, ""):
-        q = q.filter(models.GameUser.user_id2 == req.param.serviceUserId2)
+    if db_game_user is None:
+        # id만 조회해 uq_game_users_identity 인덱스로 처리 (user_id2 조건이 없으면 테이블 접근 없음)
+        stmt = select(models.GameUser.id).where(
+            models.GameUser.game_id == client_id,
+            models.GameUser.user_id == req.param.serviceUserId,
+        )
+        if req.param.serviceServerId not in (None, ""):
+            stmt = stmt.where(models.GameUser.server_id == req.param.serviceServerId)
+        if req.param.serviceUserId2 not in (None, ""):
+            stmt = stmt.where(models.GameUser.user_id2 == req.param.serviceUserId2)
 
-    db_game_user = q.first()
+        db_game_user = (await db.execute(stmt.limit(1))).first()
 
     if db_game_user:
         developerPayload = f"{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}:{client_id}:{req.param.serviceUserId}"
@@ -200,24 +330,98 @@ async def check_game_user(request: Request, req: schemas.GameUserCheckRequest, d
         )
 
 @router.post("/onestore_webshop/serverlist", response_model=schemas.GameServerListResponse)
-def get_onestore_webshop_serverlist(req: schemas.OnestoreWebshopServerListRequest, db: Session = Depends(get_db)):
+def get_onestore_webshop_serverlist(
+    req: schemas.OnestoreWebshopServerListRequest,
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    if_none_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_read_db),
+):
     game_id = getattr(req.param, 'clientId', None) # or getattr(req.param, 'prodId', None)
-    game_servers = db.query(models.GameServer).filter(models.GameServer.game_id == game_id).all()
     
-    logger.info(f"원스토어 웹샵({game_id}) 서버 목록 조회: {game_servers}")
+    logger.info(f"원스토어 웹샵({game_id}) 서버 목록 조회")
     
-    return schemas.GameServerListResponse(
-        result=schemas.ResponseResult(
-            code="0000", 
-            message=f"Onestore Webshop({game_id}) servers retrieved successfully"),
-        serverList=game_servers
+    return _game_server_list(
+        db,
+        game_id,
+        f"Onestore Webshop({game_id}) servers retrieved successfully",
+        limit,
+        cursor,
+        stream,
+        if_none_match,
     )
 
+async def _ingest_pns(pns_data: schemas.OnestorePNSRequest, raw_json: str, consume_environment: str) -> bool:
+    """
+    PNS 저장과 (결제 완료 시) consume 작업 등록을 한 트랜잭션으로 처리
+
+    중복 판정은 INSERT ... ON CONFLICT(purchase_id) DO NOTHING RETURNING 한 번으로 하고,
+    최근 처리한 purchaseId는 메모리 LRU에서 바로 걸러 재전송이 DB까지 가지 않게 한다.
+    반환: 새로 저장했으면 True, 이미 처리된 purchaseId면 False
+    """
+    if recent_purchase_ids.seen(pns_data.purchaseId):
+        return False
+
+    # paymentTypeList를 JSON 문자열로 변환
+    payment_types_json = json.dumps([
+        {"paymentMethod": pt.paymentMethod, "amount": pt.amount}
+        for pt in pns_data.paymentTypeList
+    ], ensure_ascii=False)
+
+    pns_values = dict(
+        msg_version=pns_data.msgVersion,
+        client_id=pns_data.clientId,
+        product_id=pns_data.productId,
+        message_type=pns_data.messageType,
+        purchase_id=pns_data.purchaseId,
+        developer_payload=pns_data.developerPayload,
+        purchase_time_millis=pns_data.purchaseTimeMillis,
+        purchase_state=pns_data.purchaseState,
+        price=pns_data.price,
+        price_currency_code=pns_data.priceCurrencyCode,
+        product_name=pns_data.productName,
+        payment_types=payment_types_json,
+        billing_key=pns_data.billingKey,
+        is_test_mdn=pns_data.isTestMdn,
+        purchase_token=pns_data.purchaseToken,
+        environment=pns_data.environment,
+        market_code=pns_data.marketCode,
+        signature=pns_data.signature,
+        # 원본 요청 JSON 문자열 저장 (서명 검증에 사용한 그대로)
+        raw_data=raw_json,
+        serviceUserId=pns_data.serviceUserId,
+        serviceUserId2=pns_data.serviceUserId2,
+        serviceServerId=pns_data.serviceServerId,
+    )
+
+    # consume은 PNS 저장과 같은 트랜잭션으로 작업 큐에 등록하고 백그라운드에서 처리
+    consume_job = None
+    if pns_data.purchaseState == "COMPLETED":
+        consume_job = dict(
+            purchase_id=pns_data.purchaseId,
+            client_id=pns_data.clientId,
+            product_id=pns_data.productId,
+            purchase_token=pns_data.purchaseToken,
+            developer_payload=pns_data.developerPayload,
+            environment=consume_environment,
+        )
+
+    if pns_writer.running:
+        # 그룹 커밋: 다른 요청과 한 트랜잭션으로 저장, 이 요청이 속한 배치의 commit 후 반환
+        consume_stmt = consume_job_insert(**consume_job) if consume_job is not None else None
+        inserted = await pns_writer.submit(write_ops.pns_insert(pns_values), consume_stmt)
+    else:
+        # 단일 쓰기 연결(멀티 워커에서는 쓰기 프로세스)로 저장 - 연결/소켓 대기는 스레드 풀에서
+        inserted = await run_in_threadpool(write_ops.ingest_pns, pns_values, consume_job)
+    recent_purchase_ids.add(pns_data.purchaseId)
+    return inserted
+
+
 @router.post("/onestore_pns/notification", response_model=schemas.OnestorePNSResponse)
 async def receive_onestore_pns_notification(
     request: Request,
-    req: schemas.OnestorePNSRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     원스토어 PNS(Push Notification Service) 수신 엔드포인트
@@ -235,12 +439,10 @@ async def receive_onestore_pns_notification(
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="Invalid body encoding")
 
-    try:
-        payload = json.loads(raw_json)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    # 본문은 한 번만 파싱하고, 서명 검증과 스키마 검증 모두 이 결과를 사용
+    payload = _parse_pns_body(raw_json)
 
-    sig_err = _verify_onestore_pns_signature(db, raw_json, payload)
+    sig_err = await _verify_onestore_pns_signature(db, body_bytes, payload)
     if sig_err is not None:
         return sig_err
 
@@ -252,13 +454,9 @@ async def receive_onestore_pns_notification(
 
     try:
         logger.info(f"원스토어 PNS 수신: purchaseId={pns_data.purchaseId}, state={pns_data.purchaseState}")
-        
-        # 중복 처리 방지: 이미 처리된 purchaseId인지 확인
-        existing_pns = db.query(models.OnestorePNS).filter(
-            models.OnestorePNS.purchase_id == pns_data.purchaseId
-        ).first()
-        
-        if existing_pns:
+
+        # 중복 처리 방지: 이미 처리된 purchaseId면 저장/consume 등록 없이 성공 응답
+        if not await _ingest_pns(pns_data, raw_json, "COMMERCIAL"):
             logger.warning(f"이미 처리된 purchaseId: {pns_data.purchaseId}")
             return schemas.OnestorePNSResponse(
                 success=True,
@@ -266,51 +464,13 @@ async def receive_onestore_pns_notification(
                 purchaseId=pns_data.purchaseId
             )
         
-        # paymentTypeList를 JSON 문자열로 변환
-        payment_types_json = json.dumps([
-            {"paymentMethod": pt.paymentMethod, "amount": pt.amount}
-            for pt in pns_data.paymentTypeList
-        ], ensure_ascii=False)
-        
-        # 원본 요청 JSON 문자열 저장 (서명 검증에 사용한 그대로)
-        raw_data_json = raw_json
-
-        # DB에 저장
-        db_pns = models.OnestorePNS(
-            msg_version=pns_data.msgVersion,
-            client_id=pns_data.clientId,
-            product_id=pns_data.productId,
-            message_type=pns_data.messageType,
-            purchase_id=pns_data.purchaseId,
-            developer_payload=pns_data.developerPayload,
-            purchase_time_millis=pns_data.purchaseTimeMillis,
-            purchase_state=pns_data.purchaseState,
-            price=pns_data.price,
-            price_currency_code=pns_data.priceCurrencyCode,
-            product_name=pns_data.productName,
-            payment_types=payment_types_json,
-            billing_key=pns_data.billingKey,
-            is_test_mdn=pns_data.isTestMdn,
-            purchase_token=pns_data.purchaseToken,
-            environment=pns_data.environment,
-            market_code=pns_data.marketCode,
-            signature=pns_data.signature,
-            raw_data=raw_data_json,
-            serviceUserId=pns_data.serviceUserId,
-            serviceServerId=pns_data.serviceServerId
-        )
-        
-        db.add(db_pns)
-        db.commit()
-        db.refresh(db_pns)
-        
         message = ""
         # 결제 상태에 따른 추가 처리
         if pns_data.purchaseState == "COMPLETED":
             # TODO: 여기에 게임 아이템 지급 로직 추가
             message = f"결제 완료 처리: {pns_data.productName}( {pns_data.purchaseId} ), payload: {pns_data.developerPayload}, 사용자: {pns_data.serviceUserId}, 서버: {pns_data.serviceServerId}"
             logger.info(message)
-            consume_onestore_purchase(db, pns_data.clientId, pns_data.productId, pns_data.purchaseToken, pns_data.developerPayload, "COMMERCIAL")
+            consume_worker.notify()
             
         elif pns_data.purchaseState == "CANCELED":
             message = f"결제 취소 처리: {pns_data.productName}( {pns_data.purchaseId} ), payload: {pns_data.developerPayload}, 사용자: {pns_data.serviceUserId}, 서버: {pns_data.serviceServerId}"
@@ -328,20 +488,8 @@ async def receive_onestore_pns_notification(
             purchaseId=pns_data.purchaseId
         )
         
-    except IntegrityError as e:
-        db.rollback()
-        logger.error(f"DB 무결성 오류: {str(e)}")
-        # 중복 purchaseId로 인한 오류는 성공으로 처리 (멱등성 보장)
-        if "purchase_id" in str(e).lower():
-            return schemas.OnestorePNSResponse(
-                success=True,
-                message="Already processed (duplicate)",
-                purchaseId=pns_data.purchaseId
-            )
-        raise HTTPException(status_code=500, detail="Database error")
-        
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"PNS 처리 중 오류 발생: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
@@ -349,7 +497,7 @@ async def receive_onestore_pns_notification(
 @router.post("/onestore_pns/sandbox", response_model=schemas.OnestorePNSResponse)
 async def receive_onestore_pns_sandbox(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     """
     원스토어 PNS(Push Notification Service) 수신 엔드포인트 (SANDBOX)
@@ -367,12 +515,10 @@ async def receive_onestore_pns_sandbox(
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="Invalid body encoding")
 
-    try:
-        payload = json.loads(raw_json)
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    # 본문은 한 번만 파싱하고, 서명 검증과 스키마 검증 모두 이 결과를 사용
+    payload = _parse_pns_body(raw_json)
 
-    sig_err = _verify_onestore_pns_signature(db, raw_json, payload)
+    sig_err = await _verify_onestore_pns_signature(db, body_bytes, payload)
     if sig_err is not None:
         return sig_err
 
@@ -384,24 +530,23 @@ async def receive_onestore_pns_sandbox(
 
     try:
         logger.info(f"원스토어 PNS 수신: purchaseId={pns_data.purchaseId}, state={pns_data.purchaseState}")
-        
-        # paymentTypeList를 JSON 문자열로 변환
-        payment_types_json = json.dumps([
-            {"paymentMethod": pt.paymentMethod, "amount": pt.amount}
-            for pt in pns_data.paymentTypeList
-        ], ensure_ascii=False)
-        
-        # 원본 데이터를 JSON 문자열로 저장
-        # raw_data_json = pns_data.model_dump_json()
-        
-        # logger.info(f"원스토어 PNS 수신: purchaseId={pns_data.purchaseId}, state={pns_data.purchaseState}, raw_data={raw_data_json}")
+
+        # 재전송된 알림은 consume을 다시 등록하지 않음
+        if not await _ingest_pns(pns_data, raw_json, "SANDBOX"):
+            logger.warning(f"이미 처리된 purchaseId: {pns_data.purchaseId}")
+            return schemas.OnestorePNSResponse(
+                success=True,
+                message="Already processed",
+                purchaseId=pns_data.purchaseId
+            )
+
         # 결제 상태에 따른 추가 처리
         message = ""
         if pns_data.purchaseState == "COMPLETED":
             message = f"결제 완료 처리: {pns_data.productName}( {pns_data.purchaseId} ), 가격: {pns_data.price}, 사용자: {pns_data.serviceUserId}, 서버: {pns_data.serviceServerId}" 
             logger.info(message)
             # TODO: 여기에 게임 아이템 지급 로직 추가
-            consume_onestore_purchase(db, pns_data.clientId, pns_data.productId, pns_data.purchaseToken, pns_data.developerPayload, "SANDBOX")
+            consume_worker.notify()
             
         elif pns_data.purchaseState == "CANCELED":
             message = f"결제 취소 처리: {pns_data.productName}( {pns_data.purchaseId} ), 가격: {pns_data.price}, 사용자: {pns_data.serviceUserId}, 서버: {pns_data.serviceServerId}"
@@ -420,14 +565,32 @@ async def receive_onestore_pns_sandbox(
         )
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"PNS 처리 중 오류 발생: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@router.get("/onestore_pns/consume_jobs", response_model=schemas.OnestoreConsumeBacklogResponse)
+def get_consume_jobs(db: Session = Depends(get_read_db)):
+    """
+    원스토어 consume 작업 큐 현황 (상태별 건수, 최근 실패 작업)
+    """
+    backlog = get_consume_backlog(db)
+    return schemas.OnestoreConsumeBacklogResponse(
+        result=schemas.ResponseResult(
+            code="0000",
+            message="Consume jobs retrieved successfully"),
+        counts=backlog["counts"],
+        oldestPendingAge=backlog["oldestPendingAge"],
+        inFlight=consume_worker.in_flight,
+        failedJobs=backlog["failedJobs"],
+    )
+
+
 @router.post("/onestore_webshop/consume", response_model=schemas.ResponseResult)
-def force_consume(req: schemas.RequestForceConume):
+def force_consume(req: schemas.RequestForceConume, db: Session = Depends(get_read_db)):
+    # 원스토어 호출 중 쓰기 연결을 잡고 있지 않도록 조회 세션 사용 (토큰 공유 캐시는 짧은 별도 트랜잭션으로 저장)
     try: 
-        result = consume_onestore_purchase(req.clientId, req.productId, req.purchaseToken, req.developerPayload, req.environment)
+        result = consume_onestore_purchase(db, req.clientId, req.productId, req.purchaseToken, req.developerPayload, req.environment)
         return schemas.ResponseResult(
             code="",
             message=str(result)
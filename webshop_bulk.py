@@ -0,0 +1,192 @@
+import os
+import logging
+from typing import Dict, Iterable, Iterator, List, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+import models
+import schemas
+from database import dialect
+from webshop_server_list_cache import server_list_cache
+from webshop_user_index import game_user_index
+
+logger = logging.getLogger(__name__)
+
+# bulk upsert 한 번(트랜잭션)에 처리할 행 수 - 청크마다 commit 하여 쓰기 잠금 시간을 제한
+BULK_UPSERT_CHUNK_SIZE = int(os.getenv("BULK_UPSERT_CHUNK_SIZE", "500"))
+# bulk delete 한 번(트랜잭션)에 삭제할 행 수
+BULK_DELETE_CHUNK_SIZE = int(os.getenv("BULK_DELETE_CHUNK_SIZE", "5000"))
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_upsert_game_servers(
+    db: Session,
+    game_id: str,
+    servers: Iterable[schemas.GameServerItem],
+    chunk_size: int = BULK_UPSERT_CHUNK_SIZE,
+) -> Dict[str, int]:
+    """
+    게임 서버 목록 bulk upsert
+
+    - (game_id, server_id)가 이미 있으면 server_name이 바뀐 경우에만 갱신
+    - 요청 안에서 중복된 server_id는 마지막 값을 사용하고 나머지는 skipped
+    반환: {"inserted", "updated", "skipped"}
+    """
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    unique: Dict[str, str] = {}
+    for server in servers:
+        if server.server_id in unique:
+            counts["skipped"] += 1
+        unique[server.server_id] = server.server_name
+    items = list(unique.items())
+
+    for chunk in _chunks(items, chunk_size):
+        server_ids = [server_id for server_id, _ in chunk]
+        existing = dict(
+            db.query(models.GameServer.server_id, models.GameServer.server_name).filter(
+                models.GameServer.game_id == game_id,
+                models.GameServer.server_id.in_(server_ids),
+            ).all()
+        )
+        changed = 0
+        for server_id, server_name in chunk:
+            if server_id not in existing:
+                counts["inserted"] += 1
+                changed += 1
+            elif existing[server_id] != server_name:
+                counts["updated"] += 1
+                changed += 1
+            else:
+                counts["skipped"] += 1
+
+        stmt = dialect.insert(models.GameServer).values([
+            {"game_id": game_id, "server_id": server_id, "server_name": server_name}
+            for server_id, server_name in chunk
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.GameServer.game_id, models.GameServer.server_id],
+            set_={"server_name": stmt.excluded.server_name, "updated_at": func.now()},
+            where=models.GameServer.server_name != stmt.excluded.server_name,
+        )
+        db.execute(stmt)
+        if changed:
+            server_list_cache.mark_changed(db, game_id)
+        db.commit()
+        if changed:
+            server_list_cache.invalidate(game_id)
+
+    logger.info(f"게임 서버 bulk upsert: game_id={game_id}, {counts}")
+    return counts
+
+
+def bulk_upsert_game_users(
+    db: Session,
+    game_id: str,
+    users: Iterable[schemas.GameUser],
+    chunk_size: int = BULK_UPSERT_CHUNK_SIZE,
+) -> Dict[str, int]:
+    """
+    게임 사용자 목록 bulk insert (이미 등록된 사용자는 skipped)
+
+    사용자 키 (game_id, user_id, server_id, user_id2)에 갱신할 컬럼이 없으므로 updated는 항상 0
+    반환: {"inserted", "updated", "skipped"}
+    """
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    unique: Dict[Tuple[str, str, str], str | None] = {}
+    for user in users:
+        # server_id는 NOT NULL 컬럼이므로 미지정 시 빈 문자열로 저장
+        key = (user.user_id, user.server_id or "", user.user_id2 or "")
+        if key in unique:
+            counts["skipped"] += 1
+            continue
+        unique[key] = user.user_id2
+    items = list(unique.items())
+
+    for chunk in _chunks(items, chunk_size):
+        user_ids = list({user_id for (user_id, _, _), _ in chunk})
+        existing = set(
+            db.query(
+                models.GameUser.user_id,
+                models.GameUser.server_id,
+                func.coalesce(models.GameUser.user_id2, ""),
+            ).filter(
+                models.GameUser.game_id == game_id,
+                models.GameUser.user_id.in_(user_ids),
+            ).all()
+        )
+        chunk_inserted = 0
+        for key, _ in chunk:
+            if key in existing:
+                counts["skipped"] += 1
+            else:
+                chunk_inserted += 1
+        counts["inserted"] += chunk_inserted
+
+        stmt = dialect.insert(models.GameUser).values([
+            {"game_id": game_id, "user_id": user_id, "server_id": server_id, "user_id2": user_id2}
+            for (user_id, server_id, _), user_id2 in chunk
+        ])
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(models.GAME_USER_IDENTITY))
+        db.execute(stmt)
+        if chunk_inserted:
+            game_user_index.mark_changed(db, game_id)
+        db.commit()
+        if chunk_inserted:
+            game_user_index.apply_insert(db, game_id, [key for key, _ in chunk])
+
+    logger.info(f"게임 사용자 bulk upsert: game_id={game_id}, {counts}")
+    return counts
+
+
+def delete_game_users_by_ids(
+    db: Session,
+    game_id: str,
+    user_ids: Iterable[str],
+    chunk_size: int = BULK_DELETE_CHUNK_SIZE,
+) -> int:
+    """
+    user_id 목록에 해당하는 게임 사용자 삭제 (청크 단위 DELETE ... WHERE user_id IN (...))
+    반환: 삭제된 행 수
+    """
+    deleted = 0
+    for chunk in _chunks(list(dict.fromkeys(user_ids)), chunk_size):
+        result = db.execute(
+            delete(models.GameUser).where(
+                models.GameUser.game_id == game_id,
+                models.GameUser.user_id.in_(chunk),
+            )
+        )
+        if result.rowcount:
+            game_user_index.mark_changed(db, game_id)
+        db.commit()
+        if result.rowcount:
+            game_user_index.apply_delete(db, game_id, chunk)
+        deleted += result.rowcount
+    logger.info(f"게임 사용자 bulk delete: game_id={game_id}, deleted={deleted}")
+    return deleted
+
+
+def delete_all_game_users(db: Session, game_id: str, chunk_size: int = BULK_DELETE_CHUNK_SIZE) -> int:
+    """
+    게임의 전체 사용자 삭제
+    한 번에 chunk_size 행씩 삭제/commit 하여 대량 삭제 중에도 쓰기 잠금을 오래 잡지 않음
+    반환: 삭제된 행 수
+    """
+    deleted = 0
+    while True:
+        ids = select(models.GameUser.id).where(models.GameUser.game_id == game_id).limit(max(1, chunk_size))
+        result = db.execute(delete(models.GameUser).where(models.GameUser.id.in_(ids)))
+        if result.rowcount:
+            game_user_index.mark_changed(db, game_id)
+        db.commit()
+        if not result.rowcount:
+            break
+        deleted += result.rowcount
+    # 삭제된 user_id를 알 수 없으므로 인덱스를 버리고 다음 조회 시 다시 생성
+    game_user_index.drop(game_id)
+    logger.info(f"게임 사용자 전체 삭제: game_id={game_id}, deleted={deleted}")
+    return deleted
@@ -1,36 +1,67 @@
+import os
 import requests
 import logging
-from models import OnestoreEnvData
+from typing import Tuple
 from sqlalchemy.orm import Session
-from webshop_onestore_env_api import get_onestore_env_data
+from onestore_env_cache import OnestoreEnvSnapshotRow, onestore_env_cache
+from webshop_token_cache import OnestoreTokenCache
+from webshop_http_client import get_http_client
+from webshop_metrics import time_stage
+from webshop_tracing import start_span
+from webshop_resilience import CircuitOpenError, onestore_resilience
 
 logger = logging.getLogger(__name__)
+# 요청/응답 본문 로그 (샘플링, 토큰 등은 출력 시 가림)
+payload_logger = logging.getLogger(f"{__name__}.payload")
 
+# "이미 consume된 구매" 응답 판별 - 응답을 받지 못한(타임아웃) 이전 시도에서 처리된 경우 성공으로 본다
+# 원스토어가 돌려주는 4xx 응답 본문의 오류 코드(code 또는 error.code) 목록, 쉼표 구분
+# (상태 코드만으로는 다른 오류와 구분할 수 없으므로 기본값 없음 - 미지정 시 모든 4xx를 실패로 처리)
+ONESTORE_ALREADY_CONSUMED_CODES = {
+    v.strip() for v in os.getenv("ONESTORE_ALREADY_CONSUMED_CODES", "").split(",") if v.strip()
+}
 
-def get_env_data(db: Session, client_id: str) -> OnestoreEnvData:
+
+def get_env_data(db: Session, client_id: str) -> OnestoreEnvSnapshotRow:
     """
-    원스토어 환경 데이터 반환
+    원스토어 환경 데이터 반환 (프로세스 내 스냅샷 캐시 사용)
     """
-    env_data = get_onestore_env_data(db, client_id)
+    with time_stage("env_lookup"):
+        env_data = onestore_env_cache.get(db, client_id)
     if not env_data:
         raise Exception(f"원스토어 환경 데이터를 찾을 수 없습니다. client_id: {client_id}")
     return env_data
 
-def get_pns_domain(env_data: OnestoreEnvData, environment: str = "SANDBOX") -> str:
+def get_pns_domain(env_data: OnestoreEnvSnapshotRow, environment: str = "SANDBOX") -> str:
     if environment == "SANDBOX":
         return env_data.pns_sandbox_domain
     else: # COMMERCIAL
         return env_data.pns_commercial_domain
 
 
-def get_onestore_client_secret(env_data: OnestoreEnvData) -> str:
+def get_onestore_base_url(domain: str) -> str:
+    """
+    pns 도메인 -> API 기본 URL
+    스킴이 없으면 https, "http://127.0.0.1:18443" 처럼 스킴을 포함하면 그대로 사용 (로컬 대역 서버)
+    """
+    domain = domain.strip().rstrip("/")
+    if domain.startswith(("http://", "https://")):
+        return domain
+    return f"https://{domain}"
+
+
+def get_onestore_client_secret(env_data: OnestoreEnvSnapshotRow) -> str:
     if env_data and env_data.client_secret:
         return env_data.client_secret
     else:
         raise ValueError(f"원스토어 클라이언트 시크릿을 찾을 수 없습니다. client_id: {env_data}")
 
-def get_onestore_access_token(client_id: str, domain: str, client_secret: str) -> str:
-    url = f"https://{domain}/v2/oauth/token"
+def _request_onestore_access_token(client_id: str, domain: str, client_secret: str) -> Tuple[str, int]:
+    """
+    원스토어 OAuth 토큰 발급 요청
+    반환: (access_token, expires_in)
+    """
+    url = f"{get_onestore_base_url(domain)}/v2/oauth/token"
     headers = {
         "Content-Type": "application/x-www-form-urlencoded",
         "Accept": "application/json",
@@ -41,18 +72,73 @@ def get_onestore_access_token(client_id: str, domain: str, client_secret: str) -
         "client_secret": client_secret,
         "grant_type": "client_credentials",
     }
-    response = requests.post(url, data=body, headers=headers, timeout=10)
+    with start_span("onestore.token", domain=domain) as span, time_stage("token_fetch"):
+        response = onestore_resilience.call(
+            domain,
+            "token",
+            lambda timeout: get_http_client().post(url, data=body, headers=headers, timeout=timeout),
+        )
+        if span is not None:
+            span.set(status=response.status_code)
 
     if response.status_code == 200:
-        response_json_data = response.json();
-        print(response_json_data)
-        logger.info(f"get_accesss_token: {response_json_data}")
-        return response_json_data.get("access_token", "")
+        response_json_data = response.json()
+        logger.info(f"원스토어 액세스 토큰 발급: client_id={client_id}, expires_in={response_json_data.get('expires_in')}")
+        return response_json_data.get("access_token", ""), int(response_json_data.get("expires_in") or 0)
     else:
         raise Exception(f"원스토어 액세스 토큰 발급 실패: {response.text}")
 
 
-def consume_onestore_purchase(db: Session, client_id: str, product_id: str, purchase_token: str, developerPayload: str, environment: str = "SANDBOX") -> dict:
+token_cache = OnestoreTokenCache(_request_onestore_access_token)
+
+
+def get_onestore_access_token(client_id: str, domain: str, client_secret: str) -> str:
+    """
+    캐시된 원스토어 액세스 토큰 반환 (없거나 만료 임박 시 발급)
+    """
+    return token_cache.get(client_id, domain, client_secret)
+
+
+def _is_already_consumed(response: requests.Response) -> bool:
+    if not ONESTORE_ALREADY_CONSUMED_CODES or not 400 <= response.status_code < 500:
+        return False
+    try:
+        data = response.json()
+    except ValueError:
+        return False
+    if not isinstance(data, dict):
+        return False
+    error = data.get("error")
+    code = error.get("code") if isinstance(error, dict) else data.get("code")
+    return code in ONESTORE_ALREADY_CONSUMED_CODES
+
+
+class OnestoreConsumeError(Exception):
+    """
+    원스토어 consume 실패
+    retryable=False 인 경우 재시도해도 성공할 수 없는 오류 (4xx 등)
+    """
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = True,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status_code = status_code
+        # 다시 시도하기 전 최소 대기 시간(초) - 서킷 브레이커가 열린 경우
+        self.retry_after = retry_after
+
+
+def request_onestore_consume(db: Session, client_id: str, product_id: str, purchase_token: str, developerPayload: str, environment: str = "SANDBOX", purchase_id: str | None = None) -> dict:
+    """
+    원스토어 consume 호출
+    실패 시 OnestoreConsumeError 발생 (consume 작업 큐에서 재시도 판단에 사용)
+    오류 메시지는 작업 큐(last_error)와 로그에 남으므로 purchaseToken 대신 purchase_id로 구분한다.
+    """
     env_data = get_env_data(db, client_id)
     if not env_data:
         raise Exception(f"원스토어 환경 데이터를 찾을 수 없습니다. client_id: {client_id}")
@@ -63,7 +149,7 @@ def consume_onestore_purchase(db: Session, client_id: str, product_id: str, purc
     if not access_token:
         raise Exception(f"원스토어 액세스 토큰 발급 실패")
 
-    consume_url = f"https://{pns_domain}/v7/apps/{client_id}/purchases/inapp/products/{product_id}/{purchase_token}/consume"
+    consume_url = f"{get_onestore_base_url(pns_domain)}/v7/apps/{client_id}/purchases/inapp/products/{product_id}/{purchase_token}/consume"
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
@@ -75,24 +161,58 @@ def consume_onestore_purchase(db: Session, client_id: str, product_id: str, purc
         "developerPayload": developerPayload,
     }
     
+    # URL에 purchaseToken이, 헤더에 액세스 토큰이 있으므로 출력하지 않음
+    payload_logger.info(f"consume 요청: client_id={client_id}, product_id={product_id}, body={body}")
     try:
-        logger.info(f"url: {consume_url}")
-        logger.info(f"header: {headers}")
-        logger.info(f"body: {body}")
-        response = requests.post(consume_url, json=body, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            resp_data = response.json()
-            result = resp_data.get("result", {})
-            logger.info(f"consume response: {resp_data}")
-            return resp_data
-        else:
-            logger.error(f"원스토어 consume 실패: status={response.status_code}, response={response.text}")
-            return {}
-            
+        with start_span("onestore.consume", domain=pns_domain, product_id=product_id) as span, time_stage("consume_call"):
+            # 읽기 타임아웃이면 원스토어가 이미 처리했을 수 있으므로 바로 재시도하지 않음 (consume 작업 큐가 나중에 재시도)
+            response = onestore_resilience.call(
+                pns_domain,
+                "consume",
+                lambda timeout: get_http_client().post(consume_url, json=body, headers=headers, timeout=timeout),
+                retry_read_timeout=False,
+            )
+            if span is not None:
+                span.set(status=response.status_code)
+    except CircuitOpenError as e:
+        raise OnestoreConsumeError(str(e), retry_after=e.retry_after)
     except requests.exceptions.Timeout:
-        logger.error(f"원스토어 consume 타임아웃: {purchase_token}")
-        return {}
+        raise OnestoreConsumeError(f"원스토어 consume 타임아웃: purchaseId={purchase_id}, product_id={product_id}")
+    except requests.exceptions.RequestException as e:
+        # requests 오류 메시지에는 요청 URL(purchaseToken 포함)이 들어갈 수 있음
+        message = str(e).replace(purchase_token, "***")
+        raise OnestoreConsumeError(f"원스토어 consume 요청 오류: purchaseId={purchase_id}, {message}")
+
+    if response.status_code == 200:
+        resp_data = response.json()
+        payload_logger.info(f"consume response: {resp_data}")
+        return resp_data
+    if _is_already_consumed(response):
+        # 이전 시도가 응답 전에 타임아웃됐지만 원스토어에서는 처리된 경우 - 목표 상태이므로 성공
+        logger.info(f"원스토어 consume 이미 처리됨: purchaseId={purchase_id}, product_id={product_id}, status={response.status_code}")
+        return {"alreadyConsumed": True}
+    if response.status_code == 401:
+        # 캐시된 토큰이 거부된 경우 다음 요청에서 새로 발급
+        token_cache.invalidate(client_id, pns_domain)
+        raise OnestoreConsumeError(
+            f"원스토어 consume 인증 실패(토큰 무효화): status={response.status_code}, response={response.text}",
+            status_code=response.status_code,
+        )
+    # 408/429/5xx 는 일시적 오류로 보고 재시도, 그 외 4xx 는 재시도하지 않음
+    retryable = response.status_code in (408, 429) or response.status_code >= 500
+    raise OnestoreConsumeError(
+        f"원스토어 consume 실패: status={response.status_code}, response={response.text}",
+        retryable=retryable,
+        status_code=response.status_code,
+    )
+
+
+def consume_onestore_purchase(db: Session, client_id: str, product_id: str, purchase_token: str, developerPayload: str, environment: str = "SANDBOX") -> dict:
+    """
+    원스토어 consume 호출 (실패 시 로그만 남기고 빈 dict 반환)
+    """
+    try:
+        return request_onestore_consume(db, client_id, product_id, purchase_token, developerPayload, environment)
     except Exception as e:
         logger.error(f"원스토어 consume 오류: {str(e)}")
-        return {}
\ No newline at end of file
+        return {}
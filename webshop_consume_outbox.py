@@ -0,0 +1,291 @@
+import os
+import random
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from sqlalchemy import func, or_, and_
+from sqlalchemy.orm import Session
+import models
+from database import ReadSessionLocal, SessionLocal, dialect
+from webshop_consume import OnestoreConsumeError, request_onestore_consume
+from webshop_metrics import time_stage
+from webshop_tracing import start_trace
+
+logger = logging.getLogger(__name__)
+
+# consume 작업 큐 설정
+CONSUME_WORKER_ENABLED = os.getenv("CONSUME_WORKER_ENABLED", "1") == "1"
+# 동시에 처리할 consume 작업 수
+CONSUME_WORKER_CONCURRENCY = int(os.getenv("CONSUME_WORKER_CONCURRENCY", "4"))
+# 대기 작업 폴링 주기(초) - 새 작업 등록 시에는 즉시 깨어남
+CONSUME_POLL_INTERVAL = float(os.getenv("CONSUME_POLL_INTERVAL", "1.0"))
+CONSUME_MAX_ATTEMPTS = int(os.getenv("CONSUME_MAX_ATTEMPTS", "10"))
+CONSUME_BACKOFF_BASE = float(os.getenv("CONSUME_BACKOFF_BASE", "2.0"))
+CONSUME_BACKOFF_MAX = float(os.getenv("CONSUME_BACKOFF_MAX", "600"))
+# IN_FLIGHT 상태로 이 시간(초) 이상 남아 있으면 워커 비정상 종료로 보고 재처리
+CONSUME_INFLIGHT_TIMEOUT = float(os.getenv("CONSUME_INFLIGHT_TIMEOUT", "120"))
+
+STATUS_PENDING = "PENDING"
+STATUS_IN_FLIGHT = "IN_FLIGHT"
+STATUS_DONE = "DONE"
+STATUS_FAILED = "FAILED"
+
+
+def consume_job_insert(
+    purchase_id: str,
+    client_id: str,
+    product_id: str,
+    purchase_token: str,
+    developer_payload: Optional[str],
+    environment: str,
+):
+    """
+    consume 작업 등록 INSERT 문 (실행/commit은 호출자가 PNS 저장과 같은 트랜잭션에서 수행)
+    이미 같은 purchaseId 작업이 있으면 아무것도 하지 않는다.
+    """
+    stmt = dialect.insert(models.OnestoreConsumeJob).values(
+        purchase_id=purchase_id,
+        client_id=client_id,
+        product_id=product_id,
+        purchase_token=purchase_token,
+        developer_payload=developer_payload,
+        environment=environment,
+        status=STATUS_PENDING,
+        attempts=0,
+        next_attempt_at=time.time(),
+    )
+    return stmt.on_conflict_do_nothing(index_elements=[models.OnestoreConsumeJob.purchase_id])
+
+
+def _backoff_delay(attempts: int) -> float:
+    """지수 백오프 + jitter"""
+    delay = min(CONSUME_BACKOFF_MAX, CONSUME_BACKOFF_BASE * (2 ** max(attempts - 1, 0)))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def get_consume_backlog(db: Session, failed_limit: int = 20) -> dict:
+    """상태별 작업 수, 가장 오래된 대기 작업, 최근 실패 작업"""
+    counts = {status: 0 for status in (STATUS_PENDING, STATUS_IN_FLIGHT, STATUS_DONE, STATUS_FAILED)}
+    rows = db.query(models.OnestoreConsumeJob.status, func.count(models.OnestoreConsumeJob.id)).group_by(
+        models.OnestoreConsumeJob.status
+    ).all()
+    for status, count in rows:
+        counts[status] = count
+
+    oldest_pending = db.query(func.min(models.OnestoreConsumeJob.next_attempt_at)).filter(
+        models.OnestoreConsumeJob.status == STATUS_PENDING
+    ).scalar()
+
+    failed_jobs = db.query(models.OnestoreConsumeJob).filter(
+        models.OnestoreConsumeJob.status == STATUS_FAILED
+    ).order_by(models.OnestoreConsumeJob.id.desc()).limit(failed_limit).all()
+
+    return {
+        "counts": counts,
+        "oldestPendingAge": max(0.0, time.time() - oldest_pending) if oldest_pending else None,
+        "failedJobs": failed_jobs,
+    }
+
+
+class ConsumeOutboxWorker:
+    """
+    onestore_consume_jobs 테이블을 소비하는 백그라운드 워커
+
+    - 디스패처 스레드가 실행 가능한 작업을 찾아 조건부 UPDATE로 선점(IN_FLIGHT)
+    - 스레드 풀에서 최대 CONSUME_WORKER_CONCURRENCY개까지 동시에 consume 호출
+    - 실패 시 지수 백오프로 재시도, 재시도 불가 오류나 최대 횟수 초과 시 FAILED
+    """
+
+    def __init__(self, concurrency: int = CONSUME_WORKER_CONCURRENCY):
+        self._concurrency = max(1, concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._slots = threading.Semaphore(self._concurrency)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix="onestore-consume")
+        self._thread = threading.Thread(target=self._run, name="onestore-consume-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info(f"consume 작업 워커 시작: concurrency={self._concurrency}")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+        self._thread = None
+        self._executor = None
+        logger.info("consume 작업 워커 종료")
+
+    def notify(self) -> None:
+        """새 작업이 등록되었음을 알림 (폴링 대기 없이 바로 처리)"""
+        self._wakeup.set()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = self._dispatch()
+            except Exception as e:
+                logger.error(f"consume 작업 디스패치 오류: {e}", exc_info=True)
+                claimed = 0
+            if claimed == 0:
+                self._wakeup.wait(CONSUME_POLL_INTERVAL)
+                self._wakeup.clear()
+
+    def _dispatch(self) -> int:
+        free = self._concurrency - self._in_flight
+        if free <= 0:
+            # 실행 중인 작업이 끝날 때까지 대기
+            self._slots.acquire()
+            self._slots.release()
+            return 0
+
+        now = time.time()
+        # 대기 작업 조회는 읽기 연결로 (폴링이 쓰기 연결을 점유하지 않도록)
+        read_db = ReadSessionLocal()
+        try:
+            candidates = read_db.query(models.OnestoreConsumeJob.id).filter(
+                or_(
+                    and_(
+                        models.OnestoreConsumeJob.status == STATUS_PENDING,
+                        models.OnestoreConsumeJob.next_attempt_at <= now,
+                    ),
+                    and_(
+                        models.OnestoreConsumeJob.status == STATUS_IN_FLIGHT,
+                        models.OnestoreConsumeJob.locked_at < now - CONSUME_INFLIGHT_TIMEOUT,
+                    ),
+                )
+            ).order_by(models.OnestoreConsumeJob.next_attempt_at).limit(free).all()
+        finally:
+            read_db.close()
+        if not candidates:
+            return 0
+
+        db = SessionLocal()
+        try:
+            claimed = 0
+            for (job_id,) in candidates:
+                # 다른 워커(프로세스)와 경합하지 않도록 조건부 UPDATE로 선점
+                updated = db.query(models.OnestoreConsumeJob).filter(
+                    models.OnestoreConsumeJob.id == job_id,
+                    or_(
+                        models.OnestoreConsumeJob.status == STATUS_PENDING,
+                        and_(
+                            models.OnestoreConsumeJob.status == STATUS_IN_FLIGHT,
+                            models.OnestoreConsumeJob.locked_at < now - CONSUME_INFLIGHT_TIMEOUT,
+                        ),
+                    ),
+                ).update(
+                    {
+                        models.OnestoreConsumeJob.status: STATUS_IN_FLIGHT,
+                        models.OnestoreConsumeJob.locked_at: now,
+                        models.OnestoreConsumeJob.attempts: models.OnestoreConsumeJob.attempts + 1,
+                    },
+                    synchronize_session=False,
+                )
+                db.commit()
+                if updated:
+                    self._submit(job_id, now)
+                    claimed += 1
+            return claimed
+        finally:
+            db.close()
+
+    def _submit(self, job_id: int, locked_at: float) -> None:
+        self._slots.acquire()
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(self._process, job_id, locked_at)
+        future.add_done_callback(self._release)
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+        self._wakeup.set()
+
+    def _process(self, job_id: int, locked_at: float) -> None:
+        with start_trace("consume_job", job_id=job_id):
+            self._process_job(job_id, locked_at)
+
+    def _process_job(self, job_id: int, locked_at: float) -> None:
+        """
+        locked_at: 선점 시 기록한 시각 - 이 값이 그대로인 동안만 이 워커가 작업을 소유한다
+        (처리가 CONSUME_INFLIGHT_TIMEOUT을 넘겨 다른 워커가 다시 선점하면 결과를 저장하지 않음)
+        """
+        # 원스토어 호출 중에 쓰기 연결을 잡고 있지 않도록 조회/호출/결과 저장을 분리
+        db = SessionLocal()
+        try:
+            job = db.query(models.OnestoreConsumeJob).filter(models.OnestoreConsumeJob.id == job_id).first()
+            if job is None or job.status != STATUS_IN_FLIGHT or job.locked_at != locked_at:
+                return
+            purchase_id = job.purchase_id
+            attempts = job.attempts
+            params = (job.client_id, job.product_id, job.purchase_token, job.developer_payload, job.environment)
+        finally:
+            db.close()
+
+        error: Optional[Exception] = None
+        read_db = ReadSessionLocal()
+        try:
+            request_onestore_consume(read_db, *params, purchase_id=purchase_id)
+        except Exception as e:
+            error = e
+        finally:
+            read_db.close()
+
+        values = {models.OnestoreConsumeJob.locked_at: None}
+        if error is None:
+            values[models.OnestoreConsumeJob.status] = STATUS_DONE
+            values[models.OnestoreConsumeJob.last_error] = None
+            logger.info(f"원스토어 consume 완료: purchaseId={purchase_id}, attempts={attempts}")
+        else:
+            retryable = not isinstance(error, OnestoreConsumeError) or error.retryable
+            values[models.OnestoreConsumeJob.last_error] = str(error)
+            if retryable and attempts < CONSUME_MAX_ATTEMPTS:
+                values[models.OnestoreConsumeJob.status] = STATUS_PENDING
+                # 서킷 브레이커가 열린 경우 시험 호출이 가능해질 때까지는 다시 시도하지 않음
+                delay = max(_backoff_delay(attempts), getattr(error, "retry_after", None) or 0.0)
+                values[models.OnestoreConsumeJob.next_attempt_at] = time.time() + delay
+                logger.warning(f"원스토어 consume 재시도 예정: purchaseId={purchase_id}, attempts={attempts}, error={error}")
+            else:
+                values[models.OnestoreConsumeJob.status] = STATUS_FAILED
+                logger.error(f"원스토어 consume 최종 실패: purchaseId={purchase_id}, attempts={attempts}, error={error}")
+
+        db = SessionLocal()
+        try:
+            updated = db.query(models.OnestoreConsumeJob).filter(
+                models.OnestoreConsumeJob.id == job_id,
+                models.OnestoreConsumeJob.status == STATUS_IN_FLIGHT,
+                models.OnestoreConsumeJob.locked_at == locked_at,
+            ).update(values, synchronize_session=False)
+            with time_stage("db_commit"):
+                db.commit()
+            if not updated:
+                logger.warning(
+                    f"consume 작업이 다른 워커에 다시 선점되어 결과를 저장하지 않음: "
+                    f"job_id={job_id}, purchaseId={purchase_id}, status={values[models.OnestoreConsumeJob.status]}"
+                )
+        except Exception as e:
+            db.rollback()
+            logger.error(f"consume 작업 결과 저장 오류: job_id={job_id}, error={e}", exc_info=True)
+        finally:
+            db.close()
+
+
+consume_worker = ConsumeOutboxWorker()
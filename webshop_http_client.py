@@ -0,0 +1,65 @@
+import os
+import threading
+import logging
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# 원스토어 외부 호출용 HTTP 클라이언트 설정
+# 호스트(도메인)별 커넥션 풀 개수 (sandbox / commercial 등)
+HTTP_POOL_CONNECTIONS = int(os.getenv("ONESTORE_HTTP_POOL_CONNECTIONS", "4"))
+# 호스트당 유지할 keep-alive 커넥션 최대 개수
+HTTP_POOL_MAXSIZE = int(os.getenv("ONESTORE_HTTP_POOL_MAXSIZE", "16"))
+# 풀이 가득 찼을 때 새 커넥션을 열지 않고 대기할지 여부
+HTTP_POOL_BLOCK = os.getenv("ONESTORE_HTTP_POOL_BLOCK", "0") == "1"
+HTTP_CONNECT_TIMEOUT = float(os.getenv("ONESTORE_HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("ONESTORE_HTTP_READ_TIMEOUT", "10"))
+
+_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def _create_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        pool_block=HTTP_POOL_BLOCK,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def init_http_client() -> requests.Session:
+    """앱 시작 시 프로세스 공용 HTTP 클라이언트 생성"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _create_session()
+            logger.info(
+                f"원스토어 HTTP 클라이언트 생성: pool_connections={HTTP_POOL_CONNECTIONS}, "
+                f"pool_maxsize={HTTP_POOL_MAXSIZE}, timeout=({HTTP_CONNECT_TIMEOUT}, {HTTP_READ_TIMEOUT})"
+            )
+        return _session
+
+
+def close_http_client() -> None:
+    """앱 종료 시 keep-alive 커넥션 정리"""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_http_client() -> requests.Session:
+    """
+    프로세스 공용 HTTP 클라이언트 반환
+    (앱 lifespan 밖에서 호출된 경우 지연 생성)
+    """
+    if _session is None:
+        return init_http_client()
+    return _session
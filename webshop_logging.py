@@ -0,0 +1,218 @@
+import os
+import re
+import sys
+import json
+import queue
+import random
+import copy
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from webshop_metrics import Counter
+from webshop_tracing import TraceIdFilter
+
+# 로깅 설정
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json: 한 줄에 JSON 객체 하나 / text: 기존 텍스트 형식
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# 요청 스레드와 출력 스레드 사이 큐 크기 - 가득 차면 기록을 버리고 개수만 센다
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# 요청/응답 본문 등 상세 로그(*.payload 로거) 기본 샘플링 비율 (0~1)
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+# 로거별 샘플링 비율 - "verify_onestore_webhook.payload=0.1,webshop_consume.payload=1"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 값을 가릴 필드 (토큰, 시크릿, 서명)
+REDACT_FIELDS = (
+    "access_token",
+    "client_secret",
+    "license_key",
+    "signature",
+    "purchaseToken",
+    "purchase_token",
+    "Authorization",
+)
+REDACTED = "***"
+_REDACT_KEYS = {field.lower() for field in REDACT_FIELDS}
+
+_FIELDS_PATTERN = "|".join(re.escape(field) for field in REDACT_FIELDS)
+# "key": "value" / 'key': 'value' (JSON, dict repr)
+_QUOTED_VALUE_RE = re.compile(
+    rf"""(["']?(?:{_FIELDS_PATTERN})["']?\s*[:=]\s*)(["'])(.*?)(?<!\\)\2""", re.IGNORECASE
+)
+# key=value (쿼리 문자열, 로그 메시지)
+_PLAIN_VALUE_RE = re.compile(rf"""(\b(?:{_FIELDS_PATTERN})=)([^\s,&'"]+)""", re.IGNORECASE)
+_BEARER_RE = re.compile(r"(Bearer\s+)[A-Za-z0-9._~+/=-]+")
+
+
+def redact(text: str) -> str:
+    """메시지 문자열에서 토큰/시크릿/서명 값을 가린다"""
+    if not text:
+        return text
+    text = _QUOTED_VALUE_RE.sub(lambda m: f"{m.group(1)}{m.group(2)}{REDACTED}{m.group(2)}", text)
+    text = _PLAIN_VALUE_RE.sub(lambda m: f"{m.group(1)}{REDACTED}", text)
+    return _BEARER_RE.sub(lambda m: f"{m.group(1)}{REDACTED}", text)
+
+
+def _redact_value(key: str, value):
+    if key.lower() in _REDACT_KEYS:
+        return REDACTED
+    if isinstance(value, str):
+        return redact(value)
+    if isinstance(value, dict):
+        return {k: _redact_value(k, v) for k, v in value.items()}
+    return value
+
+
+# LogRecord 기본 속성 - 이외의 속성(extra=...)은 JSON 필드로 출력
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄 JSON 로그 (extra 필드 포함, 민감 값 가림)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = _redact_value(key, value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = redact(record.exc_text)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RedactingTextFormatter(logging.Formatter):
+    """기존 텍스트 형식 + 민감 값 가림"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return redact(super().format(record))
+
+
+def _parse_sample_rates(value: str) -> Dict[str, float]:
+    rates = {}
+    for item in value.split(","):
+        name, sep, rate = item.strip().partition("=")
+        if sep:
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    로거별 샘플링 - WARNING 이상은 항상 통과
+    설정에 없는 *.payload 로거는 LOG_PAYLOAD_SAMPLE_RATE를 사용
+    """
+
+    def __init__(self, rates: Dict[str, float], payload_rate: float = LOG_PAYLOAD_SAMPLE_RATE):
+        super().__init__()
+        self._rates = rates
+        self._payload_rate = payload_rate
+        self._cache: Dict[str, Optional[float]] = {}
+
+    def _rate(self, name: str) -> Optional[float]:
+        if name not in self._cache:
+            rate = None
+            # 가장 가까운 상위 로거 설정 사용
+            candidate = name
+            while candidate:
+                if candidate in self._rates:
+                    rate = self._rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            if rate is None and name.endswith(".payload"):
+                rate = self._payload_rate
+            self._cache[name] = rate
+        return self._cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or rate >= 1 or random.random() < rate
+
+
+log_records_dropped_total = Counter("log_records_dropped_total", "로그 큐가 가득 차 버린 로그 수", ())
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    큐가 가득 차면 요청 스레드를 막지 않고 기록을 버린다
+
+    기본 QueueHandler.prepare()는 요청 스레드에서 format()(JSON 변환, 가림)을 실행하므로,
+    여기서는 메시지 인자와 예외만 문자열로 만들어 두고 포맷은 리스너 스레드의 핸들러에 맡긴다.
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # 인자/예외 객체는 이후 다른 스레드에서 바뀔 수 있으므로 지금 값으로 문자열화
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    루트 로거를 큐 기반으로 설정
+
+    요청 스레드는 기록을 큐에 넣기만 하고, 포맷(JSON/가림)과 stdout 쓰기는 백그라운드 스레드가 처리한다.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(RedactingTextFormatter(TEXT_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = _DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(_parse_sample_rates(LOG_SAMPLE_RATES)))
+    # 요청 스레드에서 현재 trace_id를 기록에 붙임 (JSON 출력의 trace_id 필드)
+    queue_handler.addFilter(TraceIdFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """큐에 남은 로그를 모두 출력하고 백그라운드 스레드 종료"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
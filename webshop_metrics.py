@@ -0,0 +1,315 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+# 기본 지연 시간 버킷(초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Shard:
+    """스레드 하나가 쓰는 값 모음 - 쓰기는 해당 스레드만 하므로 락이 필요 없다"""
+
+    __slots__ = ("values", "histograms")
+
+    def __init__(self):
+        self.values: Dict[Tuple[str, LabelValues], float] = {}
+        # (버킷별 개수, 합계, 개수)
+        self.histograms: Dict[Tuple[str, LabelValues], List] = {}
+
+    def merge(self, other: "_Shard") -> None:
+        for key, value in other.values.items():
+            self.values[key] = self.values.get(key, 0.0) + value
+        for key, (counts, total, count) in other.histograms.items():
+            entry = self.histograms.get(key)
+            if entry is None:
+                self.histograms[key] = [list(counts), total, count]
+                continue
+            for i, bucket_count in enumerate(counts):
+                entry[0][i] += bucket_count
+            entry[1] += total
+            entry[2] += count
+
+
+class MetricsRegistry:
+    """
+    스레드별 샤드에 기록하고 /metrics 조회 시에만 합산하는 지표 저장소
+
+    요청 경로에서는 락 없이 자기 스레드의 dict만 갱신한다.
+    종료된 스레드(토큰 갱신, 교체된 스레드 풀 스레드 등)의 샤드는 조회 시 하나로 합쳐 목록이 계속 늘지 않게 한다.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, _Shard]] = []
+        # 종료된 스레드들의 값 합계 (render 중에만 갱신)
+        self._retired = _Shard()
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def register(self, metric: "_Metric") -> "_Metric":
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """조회 시점에 값을 계산하는 지표 (예: 커넥션 풀 사용량)"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        with self._render_lock:
+            with self._lock:
+                dead = [shard for thread, shard in self._shards if not thread.is_alive()]
+                self._shards = [(thread, shard) for thread, shard in self._shards if thread.is_alive()]
+                shards = [shard for _, shard in self._shards]
+            # 종료된 스레드는 더 이상 쓰지 않으므로 락 없이 합쳐도 된다
+            for shard in dead:
+                self._retired.merge(shard)
+            shards.append(self._retired)
+            lines: List[str] = []
+            for metric in self._metrics.values():
+                lines.extend(metric.render(shards))
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def _merged_values(self, shards: List[_Shard]) -> Dict[LabelValues, float]:
+        merged: Dict[LabelValues, float] = {}
+        for shard in shards:
+            for (name, labels), value in list(shard.values.items()):
+                if name == self.name:
+                    merged[labels] = merged.get(labels, 0.0) + value
+        return merged
+
+    def render(self, shards: List[_Shard]) -> List[str]:
+        lines = self._header()
+        for labels, value in sorted(self._merged_values(shards).items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        if not METRICS_ENABLED:
+            return
+        values = registry.shard().values
+        key = (self.name, labels)
+        values[key] = values.get(key, 0.0) + value
+
+
+class Gauge(_Metric):
+    """
+    스레드별 증감값의 합으로 표현하는 게이지 (예: 처리 중인 요청 수)
+    """
+    kind = "gauge"
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        if not METRICS_ENABLED:
+            return
+        values = registry.shard().values
+        key = (self.name, labels)
+        values[key] = values.get(key, 0.0) + value
+
+    def dec(self, *labels: str, value: float = 1.0) -> None:
+        self.inc(*labels, value=-value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        histograms = registry.shard().histograms
+        key = (self.name, labels)
+        entry = histograms.get(key)
+        if entry is None:
+            entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histograms[key] = entry
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self, shards: List[_Shard]) -> List[str]:
+        merged: Dict[LabelValues, List] = {}
+        for shard in shards:
+            for (name, labels), (counts, total, count) in list(shard.histograms.items()):
+                if name != self.name:
+                    continue
+                entry = merged.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0, 0])
+                for i, bucket_count in enumerate(counts):
+                    entry[0][i] += bucket_count
+                entry[1] += total
+                entry[2] += count
+
+        lines = self._header()
+        for labels, (counts, total, count) in sorted(merged.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+# HTTP 요청
+http_requests_total = Counter(
+    "http_requests_total", "HTTP 요청 수", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간(초)", ("method", "route", "status")
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "처리 중인 HTTP 요청 수")
+
+# 처리 단계별 시간 (verify, env_lookup, db_commit, token_fetch, consume_call)
+stage_duration_seconds = Histogram("onestore_stage_duration_seconds", "처리 단계별 소요 시간(초)", ("stage",))
+
+
+def time_stage(stage: str):
+    """with time_stage("verify"): ... 형태로 단계 시간 기록"""
+    return stage_duration_seconds.time(stage)
+
+
+def add_pool_collector(pools: Dict[str, Callable[[], object]]) -> None:
+    """
+    DB 커넥션 풀 사용량 게이지 등록
+    pools: {"write": lambda: engine.pool, ...}
+    """
+
+    def _collect() -> Iterable[str]:
+        lines = [
+            "# HELP db_pool_checked_out 사용 중인 DB 연결 수",
+            "# TYPE db_pool_checked_out gauge",
+        ]
+        size_lines = [
+            "# HELP db_pool_size DB 커넥션 풀 크기",
+            "# TYPE db_pool_size gauge",
+        ]
+        for name, get_pool in pools.items():
+            pool = get_pool()
+            checked_out = getattr(pool, "checkedout", None)
+            size = getattr(pool, "size", None)
+            if callable(checked_out):
+                lines.append(f'db_pool_checked_out{{engine="{name}"}} {checked_out()}')
+            if callable(size):
+                size_lines.append(f'db_pool_size{{engine="{name}"}} {size()}')
+        return lines + size_lines
+
+    registry.add_collector(_collect)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    요청 수/지연 시간/처리 중 요청 수를 기록하는 ASGI 미들웨어
+    라벨은 실제 경로가 아닌 라우트 템플릿(/gameserver/{game_id}/list)을 사용해 카디널리티를 제한한다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            http_requests_in_flight.dec()
+            labels = (scope.get("method", ""), _route_label(scope), str(status["code"]))
+            http_requests_total.inc(*labels)
+            http_request_duration_seconds.observe(time.perf_counter() - started, *labels)
+
+
+def render_metrics() -> str:
+    return registry.render()
+
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
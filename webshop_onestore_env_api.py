@@ -3,7 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 import models
 import schemas
-from database import get_db
+from database import get_read_db
+from onestore_env_cache import onestore_env_cache
+from verify_onestore_webhook import public_key_cache
+from webshop_server_list_cache import server_list_cache
+from webshop_resilience import onestore_resilience
+import webshop_write_ops as write_ops
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,47 +18,20 @@ router = APIRouter()
 
 
 @router.post("/onestore/env", response_model=schemas.OnestoreEnvDataResponse)
-def create_onestore_env(
-    env_data: schemas.OnestoreEnvDataCreate,
-    db: Session = Depends(get_db)
-):
+def create_onestore_env(env_data: schemas.OnestoreEnvDataCreate):
     """
     원스토어 환경 데이터 생성
     
     - client_id로 이미 존재하는 경우 에러 반환
     """
-    # 중복 체크
-    existing = get_onestore_env_data(db, env_data.client_id)
-    
-    if existing:
-        raise HTTPException(
-            status_code=400,
-            detail=f"이미 존재하는 client_id입니다: {env_data.client_id}"
-        )
-    
-    # 새 데이터 생성
-    db_env_data = models.OnestoreEnvData(
-        client_id=env_data.client_id,
-        license_key=env_data.license_key,
-        client_secret=env_data.client_secret,
-        pns_sandbox_domain=env_data.pns_sandbox_domain,
-        pns_commercial_domain=env_data.pns_commercial_domain
-    )
-    
-    db.add(db_env_data)
-    db.commit()
-    db.refresh(db_env_data)
-    
-    logger.info(f"원스토어 환경 데이터 생성: client_id={env_data.client_id}")
-    
     return schemas.OnestoreEnvDataResponse(
         result=schemas.ResponseResult(code="0000", message="생성 성공"),
-        envData=db_env_data
+        envData=write_ops.create_onestore_env(env_data)
     )
 
 
 @router.get("/onestore/env", response_model=schemas.OnestoreEnvDataListResponse)
-def get_onestore_env_list(db: Session = Depends(get_db)):
+def get_onestore_env_list(db: Session = Depends(get_read_db)):
     """
     원스토어 환경 데이터 목록 조회
     """
@@ -68,7 +46,7 @@ def get_onestore_env_list(db: Session = Depends(get_db)):
 @router.get("/onestore/env/{client_id}", response_model=schemas.OnestoreEnvDataResponse)
 def get_onestore_env(
     client_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     특정 client_id의 원스토어 환경 데이터 조회
@@ -88,36 +66,13 @@ def get_onestore_env(
 
 
 @router.put("/onestore/env/{client_id}", response_model=schemas.OnestoreEnvDataResponse)
-def update_onestore_env(
-    client_id: str,
-    env_data_update: schemas.OnestoreEnvDataUpdate,
-    db: Session = Depends(get_db)
-):
+def update_onestore_env(client_id: str, env_data_update: schemas.OnestoreEnvDataUpdate):
     """
     원스토어 환경 데이터 수정
     
     - 제공된 필드만 업데이트
     """
-    env_data = get_onestore_env_data(db, client_id)
-    
-    if not env_data:
-        raise HTTPException(
-            status_code=404,
-            detail=f"해당 client_id를 찾을 수 없습니다: {client_id}"
-        )
-    
-    # 제공된 필드만 업데이트
-    update_data = env_data_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        if field == "client_id": # skip client_id
-            continue
-        setattr(env_data, field, value)
-    
-    db.commit()
-    db.refresh(env_data)
-    
-    logger.info(f"원스토어 환경 데이터 수정: client_id={client_id}")
-    
+    env_data = write_ops.update_onestore_env(client_id, env_data_update.model_dump(exclude_unset=True))
     return schemas.OnestoreEnvDataResponse(
         result=schemas.ResponseResult(code="0000", message="수정 성공"),
         envData=env_data
@@ -125,31 +80,40 @@ def update_onestore_env(
 
 
 @router.delete("/onestore/env/{client_id}", response_model=schemas.ResposeBase)
-def delete_onestore_env(
-    client_id: str,
-    db: Session = Depends(get_db)
-):
+def delete_onestore_env(client_id: str):
     """
     원스토어 환경 데이터 삭제
     """
-    env_data = get_onestore_env_data(db, client_id)
-    
-    if not env_data:
-        raise HTTPException(
-            status_code=404,
-            detail=f"해당 client_id를 찾을 수 없습니다: {client_id}"
-        )
-    
-    db.delete(env_data)
-    db.commit()
-    
-    logger.info(f"원스토어 환경 데이터 삭제: client_id={client_id}")
-    
+    write_ops.delete_onestore_env(client_id)
     return schemas.ResposeBase(
         result=schemas.ResponseResult(code="0000", message="삭제 성공")
     )
 
 
+@router.get("/onestore/cache/stats", response_model=schemas.OnestoreCacheStatsResponse)
+def get_onestore_cache_stats():
+    """
+    원스토어 관련 캐시 통계 (공개키 캐시, 환경 데이터 스냅샷, 서버 목록 응답 캐시)
+    """
+    return schemas.OnestoreCacheStatsResponse(
+        result=schemas.ResponseResult(code="0000", message="조회 성공"),
+        publicKeyCache=schemas.CacheStats(**public_key_cache.stats()),
+        envCache=schemas.EnvCacheStats(**onestore_env_cache.stats()),
+        serverListCache=schemas.CacheStats(**server_list_cache.stats()),
+    )
+
+
+@router.get("/onestore/resilience", response_model=schemas.OnestoreResilienceResponse)
+def get_onestore_resilience():
+    """
+    원스토어 도메인별 서킷 브레이커, 적응형 타임아웃, 재시도 예산 상태 (이 워커 기준)
+    """
+    return schemas.OnestoreResilienceResponse(
+        result=schemas.ResponseResult(code="0000", message="조회 성공"),
+        domains=onestore_resilience.state(),
+    )
+
+
 def get_onestore_env_data(db: Session, client_id: str) -> Optional[models.OnestoreEnvData]:
     env_data = db.query(models.OnestoreEnvData).filter(
         models.OnestoreEnvData.client_id == client_id
@@ -0,0 +1,71 @@
+import base64
+import json
+import logging
+from typing import Callable, Iterator, Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.sql import Select
+from database import read_engine
+
+logger = logging.getLogger(__name__)
+
+# 목록 API 페이지 크기 상한
+MAX_PAGE_LIMIT = 5000
+# NDJSON 스트리밍 시 DB에서 한 번에 가져올 행 수
+STREAM_FETCH_SIZE = 1000
+
+
+def encode_cursor(last_id: int) -> str:
+    """마지막 행 id를 불투명 커서 문자열로 변환"""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, value = base64.urlsafe_b64decode(padded.encode("ascii")).decode("ascii").split(":", 1)
+        if prefix != "id":
+            raise ValueError(prefix)
+        return int(value)
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_page(stmt: Select, id_column, limit: int, cursor: Optional[str], db) -> tuple[list, Optional[str]]:
+    """
+    id 기준 keyset 페이지 조회
+
+    stmt의 첫 번째 컬럼은 id_column이어야 한다.
+    반환: (행 목록, 다음 페이지 커서 - 마지막 페이지면 None)
+    """
+    last_id = decode_cursor(cursor)
+    if last_id is not None:
+        stmt = stmt.where(id_column > last_id)
+    rows = db.execute(stmt.order_by(id_column).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0])
+    return rows, next_cursor
+
+
+def ndjson_response(stmt: Select, id_column, cursor: Optional[str], row_to_dict: Callable) -> StreamingResponse:
+    """
+    조회 결과를 NDJSON(한 줄에 JSON 객체 하나)으로 스트리밍
+
+    ORM 객체를 만들지 않고 컬럼 값만 순회하며, 요청 세션과 별개의 읽기 연결을 스트림이 끝날 때까지 사용한다.
+    """
+    last_id = decode_cursor(cursor)
+    if last_id is not None:
+        stmt = stmt.where(id_column > last_id)
+    stmt = stmt.order_by(id_column)
+
+    def _iter() -> Iterator[bytes]:
+        with read_engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=STREAM_FETCH_SIZE).execute(stmt)
+            for row in result:
+                yield (json.dumps(row_to_dict(row), ensure_ascii=False) + "\n").encode("utf-8")
+
+    return StreamingResponse(_iter(), media_type="application/x-ndjson")
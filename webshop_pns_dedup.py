@@ -0,0 +1,43 @@
+import os
+import threading
+from collections import OrderedDict
+
+# 최근 처리한 purchaseId를 기억할 개수 (원스토어 재전송은 DB까지 가지 않고 응답)
+PNS_DEDUP_CACHE_SIZE = int(os.getenv("PNS_DEDUP_CACHE_SIZE", "10000"))
+
+
+class RecentPurchaseIds:
+    """
+    최근 저장된 purchaseId LRU (프로세스 단위)
+
+    여기에 없다고 처음 받은 알림은 아니다 - 최종 중복 판정은 DB의 ON CONFLICT로 한다.
+    """
+
+    def __init__(self, maxsize: int = PNS_DEDUP_CACHE_SIZE):
+        self._maxsize = max(0, maxsize)
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def seen(self, purchase_id: str) -> bool:
+        with self._lock:
+            if purchase_id in self._ids:
+                self._ids.move_to_end(purchase_id)
+                self.hits += 1
+                return True
+            return False
+
+    def add(self, purchase_id: str) -> None:
+        if self._maxsize == 0:
+            return
+        with self._lock:
+            self._ids[purchase_id] = None
+            self._ids.move_to_end(purchase_id)
+            while len(self._ids) > self._maxsize:
+                self._ids.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+recent_purchase_ids = RecentPurchaseIds()
@@ -0,0 +1,170 @@
+import os
+import time
+import asyncio
+import logging
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from database import SessionLocal
+from webshop_metrics import Histogram, time_stage
+
+logger = logging.getLogger(__name__)
+
+# PNS 저장 그룹 커밋 (여러 요청의 INSERT를 한 트랜잭션으로 모아 commit - fsync 횟수 감소)
+PNS_GROUP_COMMIT_ENABLED = os.getenv("PNS_GROUP_COMMIT_ENABLED", "0") == "1"
+# 한 번에 commit 할 최대 건수
+PNS_GROUP_COMMIT_MAX_BATCH = int(os.getenv("PNS_GROUP_COMMIT_MAX_BATCH", "64"))
+# 첫 요청 도착 후 다른 요청을 기다리는 최대 시간(ms)
+PNS_GROUP_COMMIT_WINDOW_MS = float(os.getenv("PNS_GROUP_COMMIT_WINDOW_MS", "5"))
+
+group_commit_batch_size = Histogram(
+    "pns_group_commit_batch_size", "그룹 커밋 한 번에 저장한 PNS 수", (),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+
+class _PendingInsert:
+    __slots__ = ("stmt", "follow_up", "future")
+
+    def __init__(self, stmt, follow_up, future: asyncio.Future):
+        self.stmt = stmt
+        self.follow_up = follow_up
+        self.future = future
+
+
+class PNSGroupCommitWriter:
+    """
+    PNS INSERT 전용 writer 태스크
+
+    - 요청은 INSERT ... RETURNING 문을 큐에 넣고 자기 배치의 commit이 끝날 때까지 기다린다
+      (응답 시점에 이미 commit 되어 있으므로 요청별 commit과 내구성은 같다)
+    - 배치는 PNS_GROUP_COMMIT_MAX_BATCH건이 모이거나 PNS_GROUP_COMMIT_WINDOW_MS가 지나면 commit
+    - 배치 commit이 실패하면 건별 트랜잭션으로 다시 처리해 오류 건만 실패시킨다
+    - 저장은 동기 쓰기 세션(단일 쓰기 연결)으로 스레드 풀에서 실행
+    """
+
+    def __init__(
+        self,
+        enabled: bool = PNS_GROUP_COMMIT_ENABLED,
+        max_batch: int = PNS_GROUP_COMMIT_MAX_BATCH,
+        window: float = PNS_GROUP_COMMIT_WINDOW_MS / 1000,
+    ):
+        self.enabled = enabled
+        self._max_batch = max(1, max_batch)
+        self._window = max(0.0, window)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """이벤트 루프 안(lifespan)에서 호출"""
+        if not self.enabled or self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="pns-group-commit")
+        logger.info(
+            f"PNS 그룹 커밋 writer 시작: max_batch={self._max_batch}, window={self._window * 1000:.1f}ms"
+        )
+
+    async def stop(self) -> None:
+        """큐에 남은 요청을 모두 저장한 뒤 종료"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, stmt, follow_up=None) -> bool:
+        """
+        stmt: INSERT ... ON CONFLICT DO NOTHING RETURNING 문
+        follow_up: 새로 저장된 경우에만 같은 트랜잭션에서 실행할 문 (예: consume 작업 등록)
+        반환: 새로 저장했으면 True
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_PendingInsert(stmt, follow_up, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch: List[_PendingInsert] = [item]
+            deadline = loop.time() + self._window
+            while len(batch) < self._max_batch:
+                # 이미 도착한 요청은 기다리지 않고 바로 모은다
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[_PendingInsert]) -> None:
+        started = time.perf_counter()
+        try:
+            results = await run_in_threadpool(self._write, batch)
+        except SQLAlchemyError as e:
+            logger.warning(f"PNS 그룹 커밋 실패, 건별 처리로 재시도: size={len(batch)}, error={e}")
+            for item in batch:
+                try:
+                    self._resolve(item, (await run_in_threadpool(self._write, [item]))[0])
+                except Exception as item_error:
+                    self._reject(item, item_error)
+            return
+        except Exception as e:
+            for item in batch:
+                self._reject(item, e)
+            return
+        for item, inserted in zip(batch, results):
+            self._resolve(item, inserted)
+        group_commit_batch_size.observe(len(batch))
+        logger.debug(f"PNS 그룹 커밋: size={len(batch)}, {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    @staticmethod
+    def _write(batch: List[_PendingInsert]) -> List[bool]:
+        db = SessionLocal()
+        try:
+            results = []
+            for item in batch:
+                inserted = db.execute(item.stmt).first() is not None
+                if inserted and item.follow_up is not None:
+                    db.execute(item.follow_up)
+                results.append(inserted)
+            with time_stage("db_commit"):
+                db.commit()
+            return results
+        except BaseException:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _resolve(item: _PendingInsert, inserted: bool) -> None:
+        # 요청이 이미 취소된 경우(클라이언트 연결 종료) 결과를 버린다
+        if not item.future.done():
+            item.future.set_result(inserted)
+
+    @staticmethod
+    def _reject(item: _PendingInsert, error: BaseException) -> None:
+        if not item.future.done():
+            item.future.set_exception(error)
+
+
+pns_writer = PNSGroupCommitWriter()
+
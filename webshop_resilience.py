@@ -0,0 +1,346 @@
+import os
+import time
+import random
+import threading
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+import requests
+from webshop_http_client import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+from webshop_metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# 서킷 브레이커 - 최근 ONESTORE_CB_WINDOW초 동안 호출이 ONESTORE_CB_MIN_CALLS회 이상이고
+# 실패 비율이 ONESTORE_CB_FAILURE_RATE 이상이면 열림(즉시 실패), ONESTORE_CB_OPEN_SECONDS 후 시험 호출 허용
+CB_WINDOW = float(os.getenv("ONESTORE_CB_WINDOW", "30"))
+CB_MIN_CALLS = int(os.getenv("ONESTORE_CB_MIN_CALLS", "20"))
+CB_FAILURE_RATE = float(os.getenv("ONESTORE_CB_FAILURE_RATE", "0.5"))
+CB_OPEN_SECONDS = float(os.getenv("ONESTORE_CB_OPEN_SECONDS", "15"))
+# 반열림(half-open) 상태에서 동시에 허용할 시험 호출 수
+CB_HALF_OPEN_CALLS = int(os.getenv("ONESTORE_CB_HALF_OPEN_CALLS", "1"))
+
+# 적응형 타임아웃 - 최근 성공 응답 지연 시간의 백분위 x 배수 (최소/최대 사이로 제한)
+# 최대값은 ONESTORE_HTTP_READ_TIMEOUT, 표본이 모이기 전에도 최대값 사용
+TIMEOUT_PERCENTILE = float(os.getenv("ONESTORE_TIMEOUT_PERCENTILE", "99"))
+TIMEOUT_MULTIPLIER = float(os.getenv("ONESTORE_TIMEOUT_MULTIPLIER", "3"))
+TIMEOUT_MIN = float(os.getenv("ONESTORE_TIMEOUT_MIN", "1"))
+TIMEOUT_MIN_SAMPLES = int(os.getenv("ONESTORE_TIMEOUT_MIN_SAMPLES", "20"))
+TIMEOUT_SAMPLE_SIZE = int(os.getenv("ONESTORE_TIMEOUT_SAMPLE_SIZE", "200"))
+
+# 재시도 - 호출 하나당 최대 시도 횟수, full jitter 지수 백오프
+RETRY_MAX_ATTEMPTS = int(os.getenv("ONESTORE_RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BACKOFF_BASE = float(os.getenv("ONESTORE_RETRY_BACKOFF_BASE", "0.1"))
+RETRY_BACKOFF_MAX = float(os.getenv("ONESTORE_RETRY_BACKOFF_MAX", "2"))
+# 재시도 예산 - 최근 ONESTORE_RETRY_BUDGET_WINDOW초 동안의 재시도 수를 요청 수의 비율로 제한
+# (장애 시 재시도가 부하를 키우지 않도록, 트래픽이 적을 때도 최소 ONESTORE_RETRY_BUDGET_MIN회는 허용)
+RETRY_BUDGET_RATIO = float(os.getenv("ONESTORE_RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN = int(os.getenv("ONESTORE_RETRY_BUDGET_MIN", "10"))
+RETRY_BUDGET_WINDOW = float(os.getenv("ONESTORE_RETRY_BUDGET_WINDOW", "10"))
+
+# 재시도해도 되는 응답 (요청이 처리되지 않았거나 일시적인 오류)
+RETRYABLE_STATUSES = (429, 502, 503, 504)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+outbound_calls_total = Counter(
+    "onestore_outbound_calls_total", "원스토어 외부 호출 시도 수", ("operation", "outcome")
+)
+outbound_retries_total = Counter("onestore_outbound_retries_total", "원스토어 외부 호출 재시도 수", ("operation",))
+circuit_rejections_total = Counter(
+    "onestore_circuit_rejections_total", "서킷 브레이커가 열려 즉시 실패한 호출 수", ("operation",)
+)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """서킷 브레이커가 열려 호출하지 않음 (retry_after초 후 시험 호출 가능)"""
+
+    def __init__(self, domain: str, retry_after: float):
+        super().__init__(f"원스토어 서킷 브레이커 열림: domain={domain}, retry_after={retry_after:.1f}s")
+        self.domain = domain
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """시간 창 기반 실패율 서킷 브레이커"""
+
+    def __init__(self):
+        self.state = STATE_CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.opened_count = 0
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - CB_WINDOW:
+            _, ok = self._outcomes.popleft()
+            if not ok:
+                self._failures -= 1
+
+    def acquire(self, now: float) -> Optional[float]:
+        """호출 허용 시 None, 거부 시 시험 호출까지 남은 시간(초)"""
+        if self.state == STATE_OPEN:
+            remaining = self._opened_at + CB_OPEN_SECONDS - now
+            if remaining > 0:
+                return remaining
+            self.state = STATE_HALF_OPEN
+            self._probes = 0
+        if self.state == STATE_HALF_OPEN:
+            if self._probes >= CB_HALF_OPEN_CALLS:
+                return 1.0
+            self._probes += 1
+        return None
+
+    def record(self, now: float, ok: bool) -> Optional[str]:
+        """결과 기록, 상태가 바뀌면 새 상태 반환"""
+        if self.state == STATE_HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+            if ok:
+                self.state = STATE_CLOSED
+                self._outcomes.clear()
+                self._failures = 0
+                return STATE_CLOSED
+            self._open(now)
+            return STATE_OPEN
+        if self.state == STATE_OPEN:
+            return None
+
+        self._outcomes.append((now, ok))
+        if not ok:
+            self._failures += 1
+        self._trim(now)
+        calls = len(self._outcomes)
+        if calls >= CB_MIN_CALLS and self._failures / calls >= CB_FAILURE_RATE:
+            self._open(now)
+            return STATE_OPEN
+        return None
+
+    def release(self) -> None:
+        """결과를 기록하지 않고 끝난 시험 호출 반환 (예상하지 못한 예외)"""
+        if self.state == STATE_HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    def _open(self, now: float) -> None:
+        self.state = STATE_OPEN
+        self._opened_at = now
+        self.opened_count += 1
+        self._outcomes.clear()
+        self._failures = 0
+
+    def stats(self, now: float) -> dict:
+        self._trim(now)
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "windowCalls": calls,
+            "windowFailureRate": round(self._failures / calls, 4) if calls else 0.0,
+            "openedCount": self.opened_count,
+            "retryAfter": round(max(0.0, self._opened_at + CB_OPEN_SECONDS - now), 3)
+            if self.state == STATE_OPEN else None,
+        }
+
+
+class AdaptiveTimeout:
+    """최근 성공 응답 지연 시간으로 읽기 타임아웃 계산"""
+
+    def __init__(self):
+        self._samples: Deque[float] = deque(maxlen=TIMEOUT_SAMPLE_SIZE)
+        self._current = HTTP_READ_TIMEOUT
+        self._pending = 0
+
+    def observe(self, latency: float) -> None:
+        self._samples.append(latency)
+        self._pending += 1
+        # 매 호출마다 정렬하지 않고 일정 개수마다 다시 계산
+        if self._pending >= 10 or len(self._samples) == TIMEOUT_MIN_SAMPLES:
+            self._pending = 0
+            self._recompute()
+
+    def _recompute(self) -> None:
+        if len(self._samples) < TIMEOUT_MIN_SAMPLES:
+            self._current = HTTP_READ_TIMEOUT
+            return
+        values = sorted(self._samples)
+        index = min(len(values) - 1, int(len(values) * TIMEOUT_PERCENTILE / 100))
+        self._current = min(HTTP_READ_TIMEOUT, max(TIMEOUT_MIN, values[index] * TIMEOUT_MULTIPLIER))
+
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read)"""
+        return (HTTP_CONNECT_TIMEOUT, self._current)
+
+    def stats(self) -> dict:
+        return {"readTimeout": round(self._current, 3), "samples": len(self._samples)}
+
+
+class RetryBudget:
+    """시간 창 안에서 재시도 수를 요청 수 비율로 제한"""
+
+    def __init__(self):
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted = 0
+
+    def _trim(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and events[0] < now - RETRY_BUDGET_WINDOW:
+                events.popleft()
+
+    def record_request(self, now: float) -> None:
+        self._trim(now)
+        self._requests.append(now)
+
+    def try_retry(self, now: float) -> bool:
+        self._trim(now)
+        if len(self._retries) >= max(RETRY_BUDGET_MIN, RETRY_BUDGET_RATIO * len(self._requests)):
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def stats(self, now: float) -> dict:
+        self._trim(now)
+        return {
+            "windowRequests": len(self._requests),
+            "windowRetries": len(self._retries),
+            "exhausted": self.exhausted,
+        }
+
+
+class _DomainState:
+    __slots__ = ("breaker", "timeout", "budget", "lock")
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.timeout = AdaptiveTimeout()
+        self.budget = RetryBudget()
+        self.lock = threading.Lock()
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class OnestoreResilience:
+    """
+    원스토어 도메인별 외부 호출 보호 (서킷 브레이커, 적응형 타임아웃, 재시도, 재시도 예산)
+
+    - 연결 실패, 타임아웃, 429/502/503/504 응답을 실패로 보고 재시도 (Retry-After 존중, 최대 RETRY_BACKOFF_MAX초)
+    - 토큰 발급(client_credentials)은 여러 번 호출해도 결과가 같으므로 모든 실패를 재시도
+    - consume은 읽기 타임아웃(요청 전송 후 응답 대기 중 초과)이면 원스토어가 이미 처리했을 수 있으므로
+      retry_read_timeout=False로 호출해 바로 재시도하지 않는다 (두 번째 호출은 "이미 consume됨" 응답을 받음)
+    - 서킷이 열린 동안은 호출하지 않고 CircuitOpenError 발생
+    """
+
+    def __init__(self):
+        self._domains: Dict[str, _DomainState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, domain: str) -> _DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            with self._lock:
+                state = self._domains.setdefault(domain, _DomainState())
+        return state
+
+    def call(
+        self,
+        domain: str,
+        operation: str,
+        send: Callable[[Tuple[float, float]], requests.Response],
+        retry_read_timeout: bool = True,
+    ) -> requests.Response:
+        """
+        send(timeout) 실행 - timeout은 (connect, read) 튜플
+        재시도 후에도 실패하면 마지막 응답을 반환하거나 마지막 예외를 다시 발생시킨다.
+        retry_read_timeout=False: 요청이 전달된 뒤의 읽기 타임아웃은 재시도하지 않음 (멱등이 아닌 호출)
+        """
+        state = self._state(domain)
+        with state.lock:
+            state.budget.record_request(time.monotonic())
+
+        attempt = 0
+        while True:
+            attempt += 1
+            now = time.monotonic()
+            with state.lock:
+                retry_after = state.breaker.acquire(now)
+                timeout = state.timeout.timeout()
+            if retry_after is not None:
+                circuit_rejections_total.inc(operation)
+                raise CircuitOpenError(domain, retry_after)
+
+            started = time.monotonic()
+            response: Optional[requests.Response] = None
+            error: Optional[Exception] = None
+            try:
+                response = send(timeout)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                error = e
+            except Exception:
+                with state.lock:
+                    state.breaker.release()
+                raise
+            ended = time.monotonic()
+
+            failed = error is not None or response.status_code in RETRYABLE_STATUSES or response.status_code >= 500
+            with state.lock:
+                transition = state.breaker.record(ended, not failed)
+                if not failed:
+                    state.timeout.observe(ended - started)
+            if transition is not None:
+                log = logger.warning if transition == STATE_OPEN else logger.info
+                log(f"원스토어 서킷 브레이커 상태 변경: domain={domain}, state={transition}")
+
+            if error is not None:
+                outcome = "timeout" if isinstance(error, requests.exceptions.Timeout) else "connection_error"
+            else:
+                outcome = str(response.status_code)
+            outbound_calls_total.inc(operation, outcome)
+
+            retryable = error is not None or response.status_code in RETRYABLE_STATUSES
+            if isinstance(error, requests.exceptions.ReadTimeout) and not retry_read_timeout:
+                retryable = False
+            if not retryable or attempt >= RETRY_MAX_ATTEMPTS:
+                break
+            with state.lock:
+                allowed = state.budget.try_retry(time.monotonic())
+            if not allowed:
+                logger.warning(f"원스토어 재시도 예산 소진: domain={domain}, operation={operation}")
+                break
+
+            delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * (2 ** (attempt - 1))))
+            if response is not None:
+                delay = max(delay, min(RETRY_BACKOFF_MAX, _retry_after_seconds(response) or 0.0))
+            outbound_retries_total.inc(operation)
+            logger.info(f"원스토어 {operation} 재시도: domain={domain}, attempt={attempt}, outcome={outcome}, delay={delay:.2f}s")
+            time.sleep(delay)
+
+        if error is not None:
+            raise error
+        return response
+
+    def state(self) -> Dict[str, dict]:
+        now = time.monotonic()
+        result = {}
+        with self._lock:
+            domains = dict(self._domains)
+        for domain, state in domains.items():
+            with state.lock:
+                result[domain] = {
+                    "circuit": state.breaker.stats(now),
+                    "timeout": state.timeout.stats(),
+                    "retryBudget": state.budget.stats(now),
+                }
+        return result
+
+
+onestore_resilience = OnestoreResilience()
@@ -0,0 +1,104 @@
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+from sqlalchemy.orm import Session
+from cache_version import bump_version, version_tracker
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(game_id: str) -> str:
+    return f"game_servers:{game_id}"
+
+
+@dataclass
+class CachedServerList:
+    """게임별 서버 목록 직렬화 결과 (serverList JSON 배열 + ETag)"""
+    version: int
+    server_list_json: bytes
+    etag: str
+    # 응답 메시지별 전체 본문 (엔드포인트마다 result.message가 다름)
+    bodies: Dict[str, bytes] = field(default_factory=dict)
+
+    def body(self, render: Callable[[bytes], bytes], message: str) -> bytes:
+        body = self.bodies.get(message)
+        if body is None:
+            body = render(self.server_list_json)
+            self.bodies[message] = body
+        return body
+
+
+class ServerListCache:
+    """
+    /gameserver/{game_id}/list, /onestore_webshop/serverlist 전체 목록 응답 캐시
+
+    - 서버 목록은 거의 바뀌지 않으므로 직렬화된 JSON 바이트를 그대로 보관
+    - 이 프로세스의 변경은 commit 직후 invalidate, 다른 워커의 변경은 cache_versions 버전으로 감지
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CachedServerList] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, db: Session, game_id: str, load: Callable[[], bytes]) -> CachedServerList:
+        """
+        캐시된 목록 반환, 없거나 버전이 바뀌었으면 load()로 serverList JSON을 다시 만든다.
+        """
+        version = version_tracker.current(db, _version_key(game_id))
+        entry = self._entries.get(game_id)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        server_list_json = load()
+        entry = CachedServerList(
+            version=version,
+            server_list_json=server_list_json,
+            etag=f'"{hashlib.sha256(server_list_json).hexdigest()[:32]}"',
+        )
+        with self._lock:
+            self._entries[game_id] = entry
+        return entry
+
+    def mark_changed(self, db: Session, game_id: str) -> None:
+        """서버 생성/삭제 시 호출 (commit 전, 같은 트랜잭션) - 다른 워커에 변경을 알림"""
+        bump_version(db, _version_key(game_id))
+
+    def invalidate(self, game_id: str) -> None:
+        """commit 후 호출 - 이 프로세스의 캐시를 바로 버림"""
+        with self._lock:
+            if self._entries.pop(game_id, None) is not None:
+                self.invalidations += 1
+        version_tracker.expire()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 ETag와 일치하는지 (목록, 약한 비교 W/ 허용)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+server_list_cache = ServerListCache()
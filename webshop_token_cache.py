@@ -0,0 +1,211 @@
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy.exc import SQLAlchemyError
+import models
+from sqlalchemy.orm import Session
+from database import ReadSessionLocal
+from webshop_writer import DBWriterError, write_operation
+
+logger = logging.getLogger(__name__)
+
+# 만료 몇 초 전부터 백그라운드 갱신을 시작할지 (토큰 유효 기간의 절반을 넘지 않음)
+TOKEN_REFRESH_MARGIN = float(os.getenv("ONESTORE_TOKEN_REFRESH_MARGIN", "300"))
+# 만료 직전 토큰은 사용하지 않고 동기 갱신 (요청 도중 만료 방지)
+TOKEN_MIN_TTL = float(os.getenv("ONESTORE_TOKEN_MIN_TTL", "10"))
+# 응답에 expires_in이 없을 때 사용할 기본값
+TOKEN_DEFAULT_EXPIRES_IN = int(os.getenv("ONESTORE_TOKEN_DEFAULT_EXPIRES_IN", "600"))
+# SQLite 테이블을 통한 워커 간 토큰 공유 여부
+TOKEN_SHARED = os.getenv("ONESTORE_TOKEN_SHARED", "1") == "1"
+
+TokenKey = Tuple[str, str]  # (client_id, domain)
+# (client_id, domain, client_secret) -> (access_token, expires_in)
+TokenFetcher = Callable[[str, str, str], Tuple[str, int]]
+
+
+class _CachedToken:
+    __slots__ = ("access_token", "expires_at", "lifetime")
+
+    def __init__(self, access_token: str, expires_at: float, lifetime: float):
+        self.access_token = access_token
+        self.expires_at = expires_at
+        self.lifetime = lifetime
+
+    @property
+    def refresh_margin(self) -> float:
+        # 유효 기간이 마진보다 짧은 토큰은 발급 직후부터 매번 갱신하게 되므로 절반으로 제한
+        return min(TOKEN_REFRESH_MARGIN, self.lifetime / 2)
+
+
+class OnestoreTokenCache:
+    """
+    (client_id, pns 도메인) 단위 원스토어 액세스 토큰 캐시
+
+    - expires_in 기준으로 만료 처리, 만료 TOKEN_REFRESH_MARGIN초(최대 유효 기간의 절반) 전부터 백그라운드 갱신
+    - 키별 single-flight: 동시에 여러 요청이 와도 토큰 발급은 한 번만 수행
+    - TOKEN_SHARED 사용 시 onestore_access_tokens 테이블로 워커 간 공유
+    """
+
+    def __init__(self, fetcher: TokenFetcher, shared: bool = TOKEN_SHARED):
+        self._fetcher = fetcher
+        self._shared = shared
+        self._entries: Dict[TokenKey, _CachedToken] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[TokenKey, threading.Lock] = {}
+        self._refreshing: set = set()
+
+    def get(self, client_id: str, domain: str, client_secret: str) -> str:
+        key = (client_id, domain)
+        entry = self._entries.get(key)
+        if entry is None or time.time() >= entry.expires_at - TOKEN_MIN_TTL:
+            entry = self._refresh(key, client_secret, force=False)
+        if time.time() >= entry.expires_at - entry.refresh_margin:
+            # 아직 유효: 현재 토큰을 돌려주고 갱신은 백그라운드에서 (공유 캐시에서 가져온 토큰 포함)
+            self._schedule_refresh(key, client_secret)
+        return entry.access_token
+
+    def invalidate(self, client_id: str, domain: str) -> None:
+        """토큰이 거부(401)된 경우 등 캐시 무효화"""
+        key = (client_id, domain)
+        with self._lock:
+            self._entries.pop(key, None)
+        if self._shared:
+            self._delete_shared(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _key_lock(self, key: TokenKey) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _schedule_refresh(self, key: TokenKey, client_secret: str) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _run():
+            try:
+                self._refresh(key, client_secret, force=True)
+            except Exception as e:
+                logger.error(f"원스토어 액세스 토큰 백그라운드 갱신 실패: client_id={key[0]}, error={e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_run, name="onestore-token-refresh", daemon=True).start()
+
+    def _refresh(self, key: TokenKey, client_secret: str, force: bool) -> _CachedToken:
+        """
+        키별 락 안에서 토큰 갱신 (single-flight)
+
+        force=False: 락을 기다리는 동안 다른 스레드가 갱신했으면 그 토큰을 사용
+        force=True: 갱신 마진 안에 들어온 토큰을 새 토큰으로 교체 (백그라운드 갱신)
+        """
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry and time.time() < entry.expires_at - self._min_remaining(entry, force):
+                return entry
+
+            # 다른 워커가 이미 발급한 토큰이 있으면 재사용
+            if self._shared:
+                shared_entry = self._load_shared(key)
+                # 백그라운드 갱신은 지금 토큰보다 늦게 만료되는(다른 워커가 새로 발급한) 토큰만 사용
+                if shared_entry and force and entry and shared_entry.expires_at <= entry.expires_at:
+                    shared_entry = None
+                if shared_entry and time.time() < shared_entry.expires_at - self._min_remaining(shared_entry, force):
+                    with self._lock:
+                        self._entries[key] = shared_entry
+                    return shared_entry
+
+            access_token, expires_in = self._fetcher(key[0], key[1], client_secret)
+            if not access_token:
+                raise Exception("원스토어 액세스 토큰 발급 실패")
+            lifetime = expires_in or TOKEN_DEFAULT_EXPIRES_IN
+            entry = _CachedToken(access_token, time.time() + lifetime, lifetime)
+            with self._lock:
+                self._entries[key] = entry
+            if self._shared:
+                self._store_shared(key, entry)
+            return entry
+
+    @staticmethod
+    def _min_remaining(entry: _CachedToken, force: bool) -> float:
+        return entry.refresh_margin if force else TOKEN_MIN_TTL
+
+    def _load_shared(self, key: TokenKey) -> Optional[_CachedToken]:
+        db = ReadSessionLocal()
+        try:
+            row = db.query(models.OnestoreAccessToken).filter(
+                models.OnestoreAccessToken.client_id == key[0],
+                models.OnestoreAccessToken.domain == key[1],
+            ).first()
+            if row:
+                # lifetime이 없는 행(컬럼 추가 전 저장)은 기본 유효 기간으로 계산
+                return _CachedToken(row.access_token, row.expires_at, row.lifetime or TOKEN_DEFAULT_EXPIRES_IN)
+            return None
+        except SQLAlchemyError as e:
+            logger.warning(f"공유 토큰 캐시 조회 실패: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _store_shared(self, key: TokenKey, entry: _CachedToken) -> None:
+        try:
+            store_shared_token(key[0], key[1], entry.access_token, entry.expires_at, entry.lifetime)
+        except (SQLAlchemyError, DBWriterError) as e:
+            logger.warning(f"공유 토큰 캐시 저장 실패: {e}")
+
+    def _delete_shared(self, key: TokenKey) -> None:
+        try:
+            delete_shared_token(key[0], key[1])
+        except (SQLAlchemyError, DBWriterError) as e:
+            logger.warning(f"공유 토큰 캐시 삭제 실패: {e}")
+
+
+# 토큰 행 쓰기만 쓰기 작업으로 처리 (토큰 발급/consume 호출은 요청 워커에서 수행)
+@write_operation
+def store_shared_token(
+    db: Session, client_id: str, domain: str, access_token: str, expires_at: float, lifetime: float
+) -> None:
+    try:
+        row = db.query(models.OnestoreAccessToken).filter(
+            models.OnestoreAccessToken.client_id == client_id,
+            models.OnestoreAccessToken.domain == domain,
+        ).first()
+        if row:
+            row.access_token = access_token
+            row.expires_at = expires_at
+            row.lifetime = lifetime
+        else:
+            db.add(models.OnestoreAccessToken(
+                client_id=client_id,
+                domain=domain,
+                access_token=access_token,
+                expires_at=expires_at,
+                lifetime=lifetime,
+            ))
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
+
+
+@write_operation
+def delete_shared_token(db: Session, client_id: str, domain: str) -> None:
+    try:
+        db.query(models.OnestoreAccessToken).filter(
+            models.OnestoreAccessToken.client_id == client_id,
+            models.OnestoreAccessToken.domain == domain,
+        ).delete(synchronize_session=False)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        raise
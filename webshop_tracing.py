@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import queue
+import secrets
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "1") == "1"
+# 최근 완료된 trace를 보관할 개수
+TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "1000"))
+# trace 하나에 기록할 최대 span 수 (대량 처리 요청의 메모리 사용 제한)
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "200"))
+# 설정 시 완료된 trace를 JSON Lines로 파일에 기록
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "")
+# SQL 문장은 앞부분만 기록
+TRACE_STATEMENT_MAX_LENGTH = 200
+
+
+class Span:
+    __slots__ = ("name", "trace", "span_id", "parent_id", "start", "end", "attrs")
+
+    def __init__(self, name: str, trace: "Trace", parent_id: Optional[str], attrs: Dict):
+        self.name = name
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.end = time.perf_counter()
+        if error is not None:
+            self.attrs["error"] = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "spanId": self.span_id,
+            "parentId": self.parent_id,
+            "offsetMs": round((self.start - self.trace.root.start) * 1000, 3),
+            "durationMs": round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+        }
+
+
+class Trace:
+    __slots__ = ("trace_id", "root", "spans", "started_at", "dropped")
+
+    def __init__(self, name: str, attrs: Dict):
+        self.trace_id = secrets.token_hex(16)
+        self.started_at = time.time()
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.root = Span(name, self, None, attrs)
+
+    def add(self, span: Span) -> bool:
+        if len(self.spans) >= TRACE_MAX_SPANS:
+            self.dropped += 1
+            return False
+        self.spans.append(span)
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "name": self.root.name,
+            "startedAt": self.started_at,
+            "durationMs": round(self.root.duration * 1000, 3),
+            "attrs": self.root.attrs,
+            "spans": [span.to_dict() for span in list(self.spans)],
+            "droppedSpans": self.dropped,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace.trace_id if span is not None else None
+
+
+class _TraceExporter:
+    """완료된 trace를 백그라운드 스레드에서 파일(JSON Lines)에 기록"""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._queue: queue.Queue = queue.Queue(TRACE_BUFFER_SIZE)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            trace = self._queue.get()
+            try:
+                with open(self._path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(trace.to_dict(), ensure_ascii=False, default=str) + "\n")
+            except OSError as e:
+                logger.warning(f"trace 파일 기록 실패: {e}")
+
+
+class TraceBuffer:
+    """완료된 trace 링 버퍼"""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE, export_file: str = TRACE_EXPORT_FILE):
+        self._traces: Deque[Trace] = deque(maxlen=max(1, size))
+        self._exporter = _TraceExporter(export_file) if export_file else None
+
+    def add(self, trace: Trace) -> None:
+        self._traces.append(trace)
+        if self._exporter is not None:
+            self._exporter.export(trace)
+
+    def slowest(self, limit: int = 10, name: Optional[str] = None) -> List[dict]:
+        traces = [t for t in list(self._traces) if name is None or t.root.name == name]
+        traces.sort(key=lambda t: t.root.duration, reverse=True)
+        return [t.to_dict() for t in traces[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+
+trace_buffer = TraceBuffer()
+
+
+@contextmanager
+def start_trace(name: str, **attrs):
+    """
+    새 trace(루트 span) 시작 - 요청 하나, 백그라운드 작업 하나 단위
+    종료 시 링 버퍼(및 파일)에 저장한다.
+    """
+    if not TRACE_ENABLED:
+        yield None
+        return
+    trace = Trace(name, attrs)
+    token = _current_span.set(trace.root)
+    error = None
+    try:
+        yield trace.root
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        trace.root.finish(error)
+        _current_span.reset(token)
+        trace_buffer.add(trace)
+
+
+@contextmanager
+def start_span(name: str, **attrs):
+    """현재 trace 안에 자식 span 생성 (진행 중인 trace가 없으면 아무것도 하지 않음)"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(name, parent.trace, parent.span_id, attrs)
+    if not parent.trace.add(span):
+        yield None
+        return
+    token = _current_span.set(span)
+    error = None
+    try:
+        yield span
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        span.finish(error)
+        _current_span.reset(token)
+
+
+def instrument_engine(engine, name: str) -> None:
+    """SQLAlchemy 엔진의 문장 실행마다 db.execute span 기록 (async 엔진은 sync_engine 전달)"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is None or context is None:
+            return
+        span = Span("db.execute", parent.trace, parent.span_id, {
+            "engine": name,
+            "statement": statement[:TRACE_STATEMENT_MAX_LENGTH],
+        })
+        if parent.trace.add(span):
+            context._trace_span = span
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.finish()
+            context._trace_span = None
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_trace_span", None) if context is not None else None
+        if span is not None:
+            span.finish(exception_context.original_exception)
+            context._trace_span = None
+
+
+class TraceIdFilter(logging.Filter):
+    """로그 기록에 현재 trace_id 추가"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace_id = current_trace_id()
+        if trace_id is not None:
+            record.trace_id = trace_id
+        return True
+
+
+def _route_name(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or scope.get("path", "")
+
+
+class TracingMiddleware:
+    """요청마다 루트 span 생성, 응답 헤더에 X-Trace-Id 추가"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        with start_trace(f"{scope.get('method', '')} {scope.get('path', '')}") as root:
+
+            async def _send(message):
+                if message["type"] == "http.response.start":
+                    root.set(status=message["status"])
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-trace-id", root.trace.trace_id.encode("ascii")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                # 라우팅 후에 알 수 있는 라우트 템플릿으로 이름 변경 (slowest 조회 시 그룹 기준)
+                root.name = f"{scope.get('method', '')} {_route_name(scope)}"
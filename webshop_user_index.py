@@ -0,0 +1,232 @@
+import os
+import math
+import hashlib
+import threading
+import time
+import logging
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+import models
+from cache_version import bump_version, version_tracker
+from database import ReadSessionLocal
+
+logger = logging.getLogger(__name__)
+
+USER_INDEX_ENABLED = os.getenv("USER_INDEX_ENABLED", "1") == "1"
+# 게임 사용자 수가 이 값을 넘으면 정확한 인덱스 대신 Bloom filter(user_id)만 유지
+USER_INDEX_BLOOM_THRESHOLD = int(os.getenv("USER_INDEX_BLOOM_THRESHOLD", "200000"))
+USER_INDEX_BLOOM_FP_RATE = float(os.getenv("USER_INDEX_BLOOM_FP_RATE", "0.01"))
+# 다른 워커의 변경으로 인덱스가 오래된 경우, 이 시간(초) 안에는 재생성하지 않고 DB 조회로 처리
+USER_INDEX_MIN_REBUILD_INTERVAL = float(os.getenv("USER_INDEX_MIN_REBUILD_INTERVAL", "30"))
+
+# (server_id, user_id2) - user_id2가 없으면 ""
+UserEntry = Tuple[str, str]
+
+
+def _version_key(game_id: str) -> str:
+    return f"game_users:{game_id}"
+
+
+class BloomFilter:
+    """user_id 존재 여부용 Bloom filter (삭제 미지원 - 삭제된 사용자는 DB 조회로 확인)"""
+
+    def __init__(self, capacity: int, fp_rate: float = USER_INDEX_BLOOM_FP_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, value: str) -> None:
+        for pos in self._positions(value):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class _GameIndex:
+    __slots__ = ("version", "built_at", "exact", "bloom")
+
+    def __init__(self, version: int):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.exact: Optional[Dict[str, Set[UserEntry]]] = None
+        self.bloom: Optional[BloomFilter] = None
+
+    def lookup(self, user_id: str, server_id: Optional[str], user_id2: Optional[str]) -> Optional[bool]:
+        """True: 등록됨 / False: 확실히 없음 / None: DB 확인 필요"""
+        if self.exact is None:
+            return None if user_id in self.bloom else False
+        entries = self.exact.get(user_id)
+        if not entries:
+            return False
+        for entry_server_id, entry_user_id2 in entries:
+            if server_id and entry_server_id != server_id:
+                continue
+            if user_id2 and entry_user_id2 != user_id2:
+                continue
+            return True
+        return False
+
+    def add(self, user_id: str, server_id: str, user_id2: str) -> None:
+        if self.exact is None:
+            self.bloom.add(user_id)
+        else:
+            # 조회 중인 스레드가 있을 수 있으므로 기존 set을 수정하지 않고 교체
+            self.exact[user_id] = self.exact.get(user_id, frozenset()) | {(server_id, user_id2)}
+
+    def remove(self, user_id: str) -> None:
+        if self.exact is not None:
+            self.exact.pop(user_id, None)
+
+
+class GameUserIndex:
+    """
+    /gameuser/check 용 게임별 사용자 멤버십 인덱스
+
+    - 첫 조회 시 백그라운드 스레드에서 game_users로 생성 (대형 게임은 Bloom filter),
+      생성이 끝날 때까지는 None을 돌려줘 호출자가 DB로 조회
+    - 이 프로세스의 생성/삭제는 commit 직후 인덱스에 바로 반영
+    - 다른 워커의 변경은 cache_versions의 게임별 버전으로 감지해 재생성
+    """
+
+    def __init__(self, enabled: bool = USER_INDEX_ENABLED):
+        self.enabled = enabled
+        self._games: Dict[str, _GameIndex] = {}
+        self._lock = threading.Lock()
+        self._building: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+
+    def lookup(
+        self, db: Session, game_id: str, user_id: str, server_id: Optional[str], user_id2: Optional[str]
+    ) -> Optional[bool]:
+        if not self.enabled:
+            return None
+        version = version_tracker.current(db, _version_key(game_id))
+        index = self._games.get(game_id)
+        if index is None or index.version != version:
+            # 전체 스캔은 요청 경로(이벤트 루프)에서 하지 않고 백그라운드에서 생성 후 교체
+            if index is None or time.monotonic() - index.built_at >= USER_INDEX_MIN_REBUILD_INTERVAL:
+                self._schedule_build(game_id)
+            index = None
+
+        result = index.lookup(user_id, server_id, user_id2) if index is not None else None
+        if result is True:
+            self.hits += 1
+        elif result is False:
+            self.misses += 1
+        else:
+            self.fallbacks += 1
+        return result
+
+    def _schedule_build(self, game_id: str) -> None:
+        with self._lock:
+            if game_id in self._building:
+                return
+            self._building.add(game_id)
+
+        def _run():
+            try:
+                self._build(game_id)
+            except Exception as e:
+                logger.error(f"게임 사용자 인덱스 생성 실패: game_id={game_id}, error={e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._building.discard(game_id)
+
+        threading.Thread(target=_run, name="game-user-index-build", daemon=True).start()
+
+    def _build(self, game_id: str) -> _GameIndex:
+        db = ReadSessionLocal()
+        try:
+            started = time.monotonic()
+            # 버전을 먼저 같은 읽기 트랜잭션에서 읽는다 - 데이터가 버전보다 오래될 수 없음
+            version = db.query(models.CacheVersion.version).filter(
+                models.CacheVersion.key == _version_key(game_id)
+            ).scalar() or 0
+            index = _GameIndex(version)
+            count = db.query(func.count(models.GameUser.id)).filter(models.GameUser.game_id == game_id).scalar() or 0
+            if count > USER_INDEX_BLOOM_THRESHOLD:
+                index.bloom = BloomFilter(count * 2)
+                rows = db.query(models.GameUser.user_id).filter(models.GameUser.game_id == game_id).yield_per(10000)
+                for (user_id,) in rows:
+                    index.bloom.add(user_id)
+            else:
+                index.exact = {}
+                rows = db.query(
+                    models.GameUser.user_id,
+                    models.GameUser.server_id,
+                    func.coalesce(models.GameUser.user_id2, ""),
+                ).filter(models.GameUser.game_id == game_id).yield_per(10000)
+                for user_id, server_id, user_id2 in rows:
+                    index.exact.setdefault(user_id, set()).add((server_id or "", user_id2))
+            with self._lock:
+                self._games[game_id] = index
+            logger.info(
+                f"게임 사용자 인덱스 생성: game_id={game_id}, count={count}, "
+                f"mode={'bloom' if index.bloom else 'exact'}, elapsed={time.monotonic() - started:.3f}s"
+            )
+            return index
+        finally:
+            db.close()
+
+    def mark_changed(self, db: Session, game_id: str) -> None:
+        """사용자 생성/삭제 시 호출 (commit 전, 같은 트랜잭션) - 다른 워커에 변경을 알림"""
+        bump_version(db, _version_key(game_id))
+
+    def _sync_version(self, db: Session, game_id: str) -> Optional[_GameIndex]:
+        """
+        commit 직후 호출 - 버전이 정확히 1 증가했으면(=이 프로세스의 변경만 있음) 인덱스를 유지하고,
+        아니면 다른 워커의 변경이 섞인 것이므로 인덱스를 버린다.
+        """
+        index = self._games.get(game_id)
+        if index is None:
+            return None
+        version = db.query(models.CacheVersion.version).filter(
+            models.CacheVersion.key == _version_key(game_id)
+        ).scalar() or 0
+        version_tracker.expire()
+        if version != index.version + 1:
+            self.drop(game_id)
+            return None
+        index.version = version
+        return index
+
+    def apply_insert(self, db: Session, game_id: str, users: Iterable[Tuple[str, str, str]]) -> None:
+        """생성된 사용자 (user_id, server_id, user_id2) 반영 (commit 후)"""
+        index = self._sync_version(db, game_id)
+        if index is not None:
+            for user_id, server_id, user_id2 in users:
+                index.add(user_id, server_id or "", user_id2 or "")
+
+    def apply_delete(self, db: Session, game_id: str, user_ids: Iterable[str]) -> None:
+        """삭제된 사용자 반영 (commit 후)"""
+        index = self._sync_version(db, game_id)
+        if index is not None:
+            for user_id in user_ids:
+                index.remove(user_id)
+
+    def drop(self, game_id: str) -> None:
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def stats(self) -> dict:
+        return {
+            "games": len(self._games),
+            "hits": self.hits,
+            "misses": self.misses,
+            "fallbacks": self.fallbacks,
+        }
+
+
+game_user_index = GameUserIndex()
@@ -0,0 +1,168 @@
+import logging
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+import models
+import schemas
+from database import dialect
+from onestore_env_cache import onestore_env_cache
+from verify_onestore_webhook import invalidate_public_key
+from webshop_bulk import (
+    bulk_upsert_game_servers,
+    bulk_upsert_game_users,
+    delete_all_game_users,
+    delete_game_users_by_ids,
+)
+from webshop_consume_outbox import consume_job_insert, consume_worker
+from webshop_server_list_cache import server_list_cache
+from webshop_user_index import game_user_index
+from webshop_writer import write_operation
+
+logger = logging.getLogger(__name__)
+
+# DB를 변경하는 API 작업 모음
+# 엔드포인트는 여기 함수를 db 없이 호출하고, 실행 위치(이 프로세스 / 쓰기 프로세스)는 DB_WRITER_MODE로 정해진다.
+
+
+def _items(model, values) -> List:
+    """remote 모드에서는 dict로 전달되므로 스키마로 다시 변환"""
+    return [value if isinstance(value, model) else model.model_validate(value) for value in values]
+
+
+def pns_insert(values: Dict):
+    """PNS 저장 INSERT ... ON CONFLICT(purchase_id) DO NOTHING RETURNING id 문"""
+    return dialect.insert(models.OnestorePNS).values(**values).on_conflict_do_nothing(
+        index_elements=[models.OnestorePNS.purchase_id]
+    ).returning(models.OnestorePNS.id)
+
+
+@write_operation
+def upsert_game_servers(db: Session, game_id: str, servers: List) -> Dict[str, int]:
+    return bulk_upsert_game_servers(db, game_id, _items(schemas.GameServerItem, servers))
+
+
+@write_operation
+def delete_game_servers(db: Session, game_id: str) -> int:
+    deleted = db.execute(
+        delete(models.GameServer).where(models.GameServer.game_id == game_id)
+    ).rowcount
+    if deleted:
+        server_list_cache.mark_changed(db, game_id)
+    db.commit()
+    if deleted:
+        server_list_cache.invalidate(game_id)
+    return deleted
+
+
+@write_operation
+def upsert_game_users(db: Session, game_id: str, users: List) -> Dict[str, int]:
+    return bulk_upsert_game_users(db, game_id, _items(schemas.GameUser, users))
+
+
+@write_operation
+def delete_game_user(db: Session, game_id: str, user_id: str) -> int:
+    deleted = db.execute(
+        delete(models.GameUser).where(models.GameUser.game_id == game_id, models.GameUser.user_id == user_id)
+    ).rowcount
+    if deleted:
+        game_user_index.mark_changed(db, game_id)
+    db.commit()
+    if deleted:
+        game_user_index.apply_delete(db, game_id, [user_id])
+    return deleted
+
+
+@write_operation
+def delete_game_users(db: Session, game_id: str, user_ids: List[str], delete_all: bool) -> int:
+    if delete_all:
+        return delete_all_game_users(db, game_id)
+    return delete_game_users_by_ids(db, game_id, user_ids)
+
+
+@write_operation
+def ingest_pns(db: Session, pns_values: Dict, consume_job: Optional[Dict]) -> bool:
+    """
+    PNS 저장과 (결제 완료 시) consume 작업 등록을 한 트랜잭션으로 처리
+    반환: 새로 저장했으면 True, 이미 처리된 purchaseId면 False
+    """
+    inserted = db.execute(pns_insert(pns_values)).first() is not None
+    if inserted and consume_job is not None:
+        db.execute(consume_job_insert(**consume_job))
+    db.commit()
+    if inserted and consume_job is not None:
+        consume_worker.notify()
+    return inserted
+
+
+def _get_env(db: Session, client_id: str) -> Optional[models.OnestoreEnvData]:
+    return db.query(models.OnestoreEnvData).filter(models.OnestoreEnvData.client_id == client_id).first()
+
+
+def _env_not_found(client_id: str) -> HTTPException:
+    return HTTPException(status_code=404, detail=f"해당 client_id를 찾을 수 없습니다: {client_id}")
+
+
+def _env_committed(db: Session, env_data: Optional[models.OnestoreEnvData], client_id: str) -> Optional[dict]:
+    """환경 데이터 변경 commit 후 관련 캐시 갱신, 응답용 dict 반환"""
+    result = schemas.OnestoreEnvData.model_validate(env_data).model_dump() if env_data is not None else None
+    onestore_env_cache.refresh_after_commit(db)
+    invalidate_public_key(client_id)
+    return result
+
+
+@write_operation
+def create_onestore_env(db: Session, env_data: Dict) -> dict:
+    """client_id로 이미 존재하는 경우 400"""
+    env_data = _items(schemas.OnestoreEnvDataCreate, [env_data])[0]
+    if _get_env(db, env_data.client_id):
+        raise HTTPException(
+            status_code=400,
+            detail=f"이미 존재하는 client_id입니다: {env_data.client_id}"
+        )
+
+    db_env_data = models.OnestoreEnvData(
+        client_id=env_data.client_id,
+        license_key=env_data.license_key,
+        client_secret=env_data.client_secret,
+        pns_sandbox_domain=env_data.pns_sandbox_domain,
+        pns_commercial_domain=env_data.pns_commercial_domain
+    )
+    db.add(db_env_data)
+    onestore_env_cache.mark_changed(db)
+    db.commit()
+    db.refresh(db_env_data)
+    logger.info(f"원스토어 환경 데이터 생성: client_id={env_data.client_id}")
+    return _env_committed(db, db_env_data, env_data.client_id)
+
+
+@write_operation
+def update_onestore_env(db: Session, client_id: str, update_data: Dict) -> dict:
+    """update_data: 제공된 필드만 (model_dump(exclude_unset=True))"""
+    env_data = _get_env(db, client_id)
+    if not env_data:
+        raise _env_not_found(client_id)
+
+    for field, value in update_data.items():
+        if field == "client_id": # skip client_id
+            continue
+        setattr(env_data, field, value)
+
+    onestore_env_cache.mark_changed(db)
+    db.commit()
+    db.refresh(env_data)
+    logger.info(f"원스토어 환경 데이터 수정: client_id={client_id}")
+    return _env_committed(db, env_data, client_id)
+
+
+@write_operation
+def delete_onestore_env(db: Session, client_id: str) -> None:
+    env_data = _get_env(db, client_id)
+    if not env_data:
+        raise _env_not_found(client_id)
+
+    db.delete(env_data)
+    onestore_env_cache.mark_changed(db)
+    db.commit()
+    _env_committed(db, None, client_id)
+    logger.info(f"원스토어 환경 데이터 삭제: client_id={client_id}")
@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import signal
+import socket
+import struct
+import threading
+import functools
+import socketserver
+import logging
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException
+from pydantic import BaseModel
+from cache_version import version_tracker
+from database import SessionLocal
+from webshop_metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# DB 쓰기 처리 방식
+# local: 이 프로세스에서 직접 쓰기 (단일 프로세스 실행, 기본값)
+# remote: 쓰기 전용 프로세스(python webshop_writer.py)에 Unix 소켓으로 요청 - uvicorn --workers N 실행 시
+DB_WRITER_MODE = os.getenv("DB_WRITER_MODE", "local")
+DB_WRITER_REMOTE = DB_WRITER_MODE == "remote"
+DB_WRITER_SOCKET = os.getenv("DB_WRITER_SOCKET", "/tmp/webshop-db-writer.sock")
+# 쓰기 요청 한 건의 응답 대기 시간(초) - bulk upsert 등 큰 요청도 포함
+DB_WRITER_TIMEOUT = float(os.getenv("DB_WRITER_TIMEOUT", "60"))
+
+# 요청/응답 프레임: 4바이트 길이(big endian) + UTF-8 JSON
+_HEADER = struct.Struct("!I")
+_MAX_FRAME_SIZE = 256 * 1024 * 1024
+
+writer_calls_total = Counter("db_writer_calls_total", "쓰기 프로세스 요청 수", ("operation", "outcome"))
+writer_call_duration_seconds = Histogram(
+    "db_writer_call_duration_seconds", "쓰기 프로세스 요청 왕복 시간(초)", ("operation",)
+)
+
+_operations: Dict[str, Callable] = {}
+
+
+class DBWriterError(RuntimeError):
+    """쓰기 프로세스 연결 실패 또는 쓰기 작업 중 오류"""
+
+
+def write_operation(fn: Callable) -> Callable:
+    """
+    쓰기 작업 등록 데코레이터 - fn(db, *args)
+
+    호출 시 db 없이 args만 넘긴다. local 모드는 이 프로세스의 쓰기 세션으로 실행하고,
+    remote 모드는 쓰기 프로세스가 실행한다 (args와 반환값은 JSON으로 주고받으므로
+    pydantic 모델은 dict로 전달된다).
+    """
+    name = fn.__name__
+    _operations[name] = fn
+
+    @functools.wraps(fn)
+    def wrapper(*args):
+        if DB_WRITER_REMOTE:
+            return writer_client.call(name, args)
+        return run_operation(name, args)
+
+    return wrapper
+
+
+def run_operation(name: str, args) -> Any:
+    db = SessionLocal()
+    try:
+        return _operations[name](db, *args)
+    finally:
+        db.close()
+
+
+def _json_default(value):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"JSON 직렬화 불가: {type(value).__name__}")
+
+
+def _send_frame(sock: socket.socket, message: dict) -> None:
+    data = json.dumps(message, ensure_ascii=False, default=_json_default).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(min(size - len(buf), 1024 * 1024))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv_frame(sock: socket.socket) -> Optional[dict]:
+    """상대가 연결을 닫았으면 None"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > _MAX_FRAME_SIZE:
+        raise DBWriterError(f"프레임 크기 초과: {size}")
+    data = _recv_exact(sock, size)
+    if data is None:
+        return None
+    return json.loads(data)
+
+
+class DBWriterClient:
+    """
+    요청 워커 -> 쓰기 프로세스 호출
+
+    - 스레드별로 Unix 소켓 연결을 하나씩 유지 (한 연결에서는 요청/응답을 순서대로 주고받음)
+    - 요청 전송 전 끊긴 연결은 한 번 다시 연결해 재전송, 응답 대기 중 끊기면
+      commit 여부를 알 수 없으므로 재시도하지 않고 오류로 처리
+    - 성공 후 version_tracker를 만료시켜 이 워커의 캐시가 바로 변경을 확인하게 함
+    """
+
+    def __init__(self, path: str = DB_WRITER_SOCKET, timeout: float = DB_WRITER_TIMEOUT):
+        self._path = path
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        try:
+            sock.connect(self._path)
+        except OSError as e:
+            sock.close()
+            raise DBWriterError(f"쓰기 프로세스에 연결할 수 없습니다: {self._path}, {e}")
+        self._local.sock = sock
+        return sock
+
+    def _close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def call(self, operation: str, args) -> Any:
+        started = time.perf_counter()
+        request = {"op": operation, "args": list(args)}
+        sock = getattr(self._local, "sock", None)
+        try:
+            if sock is None:
+                sock = self._connect()
+            try:
+                _send_frame(sock, request)
+            except OSError:
+                # 유휴 중 끊긴 연결 (쓰기 프로세스 재시작 등) - 요청이 전달되지 않았으므로 재전송
+                self._close()
+                sock = self._connect()
+                _send_frame(sock, request)
+            try:
+                response = _recv_frame(sock)
+            except (OSError, ValueError) as e:
+                self._close()
+                raise DBWriterError(f"쓰기 프로세스 응답 오류: op={operation}, {e}")
+            if response is None:
+                self._close()
+                raise DBWriterError(f"쓰기 프로세스 연결이 끊어졌습니다: op={operation}")
+        except DBWriterError:
+            writer_calls_total.inc(operation, "error")
+            raise
+        finally:
+            writer_call_duration_seconds.observe(time.perf_counter() - started, operation)
+
+        if response.get("ok"):
+            writer_calls_total.inc(operation, "ok")
+            version_tracker.expire()
+            return response.get("result")
+        writer_calls_total.inc(operation, "error")
+        if "status_code" in response:
+            raise HTTPException(status_code=response["status_code"], detail=response.get("detail"))
+        raise DBWriterError(response.get("error") or f"쓰기 작업 실패: op={operation}")
+
+
+writer_client = DBWriterClient()
+
+
+def _execute(request: dict) -> dict:
+    name = request.get("op")
+    if name not in _operations:
+        return {"ok": False, "error": f"알 수 없는 쓰기 작업: {name}"}
+    try:
+        return {"ok": True, "result": run_operation(name, request.get("args") or [])}
+    except HTTPException as e:
+        return {"ok": False, "status_code": e.status_code, "detail": e.detail}
+    except Exception as e:
+        logger.error(f"쓰기 작업 오류: op={name}, error={e}", exc_info=True)
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+class _WriterRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                request = _recv_frame(self.request)
+            except (OSError, ValueError, DBWriterError) as e:
+                logger.warning(f"쓰기 요청 수신 오류, 연결 종료: {e}")
+                return
+            if request is None:
+                return
+            _send_frame(self.request, _execute(request))
+
+
+class _WriterServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path: str = DB_WRITER_SOCKET) -> None:
+    """
+    쓰기 전용 프로세스 실행 (SIGTERM/SIGINT 로 종료)
+
+    DB 파일에 쓰는 프로세스는 이 프로세스 하나뿐이다. consume 작업 큐 워커도 여기서만 실행한다.
+    """
+    # 쓰기 작업 등록
+    import webshop_write_ops  # noqa: F401
+    import webshop_token_cache  # noqa: F401
+    from database import init_db
+    from webshop_consume_outbox import consume_worker, CONSUME_WORKER_ENABLED
+    from webshop_http_client import init_http_client, close_http_client
+
+    init_db()
+    init_http_client()
+    if CONSUME_WORKER_ENABLED:
+        consume_worker.start()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = _WriterServer(path, _WriterRequestHandler)
+    os.chmod(path, 0o600)
+
+    def _shutdown(signum, frame):
+        logger.info(f"쓰기 프로세스 종료 요청: signal={signum}")
+        # serve_forever를 실행 중인 스레드에서 shutdown()을 직접 호출하면 멈추므로 별도 스레드 사용
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    logger.info(f"쓰기 프로세스 시작: socket={path}, pid={os.getpid()}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        consume_worker.stop()
+        close_http_client()
+        logger.info("쓰기 프로세스 종료")
+
+
+if __name__ == "__main__":
+    from webshop_logging import setup_logging
+    # __main__ 이 아닌 모듈로 다시 import 해야 webshop_write_ops가 등록한 작업 목록을 함께 사용한다
+    import webshop_writer
+
+    setup_logging()
+    webshop_writer.serve()